@@ -1,6 +1,6 @@
 from typing import Optional
 
-from ..exceptions.rag_exceptions import RAGInternalError
+from ..exceptions.rag_exceptions import RAGInternalError, RAGServiceUnavailable
 
 
 _rag_service: Optional[object] = None
@@ -11,8 +11,15 @@ def set_rag_service(service: object) -> None:
     _rag_service = service
 
 
+def peek_rag_service() -> Optional[object]:
+    """Return the service whether or not it has finished warming up."""
+    return _rag_service
+
+
 async def get_rag_service():
     if _rag_service is None:
         raise RAGInternalError("RAG service not initialized")
+    if not getattr(_rag_service, "ready", True):
+        raise RAGServiceUnavailable("RAG service is warming up")
     return _rag_service
 
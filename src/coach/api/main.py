@@ -3,6 +3,7 @@ import logging
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from ..config.settings import settings
@@ -10,10 +11,12 @@ from ..exceptions.rag_exceptions import (
     RAGBadRequest,
     RAGModelUnavailable,
     RAGInternalError,
+    RAGServiceUnavailable,
+    RAGNotFound,
 )
 from ..core.rag_service import RAGService
 from .routes import router
-from .dependencies import set_rag_service
+from .dependencies import peek_rag_service, set_rag_service
 
 
 # Setup logging
@@ -27,9 +30,11 @@ async def lifespan(app: FastAPI):
     try:
         if not (hasattr(app.state, 'skip_init') and app.state.skip_init):
             service = RAGService()
-            await service.initialize()
             set_rag_service(service)
-            logger.info("RAG service initialized")
+            # Model load and default-document ingest run in the background;
+            # /ready reports when the service can take traffic.
+            service.start()
+            logger.info("RAG service warming up")
         yield
     except Exception as e:
         logger.error(f"Failed to initialize RAG service: {e}")
@@ -71,6 +76,16 @@ async def model_unavailable_handler(request, exc: RAGModelUnavailable):
     raise HTTPException(status_code=503, detail=exc.message)
 
 
+@app.exception_handler(RAGServiceUnavailable)
+async def service_unavailable_handler(request, exc: RAGServiceUnavailable):
+    raise HTTPException(status_code=503, detail=exc.message)
+
+
+@app.exception_handler(RAGNotFound)
+async def not_found_handler(request, exc: RAGNotFound):
+    raise HTTPException(status_code=404, detail=exc.message)
+
+
 @app.exception_handler(RAGInternalError)
 async def internal_error_handler(request, exc: RAGInternalError):
     raise HTTPException(status_code=500, detail=exc.message)
@@ -84,6 +99,21 @@ async def health_check():
     return {"status": "healthy", "service": "rag-tutor"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    service = peek_rag_service()
+    if service is None or not service.ready:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "not_ready",
+                "phase": getattr(service, "phase", "not_started"),
+                "error": getattr(service, "error", None),
+            },
+        )
+    return {"status": "ready", "service": "rag-tutor"}
+
+
 def main():
     import uvicorn
 
@@ -1,21 +1,65 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List, Dict, Any
 import re
 
+from ..config.settings import settings
+
+PDF_MAGIC = b'%PDF'
+
+
+def _sanitize_query(v):
+    v = v.strip()
+    if not v:
+        raise ValueError('Query cannot be empty')
+    # Basic sanitization
+    v = re.sub(r"[<>\"';]", '', v)
+    return v
+
+
+class DocumentFilter(BaseModel):
+    document_id: Optional[str] = Field(None, max_length=64)
+    filename: Optional[str] = Field(None, pattern=r'^[a-zA-Z0-9._-]+\.pdf$')
+    page_from: Optional[int] = Field(None, ge=1)
+    page_to: Optional[int] = Field(None, ge=1)
+
+    @model_validator(mode='after')
+    def check_page_range(self):
+        if self.page_from is not None and self.page_to is not None and self.page_from > self.page_to:
+            raise ValueError('page_from must not be greater than page_to')
+        return self
+
 
 class QueryRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=1000)
     top_k: int = Field(5, ge=1, le=20)
     collection_name: Optional[str] = Field(None, pattern=r'^[a-zA-Z0-9_-]+$')
+    hnsw_ef: Optional[int] = Field(None, ge=1, le=4096, description="HNSW search beam width; higher is more accurate")
+    exact: bool = Field(False, description="Scan every vector instead of using the HNSW index")
+    score_threshold: Optional[float] = Field(None, ge=-1.0, le=1.0, description="Minimum cosine similarity of a hit")
+    filter: Optional[DocumentFilter] = Field(None, description="Only search chunks of matching documents/pages")
 
     @field_validator('query', mode='before')
     def sanitize_query(cls, v):
-        v = v.strip()
-        if not v:
-            raise ValueError('Query cannot be empty')
-        # Basic sanitization
-        v = re.sub(r"[<>\"';]", '', v)
-        return v
+        return _sanitize_query(v)
+
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=settings.batch_max_queries)
+    top_k: int = Field(5, ge=1, le=20)
+    collection_name: Optional[str] = Field(None, pattern=r'^[a-zA-Z0-9_-]+$')
+    hnsw_ef: Optional[int] = Field(None, ge=1, le=4096, description="HNSW search beam width; higher is more accurate")
+    exact: bool = Field(False, description="Scan every vector instead of using the HNSW index")
+    score_threshold: Optional[float] = Field(None, ge=-1.0, le=1.0, description="Minimum cosine similarity of a hit")
+    filter: Optional[DocumentFilter] = Field(None, description="Only search chunks of matching documents/pages")
+
+    @field_validator('queries', mode='before')
+    def sanitize_queries(cls, v):
+        if not isinstance(v, list):
+            raise ValueError('queries must be a list of strings')
+        queries = [_sanitize_query(q) for q in v]
+        if any(len(q) > 1000 for q in queries):
+            raise ValueError('Query is too long')
+        return queries
 
 
 class DocumentSource(BaseModel):
@@ -38,9 +82,9 @@ class DocumentUpload(BaseModel):
 
     @field_validator('content')
     def validate_pdf(cls, v):
-        if not v.startswith(b'%PDF'):
+        if not v.startswith(PDF_MAGIC):
             raise ValueError('Invalid PDF format')
-        if len(v) > 50 * 1024 * 1024:  # 50MB limit
+        if len(v) > settings.max_upload_bytes:
             raise ValueError('File too large')
         return v
 
@@ -50,4 +94,31 @@ class UploadResponse(BaseModel):
     message: str
     document_id: str
     chunks_created: int
+    status: str = Field("new", description="new, unchanged, replaced or failed")
+    pages_reindexed: int = 0
+    pages_deleted: int = 0
+
+
+class DeleteResponse(BaseModel):
+    document_id: str
+    chunks_deleted: int
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
 
+class JobStatusResponse(BaseModel):
+    job_id: str
+    filename: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    phase: str
+    pages_processed: int
+    chunks_processed: int
+    result: Optional[UploadResponse] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
@@ -1,20 +1,42 @@
+import json
 import logging
-from typing import List
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends
+import aiofiles
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..exceptions.rag_exceptions import (
     RAGModelUnavailable,
     RAGBadRequest,
     RAGInternalError,
-    RAGDocumentError,
+    RAGNotFound,
+    RAGServiceUnavailable,
 )
+from ..config.settings import settings
+from ..core.document_processor import PdfSource
 from ..core.rag_service import RAGService
-from .models import QueryRequest, QueryResponse, DocumentUpload, UploadResponse
+from ..core.search_options import QueryFilter, SearchOptions
+from .models import (
+    PDF_MAGIC,
+    QueryRequest,
+    BatchQueryRequest,
+    QueryResponse,
+    DocumentUpload,
+    UploadResponse,
+    DeleteResponse,
+    JobResponse,
+    JobStatusResponse,
+)
 from ..utils.metrics import (
     rag_queries_total,
     rag_query_duration,
+    rag_time_to_first_token,
+    rag_tokens_per_second,
     rag_errors_total,
     vector_operations_total,
 )
@@ -25,6 +47,15 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _search_options(request) -> SearchOptions:
+    return SearchOptions(
+        hnsw_ef=request.hnsw_ef,
+        exact=request.exact,
+        score_threshold=request.score_threshold,
+        filter=QueryFilter(**request.filter.model_dump()) if request.filter else None,
+    )
+
+
 @router.post("/query", response_model=QueryResponse)
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
 async def query_documents(
@@ -40,6 +71,7 @@ async def query_documents(
                 query=request.query,
                 top_k=request.top_k,
                 collection_name=request.collection_name,
+                options=_search_options(request),
             )
 
         rag_queries_total.labels(collection=collection_label, status="succeeded").inc()
@@ -65,38 +97,233 @@ async def query_documents(
         raise RAGInternalError("Query processing failed")
 
 
-@router.post("/upload", response_model=UploadResponse)
+def _format_sse(event: str, data: object) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/query/stream")
+async def query_documents_stream(
+    request: QueryRequest,
+    rag_service: RAGService = Depends(get_rag_service),
+):
+    """Stream sources, then LLM tokens, as Server-Sent Events"""
+    collection_label = request.collection_name or "default"
+    rag_queries_total.labels(collection=collection_label, status="started").inc()
+
+    async def event_stream():
+        start = time.perf_counter()
+        first_token_at = None
+        completion_tokens = None
+        try:
+            async for event in rag_service.query_stream(
+                query=request.query,
+                top_k=request.top_k,
+                collection_name=request.collection_name,
+                options=_search_options(request),
+            ):
+                if event["event"] == "token":
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        rag_time_to_first_token.observe(first_token_at - start)
+                elif event["event"] == "done":
+                    # Deltas are not tokens: providers batch several tokens per delta
+                    completion_tokens = event["data"].get("completion_tokens")
+                yield _format_sse(event["event"], event["data"])
+
+            end = time.perf_counter()
+            rag_query_duration.observe(end - start)
+            if completion_tokens and first_token_at is not None and end > first_token_at:
+                rag_tokens_per_second.observe(completion_tokens / (end - first_token_at))
+            rag_queries_total.labels(collection=collection_label, status="succeeded").inc()
+
+        except RAGModelUnavailable as e:
+            rag_errors_total.labels(error_type="model_unavailable").inc()
+            rag_queries_total.labels(collection=collection_label, status="failed").inc()
+            yield _format_sse("error", {"detail": e.message})
+        except RAGBadRequest as e:
+            rag_errors_total.labels(error_type="bad_request").inc()
+            rag_queries_total.labels(collection=collection_label, status="failed").inc()
+            yield _format_sse("error", {"detail": e.message})
+        except Exception as e:
+            rag_errors_total.labels(error_type="internal_error").inc()
+            rag_queries_total.labels(collection=collection_label, status="failed").inc()
+            logger.error(f"Streaming query failed: {e}")
+            yield _format_sse("error", {"detail": "Query processing failed"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/query/batch")
+async def query_documents_batch(
+    request: BatchQueryRequest,
+    rag_service: RAGService = Depends(get_rag_service),
+):
+    """Answer many queries, streaming one NDJSON line per query as it finishes"""
+    collection_label = request.collection_name or "default"
+    rag_queries_total.labels(collection=collection_label, status="started").inc(len(request.queries))
+
+    async def result_stream():
+        start = time.perf_counter()
+        try:
+            async for result in rag_service.query_batch(
+                queries=request.queries,
+                top_k=request.top_k,
+                collection_name=request.collection_name,
+                options=_search_options(request),
+            ):
+                status = "failed" if "error" in result else "succeeded"
+                rag_queries_total.labels(collection=collection_label, status=status).inc()
+                yield json.dumps(result) + "\n"
+            rag_query_duration.observe(time.perf_counter() - start)
+
+        except RAGBadRequest as e:
+            rag_errors_total.labels(error_type="bad_request").inc()
+            yield json.dumps({"error": e.message}) + "\n"
+        except Exception as e:
+            rag_errors_total.labels(error_type="internal_error").inc()
+            logger.error(f"Batch query failed: {e}")
+            yield json.dumps({"error": "Query processing failed"}) + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+def _upload_result(result: Dict[str, object]) -> UploadResponse:
+    return UploadResponse(
+        success=result["status"] != "failed",
+        message=(
+            f"Document failed: {result['error']}"
+            if result["status"] == "failed"
+            else f"Document {result['status']}: {result['chunks_created']} chunks created"
+        ),
+        document_id=result["document_id"],
+        chunks_created=result["chunks_created"],
+        status=result["status"],
+        pages_reindexed=result["pages_reindexed"],
+        pages_deleted=result["pages_deleted"],
+    )
+
+
+def _enqueue(
+    rag_service: RAGService,
+    filename: str,
+    content: PdfSource,
+    collection_name: Optional[str],
+    spool_path: Optional[str] = None,
+) -> JSONResponse:
+    try:
+        job = rag_service.jobs.submit(filename, content, collection_name, spool_path=spool_path)
+    except RAGServiceUnavailable:
+        vector_operations_total.labels(operation="upload", status="rejected").inc()
+        raise
+    vector_operations_total.labels(operation="upload", status="queued").inc()
+    response = JobResponse(job_id=job.id, status=job.status, status_url=f"/jobs/{job.id}")
+    return JSONResponse(status_code=202, content=response.model_dump())
+
+
+@router.post("/upload", status_code=202, response_model=JobResponse)
 async def upload_document(
     upload: DocumentUpload,
     rag_service: RAGService = Depends(get_rag_service),
 ):
-    """Upload and process a document"""
-    try:
-        vector_operations_total.labels(operation="upload", status="started").inc()
+    """Queue a document for ingestion; poll the returned job for progress"""
+    return _enqueue(rag_service, upload.filename, upload.content, upload.collection_name)
 
-        result = await rag_service.ingest_document(
-            filename=upload.filename,
-            content=upload.content,
-            collection_name=upload.collection_name,
-        )
 
-        vector_operations_total.labels(operation="upload", status="succeeded").inc()
-        return UploadResponse(
-            success=True,
-            message=f"Document processed: {result['chunks_created']} chunks created",
-            document_id=result["document_id"],
-            chunks_created=result["chunks_created"],
-        )
+async def _spool_pdf(request: Request) -> str:
+    """
+    Stream the request body into a temporary file, 64 KiB at a time.
+
+    The %PDF magic is checked on the first bytes and the size limit on every
+    chunk, so an invalid or oversized upload is rejected as soon as it is
+    detected. Returns the path of the spooled file; the caller owns it.
+    """
+    limit = settings.max_upload_bytes
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit:
+        raise RAGBadRequest("File too large")
+
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=settings.upload_spool_dir)
+    os.close(fd)
+    size = 0
+    head = b""
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            async for chunk in request.stream():
+                if len(head) < len(PDF_MAGIC):
+                    head += chunk[:len(PDF_MAGIC) - len(head)]
+                    if len(head) == len(PDF_MAGIC) and head != PDF_MAGIC:
+                        raise RAGBadRequest("Invalid PDF format")
+                size += len(chunk)
+                if size > limit:
+                    raise RAGBadRequest("File too large")
+                await out.write(chunk)
+        if head != PDF_MAGIC:
+            raise RAGBadRequest("Invalid PDF format")
+        return path
+    except BaseException:
+        os.unlink(path)
+        raise
 
-    except RAGDocumentError:
-        vector_operations_total.labels(operation="upload", status="failed").inc()
-        rag_errors_total.labels(error_type="document_error").inc()
+
+@router.post("/upload/stream", status_code=202, response_model=JobResponse)
+async def upload_document_stream(
+    request: Request,
+    filename: str = Query(..., pattern=r'^[a-zA-Z0-9._-]+\.pdf$'),
+    collection_name: Optional[str] = Query(None, pattern=r'^[a-zA-Z0-9_-]+$'),
+    rag_service: RAGService = Depends(get_rag_service),
+):
+    """Queue a document sent as the raw request body (application/pdf) for ingestion"""
+    path = await _spool_pdf(request)
+    try:
+        # The job removes the spooled file once ingestion finishes
+        return _enqueue(rag_service, filename, path, collection_name, spool_path=path)
+    except BaseException:
+        os.unlink(path)
         raise
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, rag_service: RAGService = Depends(get_rag_service)):
+    """Report the phase and progress of an ingestion job"""
+    job = rag_service.jobs.get(job_id)
+    if job is None:
+        raise RAGNotFound(f"Unknown job '{job_id}'")
+    return JobStatusResponse(
+        job_id=job.id,
+        filename=job.filename,
+        status=job.status,
+        phase=job.phase,
+        pages_processed=job.pages_processed,
+        chunks_processed=job.chunks_processed,
+        result=_upload_result(job.result) if job.result else None,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.delete("/documents/{document_id}", response_model=DeleteResponse)
+async def delete_document(
+    document_id: str,
+    collection_name: Optional[str] = Query(None, pattern=r'^[a-zA-Z0-9_-]+$'),
+    rag_service: RAGService = Depends(get_rag_service),
+):
+    """Delete every chunk of a document"""
+    try:
+        vector_operations_total.labels(operation="delete", status="started").inc()
+        deleted = await rag_service.delete_document(document_id, collection_name)
+        vector_operations_total.labels(operation="delete", status="succeeded").inc()
+        return DeleteResponse(document_id=document_id, chunks_deleted=deleted)
     except Exception as e:
-        vector_operations_total.labels(operation="upload", status="failed").inc()
+        vector_operations_total.labels(operation="delete", status="failed").inc()
         rag_errors_total.labels(error_type="internal_error").inc()
-        logger.error(f"Upload failed: {e}")
-        raise RAGInternalError("Document upload failed")
+        logger.error(f"Delete failed: {e}")
+        raise RAGInternalError("Document deletion failed")
 
 
 @router.get("/collections")
@@ -0,0 +1,92 @@
+"""
+Compare chunking strategies on chunk counts, fragments and throughput.
+
+    python -m coach.benchmarks.chunking data/coaching.pdf other.pdf --embed
+
+Each PDF's pages are extracted once; every strategy then chunks them with and
+without cross-page continuation. ``fragments`` counts chunks shorter than
+settings.chunk_min_ratio of the chunk size. Throughput is chunking only
+(best of --repeat runs), in pages per second. With --embed, the chunks are also
+encoded with the configured embedding model, since that is the ingestion cost
+the chunk count drives.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from ..config.settings import settings
+from ..core.chunking import CHUNKERS, Chunker, get_chunker
+from ..core.document_processor import iter_pdf_pages
+from .common import print_table
+
+
+def benchmark_strategy(
+    chunker: Chunker,
+    pages: List[Tuple[int, str]],
+    cross_page: bool,
+    repeat: int = 3,
+    embedder=None,
+) -> dict:
+    elapsed = float("inf")
+    for _ in range(max(1, repeat)):
+        began = time.perf_counter()
+        chunks = list(chunker.chunk_pages(pages, cross_page=cross_page))
+        elapsed = min(elapsed, time.perf_counter() - began)
+
+    lengths = [len(chunk.text) for chunk in chunks]
+    minimum = settings.chunk_min_ratio * chunker.size
+    row = {
+        "strategy": chunker.name,
+        "cross_page": cross_page,
+        "chunks": len(chunks),
+        "mean_chars": sum(lengths) / len(lengths) if lengths else 0.0,
+        "fragments": sum(1 for chunk in chunks if chunker.length(chunk.text) < minimum),
+        "pages_per_s": len(pages) / elapsed if elapsed > 0 else 0.0,
+    }
+    if embedder is not None:
+        began = time.perf_counter()
+        embedder.model.encode([chunk.text for chunk in chunks], convert_to_numpy=True, normalize_embeddings=True)
+        row["embed_s"] = time.perf_counter() - began
+    return row
+
+
+def main(argv: Optional[Sequence[str]] = None) -> List[dict]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", help="reference PDFs (default: settings.pdf)")
+    parser.add_argument("--strategies", nargs="+", default=list(CHUNKERS), choices=list(CHUNKERS))
+    parser.add_argument("--repeat", type=int, default=3, help="chunking runs per strategy; the fastest is reported")
+    parser.add_argument("--embed", action="store_true", help="also time embedding the chunks")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    pdfs = args.pdfs or ([settings.pdf] if settings.pdf else [])
+    if not pdfs:
+        parser.error("no PDFs given and settings.pdf is not set")
+
+    embedder = None
+    if args.embed:
+        from ..core.embeddings import EmbeddingClient
+        embedder = EmbeddingClient()
+
+    rows: List[dict] = []
+    for path in pdfs:
+        pages = list(iter_pdf_pages(path, os.path.basename(path)))
+        for strategy in args.strategies:
+            chunker = get_chunker(strategy)
+            for cross_page in (False, True):
+                row = benchmark_strategy(chunker, pages, cross_page, args.repeat, embedder)
+                rows.append({"pdf": os.path.basename(path), "pages": len(pages), **row})
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import CollectionStatus, PointStruct
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_vectors(count: int, dim: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """Unit-length float32 vectors grouped around random centroids, like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centroids[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    return normalize(vectors)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def load_vectors(path: Optional[str], count: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Vectors from a ``.npy`` file (e.g. real embeddings) or synthetic ones."""
+    if path:
+        return normalize(np.load(path)[:count])
+    return synthetic_vectors(count, dim, seed=seed)
+
+
+def sample_queries(corpus: np.ndarray, count: int, noise: float = 0.3, seed: int = 1) -> np.ndarray:
+    """Queries near (but not equal to) random corpus vectors."""
+    rng = np.random.default_rng(seed)
+    picks = corpus[rng.integers(0, len(corpus), count)]
+    return normalize(picks + noise * rng.standard_normal(picks.shape).astype(np.float32) / np.sqrt(corpus.shape[1]))
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Ground-truth ids of the ``k`` nearest corpus vectors by cosine similarity."""
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, kth=min(k, corpus.shape[0] - 1), axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def recall_at_k(found: Sequence[Sequence], truth: Sequence[Sequence]) -> float:
+    """Fraction of the true neighbours of each query that were found, over all queries."""
+    hits = total = 0
+    for ids, expected in zip(found, truth):
+        expected = set(list(expected))
+        hits += len(set(list(ids)[:len(expected)]) & expected)
+        total += len(expected)
+    return hits / total if total else 1.0
+
+
+def percentile_ms(latencies: Sequence[float], q: float) -> float:
+    return float(np.percentile(np.asarray(latencies) * 1000.0, q)) if latencies else 0.0
+
+
+def connect(url: Optional[str]) -> QdrantClient:
+    if url:
+        return QdrantClient(url=url)
+    logger.warning("No --url given: using the local in-memory client, which ignores quantization and HNSW settings")
+    return QdrantClient(":memory:")
+
+
+def fill_collection(client: QdrantClient, name: str, vectors: np.ndarray, batch_size: int = 1024) -> None:
+    """Upsert ``vectors`` with ids 0..n-1 and wait until the collection has finished indexing."""
+    for start in range(0, len(vectors), batch_size):
+        points = [
+            PointStruct(id=start + i, vector=vector.tolist(), payload={"row": start + i})
+            for i, vector in enumerate(vectors[start:start + batch_size])
+        ]
+        client.upsert(collection_name=name, points=points, wait=True)
+    wait_until_indexed(client, name)
+
+
+def wait_until_indexed(client: QdrantClient, name: str, timeout: float = 600.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.get_collection(collection_name=name).status == CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+    logger.warning(f"Collection '{name}' still optimizing after {timeout:.0f}s; results may be skewed")
+
+
+def timed(search: Callable[[List[float]], List[int]], queries: np.ndarray) -> Tuple[List[List[int]], List[float]]:
+    """Run ``search`` for every query; returns the ids found and per-query latencies in seconds."""
+    found: List[List[int]] = []
+    latencies: List[float] = []
+    for query in queries:
+        began = time.perf_counter()
+        ids = search(query.tolist())
+        latencies.append(time.perf_counter() - began)
+        found.append(ids)
+    return found, latencies
+
+
+def print_table(rows: List[dict]) -> None:
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[_format(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
@@ -0,0 +1,150 @@
+"""
+Measure the recall/latency trade-off of HNSW settings against exact search.
+
+Search-time sweep over an existing collection, with a stored query set:
+
+    python -m coach.benchmarks.hnsw --url http://localhost:6333 --collection documents \
+        --queries queries.txt --ef 16 32 64 128 256
+
+Index-time sweep, building one scratch collection per m/ef_construct pair:
+
+    python -m coach.benchmarks.hnsw --url http://localhost:6333 --build 16:100 32:200 --ef 32 128
+
+The query set is either a .npy file of query embeddings or a text file with one
+question per line, embedded with the configured model. Ground truth is Qdrant's
+own exact (brute-force) search of the same collection, so recall@k isolates what
+the HNSW approximation loses. Without a query set, queries are sampled near
+stored vectors.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, HnswConfigDiff, SearchParams, VectorParams
+
+from ..config.settings import settings
+from .common import (
+    connect,
+    fill_collection,
+    load_vectors,
+    normalize,
+    percentile_ms,
+    print_table,
+    recall_at_k,
+    sample_queries,
+    timed,
+)
+
+
+def load_query_set(path: str) -> np.ndarray:
+    """Query embeddings from a .npy file, or a text file with one query per line."""
+    if path.endswith(".npy"):
+        return normalize(np.load(path))
+    from ..core.embeddings import EmbeddingClient
+
+    with open(path, encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    return normalize(np.asarray(EmbeddingClient().embed(texts, persist=False)))
+
+
+def stored_vectors(client: QdrantClient, collection: str, limit: int) -> np.ndarray:
+    points, _ = client.scroll(collection_name=collection, limit=limit, with_payload=False, with_vectors=True)
+    return normalize(np.asarray([p.vector for p in points]))
+
+
+def sweep(
+    client: QdrantClient,
+    collection: str,
+    queries: np.ndarray,
+    top_k: int,
+    ef_values: Sequence[int],
+    label: str = "",
+) -> List[dict]:
+    """Recall@k and latency of each ``hnsw_ef`` against exact search on ``collection``."""
+
+    def searcher(params: SearchParams):
+        def search(vector: List[float]) -> List[int]:
+            hits = client.search(collection_name=collection, query_vector=vector, limit=top_k, search_params=params)
+            return [hit.id for hit in hits]
+        return search
+
+    truth, exact_latencies = timed(searcher(SearchParams(exact=True)), queries)
+    rows = [_row(label, "exact", exact_latencies, 1.0, top_k)]
+    for ef in ef_values:
+        search = searcher(SearchParams(hnsw_ef=ef))
+        search(queries[0].tolist())  # warm caches and connections
+        found, latencies = timed(search, queries)
+        rows.append(_row(label, ef, latencies, recall_at_k(found, truth), top_k))
+    return rows
+
+
+def _row(label: str, ef, latencies: List[float], recall: float, top_k: int) -> dict:
+    return {
+        "index": label,
+        "hnsw_ef": ef,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p99_ms": percentile_ms(latencies, 99),
+        f"recall@{top_k}": recall,
+    }
+
+
+def _parse_build(value: str) -> Tuple[int, int]:
+    m, _, ef_construct = value.partition(":")
+    return int(m), int(ef_construct or 100)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> List[dict]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Qdrant server URL (default: local in-memory client)")
+    parser.add_argument("--collection", default=settings.collection_name, help="collection for the search-time sweep")
+    parser.add_argument("--queries", help="stored query set: .npy embeddings or a text file, one query per line")
+    parser.add_argument("--num-queries", type=int, default=200, help="queries to sample when --queries is omitted")
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--build", type=_parse_build, nargs="+", metavar="M:EF_CONSTRUCT",
+                        help="build scratch collections with these index parameters")
+    parser.add_argument("--points", type=int, default=20000, help="vectors per scratch collection")
+    parser.add_argument("--dim", type=int, default=settings.embedding_dim)
+    parser.add_argument("--vectors", help=".npy file of embeddings for scratch collections")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    client = connect(args.url)
+    rows: List[dict] = []
+    if args.build:
+        corpus = load_vectors(args.vectors, args.points, args.dim)
+        queries = load_query_set(args.queries) if args.queries else sample_queries(corpus, args.num_queries)
+        for m, ef_construct in args.build:
+            name = f"bench_hnsw_m{m}_ef{ef_construct}"
+            if client.collection_exists(collection_name=name):
+                client.delete_collection(collection_name=name)
+            client.create_collection(
+                collection_name=name,
+                vectors_config=VectorParams(size=corpus.shape[1], distance=Distance.COSINE),
+                hnsw_config=HnswConfigDiff(m=m, ef_construct=ef_construct),
+            )
+            try:
+                fill_collection(client, name, corpus)
+                rows += sweep(client, name, queries, args.top_k, args.ef, label=f"m={m},ef_construct={ef_construct}")
+            finally:
+                client.delete_collection(collection_name=name)
+    else:
+        if args.queries:
+            queries = load_query_set(args.queries)
+        else:
+            queries = sample_queries(stored_vectors(client, args.collection, 10000), args.num_queries)
+        rows = sweep(client, args.collection, queries, args.top_k, args.ef, label=args.collection)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compare collection storage profiles on memory, search latency and recall.
+
+    python -m coach.benchmarks.storage_profiles --url http://localhost:6333 --points 50000
+
+Every profile gets a scratch collection with the same vectors. Recall@k is
+measured against exact float32 search done with numpy, so it shows what each
+profile's quantization costs. Memory is the profile's estimate for the vectors
+and HNSW graph (payloads excluded). The local in-memory client, used when no
+--url is given, ignores quantization and on-disk settings; run against a Qdrant
+server for meaningful numbers.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import List, Optional, Sequence
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from ..config.settings import settings
+from ..core.storage_profiles import PROFILES, StorageProfile, get_profile
+from .common import (
+    connect,
+    exact_top_k,
+    fill_collection,
+    load_vectors,
+    percentile_ms,
+    print_table,
+    recall_at_k,
+    sample_queries,
+    timed,
+)
+
+
+def benchmark_profile(
+    client: QdrantClient,
+    profile: StorageProfile,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    top_k: int,
+    keep: bool = False,
+) -> dict:
+    name = f"bench_profile_{profile.name}"
+    if client.collection_exists(collection_name=name):
+        client.delete_collection(collection_name=name)
+    client.create_collection(collection_name=name, **profile.collection_kwargs(corpus.shape[1]))
+    try:
+        fill_collection(client, name, corpus)
+        params = profile.search_params()
+
+        def search(vector: List[float]) -> List[int]:
+            hits = client.search(collection_name=name, query_vector=vector, limit=top_k, search_params=params)
+            return [int(hit.id) for hit in hits]
+
+        search(queries[0].tolist())  # warm caches and connections
+        found, latencies = timed(search, queries)
+    finally:
+        if not keep:
+            client.delete_collection(collection_name=name)
+
+    memory = profile.estimated_bytes(*corpus.shape)
+    return {
+        "profile": profile.name,
+        "ram_mb": memory["ram"] / 2**20,
+        "disk_mb": memory["disk"] / 2**20,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p99_ms": percentile_ms(latencies, 99),
+        f"recall@{top_k}": recall_at_k(found, truth),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> List[dict]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Qdrant server URL (default: local in-memory client)")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=settings.embedding_dim)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--vectors", help=".npy file of embeddings to index instead of synthetic vectors")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark collections")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    corpus = load_vectors(args.vectors, args.points, args.dim)
+    queries = sample_queries(corpus, args.queries)
+    truth = exact_top_k(corpus, queries, args.top_k)
+    client = connect(args.url)
+
+    rows = [
+        benchmark_profile(client, get_profile(name), corpus, queries, truth, args.top_k, args.keep)
+        for name in args.profiles
+    ]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings
@@ -24,10 +24,66 @@ class Settings(BaseSettings):
     vector_db_host: str = Field("qdrant", env="VECTOR_DB_HOST")
     vector_db_port: int = Field(6333, env="VECTOR_DB_PORT")
     collection_name: str = Field("documents", env="COLLECTION_NAME")
+    pdf_extract_workers: int = Field(1, env="PDF_EXTRACT_WORKERS")
+    pdf_extract_pages_per_task: int = Field(8, env="PDF_EXTRACT_PAGES_PER_TASK")
+    pdf_extract_parallel_min_pages: int = Field(32, env="PDF_EXTRACT_PARALLEL_MIN_PAGES")
+    ingest_batch_size: int = Field(256, env="INGEST_BATCH_SIZE")
+    ingest_queue_size: int = Field(2, env="INGEST_QUEUE_SIZE")
+    upsert_batch_size: int = Field(256, env="UPSERT_BATCH_SIZE")
+    upsert_parallelism: int = Field(4, env="UPSERT_PARALLELISM")
+    upsert_wait: bool = Field(False, env="UPSERT_WAIT")
+    collection_cache_ttl_seconds: float = Field(300.0, env="COLLECTION_CACHE_TTL_SECONDS")
+    vector_backend: str = Field("qdrant", env="VECTOR_BACKEND")
+    numpy_store_dir: str = Field("./data/numpy_store", env="NUMPY_STORE_DIR")
+    # Client options for the "qdrant_async" backend (remote servers only)
+    qdrant_prefer_grpc: bool = Field(False, env="QDRANT_PREFER_GRPC")
+    qdrant_grpc_port: int = Field(6334, env="QDRANT_GRPC_PORT")
+    qdrant_timeout: int = Field(10, env="QDRANT_TIMEOUT")
+    qdrant_pool_size: int = Field(16, env="QDRANT_POOL_SIZE")
+    hnsw_m: Optional[int] = Field(None, env="HNSW_M")
+    hnsw_ef_construct: Optional[int] = Field(None, env="HNSW_EF_CONSTRUCT")
+    # JSON object mapping collection name -> HNSW params, e.g. {"archive": {"m": 32, "ef_construct": 256}}
+    collection_hnsw_config: Dict[str, Dict[str, int]] = Field(default_factory=dict, env="COLLECTION_HNSW_CONFIG")
+    storage_profile: str = Field("default", env="STORAGE_PROFILE")
+    # JSON object mapping collection name -> storage profile, e.g. {"archive": "binary"}
+    collection_storage_profiles: Dict[str, str] = Field(default_factory=dict, env="COLLECTION_STORAGE_PROFILES")
     embedding_model: str = Field("sentence-transformers/all-MiniLM-L6-v2", env="EMBEDDING_MODEL")
+    embedding_cache_max_entries: int = Field(20000, env="EMBEDDING_CACHE_MAX_ENTRIES")
+    embedding_cache_ttl_seconds: Optional[float] = Field(None, env="EMBEDDING_CACHE_TTL_SECONDS")
+    embedding_store_dir: Optional[str] = Field(None, env="EMBEDDING_STORE_DIR")
+    embedding_batch_window_ms: float = Field(5.0, env="EMBEDDING_BATCH_WINDOW_MS")
+    embedding_batch_max_size: int = Field(32, env="EMBEDDING_BATCH_MAX_SIZE")
     chunk_size: int = Field(1000, env="CHUNK_SIZE")
     chunk_overlap: int = Field(150, env="CHUNK_OVERLAP")
+    chunk_strategy: str = Field("character", env="CHUNK_STRATEGY")  # character, sentence or token
+    chunk_size_tokens: int = Field(256, env="CHUNK_SIZE_TOKENS")
+    chunk_overlap_tokens: int = Field(32, env="CHUNK_OVERLAP_TOKENS")
+    # Tokenizer for token chunking; defaults to the embedding model's
+    chunk_tokenizer: Optional[str] = Field(None, env="CHUNK_TOKENIZER")
+    chunk_cross_page: bool = Field(False, env="CHUNK_CROSS_PAGE")
+    # With CHUNK_CROSS_PAGE, a page's last chunk shorter than this share of the chunk size joins the next page
+    chunk_min_ratio: float = Field(0.5, env="CHUNK_MIN_RATIO")
     top_k: int = Field(5, env="TOP_K")
+    # Cross-encoder reranking of search hits; off while RERANK_MODEL is unset
+    rerank_model: Optional[str] = Field(None, env="RERANK_MODEL")
+    rerank_candidates: int = Field(20, env="RERANK_CANDIDATES")
+    rerank_budget_ms: float = Field(200.0, env="RERANK_BUDGET_MS")
+    context_token_budget: int = Field(1500, env="CONTEXT_TOKEN_BUDGET")
+    # Hugging Face tokenizer matching the LLM; token counts are estimated while unset
+    context_tokenizer: Optional[str] = Field(None, env="CONTEXT_TOKENIZER")
+    io_executor_workers: int = Field(8, env="IO_EXECUTOR_WORKERS")
+    inference_executor_workers: int = Field(1, env="INFERENCE_EXECUTOR_WORKERS")
+    search_cache_max_entries: int = Field(1024, env="SEARCH_CACHE_MAX_ENTRIES")
+    answer_cache_max_entries: int = Field(512, env="ANSWER_CACHE_MAX_ENTRIES")
+    answer_cache_threshold: float = Field(0.95, env="ANSWER_CACHE_THRESHOLD")
+    query_cache_ttl_seconds: Optional[float] = Field(3600.0, env="QUERY_CACHE_TTL_SECONDS")
+    ingest_job_workers: int = Field(1, env="INGEST_JOB_WORKERS")
+    ingest_job_queue_size: int = Field(16, env="INGEST_JOB_QUEUE_SIZE")
+    ingest_job_history: int = Field(256, env="INGEST_JOB_HISTORY")
+    batch_max_queries: int = Field(256, env="BATCH_MAX_QUERIES")
+    batch_llm_concurrency: int = Field(4, env="BATCH_LLM_CONCURRENCY")
+    max_upload_bytes: int = Field(50 * 1024 * 1024, env="MAX_UPLOAD_BYTES")
+    upload_spool_dir: Optional[str] = Field(None, env="UPLOAD_SPOOL_DIR")
     pdf: Optional[str] = Field(None, alias="PDF")
     default_document_path: str = "/app/data/coaching.pdf"
 
@@ -38,6 +94,10 @@ class Settings(BaseSettings):
     llm_base_url: str = Field("http://host.docker.internal:11434/v1", env="LLM_BASE_URL")
     llm_api_key: str = Field("ollama", env="LLM_API_KEY")
     llm_timeout: int = Field(30, env="LLM_TIMEOUT")
+    llm_connect_timeout: float = Field(5.0, env="LLM_CONNECT_TIMEOUT")
+    llm_max_connections: int = Field(20, env="LLM_MAX_CONNECTIONS")
+    llm_max_keepalive_connections: int = Field(10, env="LLM_MAX_KEEPALIVE_CONNECTIONS")
+    llm_keepalive_expiry: float = Field(60.0, env="LLM_KEEPALIVE_EXPIRY")
     max_tokens: int = Field(512, env="MAX_TOKENS")
     embedding_dim: int = Field(384, env="EMBEDDING_DIM") 
 
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import Filter, PointStruct
+
+from ..config.settings import settings
+from ..exceptions.rag_exceptions import RAGVectorStoreError
+from ..utils.metrics import vector_store_operation_duration
+from . import qdrant_common as qc
+from .search_options import DEFAULT_SEARCH, SearchOptions
+from .vector_backend import CollectionInfo, DocumentState, VectorBackend
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def _timed(operation: str) -> AsyncIterator[None]:
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        vector_store_operation_duration.labels(operation=operation).observe(time.perf_counter() - began)
+
+
+class AsyncVectorStore(VectorBackend):
+    """
+    Qdrant vector store on ``AsyncQdrantClient``, awaited on the event loop.
+
+    Same collections, payloads and filters as ``VectorStore`` (both build
+    their requests with ``qdrant_common``), but no call occupies an I/O pool thread, so many
+    searches and upserts can be in flight on one connection pool. For a
+    remote server the client uses settings.qdrant_timeout, and either gRPC
+    (settings.qdrant_prefer_grpc, one multiplexed channel) or a REST pool
+    of settings.qdrant_pool_size keep-alive connections.
+
+    Call ``connect()`` once on the running loop to load the collection
+    registry, and ``close()`` on shutdown. Every call's latency is recorded
+    in ``vector_store_operation_duration_seconds`` by operation.
+    """
+
+    def __init__(self, client: Optional[AsyncQdrantClient] = None) -> None:
+        super().__init__()
+        self._collections: Dict[str, CollectionInfo] = {}
+        try:
+            self.client = client or AsyncQdrantClient(**self._client_kwargs())
+        except Exception as exc:
+            raise RAGVectorStoreError("Failed to initialize vector store") from exc
+
+    @staticmethod
+    def _client_kwargs() -> Dict[str, Any]:
+        kwargs = qc.connection_kwargs()
+        if "url" not in kwargs:
+            return kwargs
+        kwargs.update(
+            prefer_grpc=settings.qdrant_prefer_grpc,
+            grpc_port=settings.qdrant_grpc_port,
+            timeout=settings.qdrant_timeout,
+        )
+        if not settings.qdrant_prefer_grpc:
+            pool = max(1, settings.qdrant_pool_size)
+            kwargs["limits"] = httpx.Limits(max_connections=pool, max_keepalive_connections=pool)
+        return kwargs
+
+    async def connect(self) -> None:
+        try:
+            await self.refresh_collections()
+        except RAGVectorStoreError as exc:
+            logger.warning(f"Could not load collection registry at startup: {exc.message}")
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    # -------------------------
+    # Collections
+    # -------------------------
+    async def refresh_collections(self) -> Dict[str, CollectionInfo]:
+        """Reload metadata for every collection from Qdrant into the registry."""
+        try:
+            async with _timed("refresh_collections"):
+                names = [c.name for c in (await self.client.get_collections()).collections]
+                fresh = {name: await self._describe(name) for name in names}
+        except Exception as exc:
+            raise RAGVectorStoreError("Failed to refresh collection registry") from exc
+        self._collections = fresh
+        qc.log_dimension_mismatches(fresh, self._dim)
+        return fresh
+
+    async def _describe(self, name: str) -> CollectionInfo:
+        collection = await self.client.get_collection(collection_name=name)
+        await self._ensure_payload_indexes(name, collection.payload_schema or {})
+        return qc.collection_info(name, collection)
+
+    async def get_or_create_collection(self, name: str) -> CollectionInfo:
+        info = self._collections.get(name)
+        if qc.is_fresh(info):
+            return self._check_dimension(info)
+
+        try:
+            if await self.client.collection_exists(collection_name=name):
+                info = await self._describe(name)
+            else:
+                await self.client.create_collection(**qc.create_collection_kwargs(name, self._dim))
+                info = qc.created_collection_info(name, self._dim)
+                await self._ensure_payload_indexes(name, {})
+        except Exception as exc:
+            raise RAGVectorStoreError("Failed to get or create collection", {"name": name}) from exc
+
+        self._collections[name] = info
+        return self._check_dimension(info)
+
+    async def _ensure_payload_indexes(self, name: str, existing: Dict[str, Any]) -> None:
+        for kwargs in qc.missing_payload_indexes(name, existing):
+            try:
+                await self.client.create_payload_index(**kwargs)
+            except Exception as exc:
+                qc.log_payload_index_failure(kwargs, exc)
+
+    async def list_collections(self) -> List[str]:
+        try:
+            async with _timed("list_collections"):
+                return [c.name for c in (await self.client.get_collections()).collections]
+        except Exception as exc:
+            raise RAGVectorStoreError("Failed to list collections") from exc
+
+    # -------------------------
+    # Ingestion
+    # -------------------------
+    async def add_chunks(
+        self,
+        collection_name: str,
+        chunks: List[Dict[str, object]],
+        embeddings: List[List[float]],
+    ) -> None:
+        try:
+            qc.check_lengths(chunks, embeddings)
+            await self.get_or_create_collection(collection_name)
+
+            points = qc.to_points(chunks, embeddings)
+            async with _timed("upsert"):
+                batches = await self._upsert_batches(collection_name, points)
+            self._bump_version(collection_name)
+            qc.upserted(collection_name, len(points), batches)
+        except Exception as exc:
+            logger.error(f"Detailed error while adding chunks to vector store '{collection_name}': {exc}", exc_info=True)
+            raise RAGVectorStoreError(
+                f"Failed to add chunks to vector store for collection {collection_name}: {exc}",
+                {"collection": collection_name, "details": str(exc)}
+            ) from exc
+
+    async def _upsert_batches(self, collection_name: str, points: List[PointStruct]) -> int:
+        """
+        Same ordering as ``VectorStore._upsert_batches``: up to
+        settings.upsert_parallelism batches in flight, then the last batch
+        with wait=True.
+        """
+        batches = qc.upsert_batches(points)
+        if not batches:
+            return 0
+
+        head, last = batches[:-1], batches[-1]
+        in_flight = asyncio.Semaphore(max(1, settings.upsert_parallelism))
+
+        async def upsert(batch: List[PointStruct]) -> None:
+            async with in_flight:
+                await self.client.upsert(collection_name=collection_name, points=batch, wait=settings.upsert_wait)
+
+        await asyncio.gather(*(upsert(batch) for batch in head))
+        await self.client.upsert(collection_name=collection_name, points=last, wait=True)
+        return len(batches)
+
+    # -------------------------
+    # Documents
+    # -------------------------
+    async def _scroll_points(
+        self, collection_name: str, scroll_filter: Filter, fields: List[str]
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        found: List[Tuple[Any, Dict[str, Any]]] = []
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(**qc.scroll_kwargs(collection_name, scroll_filter, fields, offset))
+            found.extend(qc.scrolled(points))
+            if offset is None:
+                return found
+
+    async def document_state(self, collection_name: str, document_id: str) -> DocumentState:
+        try:
+            await self.get_or_create_collection(collection_name)
+            async with _timed("scroll"):
+                points = await self._scroll_points(
+                    collection_name, qc.build_filter({"document_id": document_id}), qc.DOCUMENT_STATE_FIELDS
+                )
+            return self._summarize_document(points)
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to look up document", {"collection": collection_name, "document_id": document_id}
+            ) from exc
+
+    async def document_ids_for(self, collection_name: str, filename: str) -> Set[str]:
+        """Distinct document_ids stored under ``filename``."""
+        try:
+            await self.get_or_create_collection(collection_name)
+            async with _timed("scroll"):
+                points = await self._scroll_points(
+                    collection_name, qc.build_filter({"filename": filename}), ["document_id"]
+                )
+            return qc.document_ids(points)
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to look up documents", {"collection": collection_name, "filename": filename}
+            ) from exc
+
+    async def set_document_payload(self, collection_name: str, document_id: str, payload: Dict[str, Any]) -> None:
+        """Set payload keys on every point of a document."""
+        try:
+            async with _timed("set_payload"):
+                await self.client.set_payload(**qc.set_payload_kwargs(collection_name, document_id, payload))
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to update document payload", {"collection": collection_name, "document_id": document_id}
+            ) from exc
+
+    async def _delete_where(self, collection_name: str, points_filter: Filter) -> int:
+        await self.get_or_create_collection(collection_name)
+        async with _timed("delete"):
+            removed = (
+                await self.client.count(collection_name=collection_name, count_filter=points_filter, exact=True)
+            ).count
+            if not removed:
+                return 0
+            await self.client.delete(**qc.delete_kwargs(collection_name, points_filter))
+        self._bump_version(collection_name)
+        qc.deleted(collection_name, removed)
+        return removed
+
+    async def delete_documents(self, collection_name: str, document_ids: Iterable[str]) -> int:
+        """Delete every point of the given documents; returns the number of points removed."""
+        ids = list(document_ids)
+        if not ids:
+            return 0
+        try:
+            removed = await self._delete_where(collection_name, qc.documents_filter(ids))
+            logger.info(f"Deleted {removed} points of {len(ids)} documents from '{collection_name}'")
+            return removed
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to delete documents", {"collection": collection_name, "document_ids": ids}
+            ) from exc
+
+    async def delete_chunks(self, collection_name: str, document_id: str, chunk_ids: Iterable[str]) -> int:
+        """Delete specific chunks (point ids) of a document."""
+        chunks_filter = qc.chunks_filter(document_id, chunk_ids)
+        if chunks_filter is None:
+            return 0
+        try:
+            removed = await self._delete_where(collection_name, chunks_filter)
+            logger.info(f"Deleted {removed} stale points of document {document_id} from '{collection_name}'")
+            return removed
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to delete chunks", {"collection": collection_name, "document_id": document_id}
+            ) from exc
+
+    # -------------------------
+    # Query
+    # -------------------------
+    async def query(
+        self,
+        collection_name: str,
+        query_embedding: List[float],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> List[Dict[str, object]]:
+        try:
+            await self.get_or_create_collection(collection_name)
+            async with _timed("search"):
+                results = await self.client.search(
+                    **qc.search_kwargs(
+                        collection_name, query_embedding, top_k, self._merge_filter(metadata_filter, options), options
+                    )
+                )
+            return qc.format_hits(results)
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to query vector store", {"collection": collection_name}
+            ) from exc
+
+    async def query_batch(
+        self,
+        collection_name: str,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> List[List[Dict[str, object]]]:
+        """Search for several query vectors in one round trip; results keep the input order."""
+        if not query_embeddings:
+            return []
+        try:
+            await self.get_or_create_collection(collection_name)
+            requests = qc.search_requests(
+                collection_name, query_embeddings, top_k, self._merge_filter(metadata_filter, options), options
+            )
+            async with _timed("search_batch"):
+                batches = await self.client.search_batch(collection_name=collection_name, requests=requests)
+            return [qc.format_hits(results) for results in batches]
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to query vector store", {"collection": collection_name}
+            ) from exc
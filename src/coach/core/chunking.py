@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from ..config.settings import settings
+from .tokenizer import TokenCounter
+
+# (start offset within the page, text)
+Piece = Tuple[int, str]
+
+# End of a sentence: terminal punctuation, optional closing quotes/brackets, then whitespace or end of text
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s|$)")
+_ENDS_WITH_SENTENCE = re.compile(r"[.!?][\"')\]]*\s*$")
+
+
+def character_windows(text: str, chunk_size: int, overlap: int) -> List[Piece]:
+    """Fixed-size character windows with overlap, as ``(start_offset, text)`` pairs."""
+    if not text:
+        return []
+    chunks: List[Piece] = []
+    start = 0
+    text_len = len(text)
+    while start < text_len:
+        end = min(start + chunk_size, text_len)
+        chunks.append((start, text[start:end]))
+        if end == text_len:
+            break
+        start = max(end - overlap, 0)
+    return chunks
+
+
+@dataclass
+class Chunk:
+    """
+    A chunk located by the page and offset where it starts. ``pages`` lists
+    every page its text was taken from; ``continued`` marks a page's tail that
+    was carried over to join the next page (even if no page followed).
+    """
+
+    page: int
+    offset: int
+    text: str
+    pages: Tuple[int, ...]
+    continued: bool = False
+
+
+class Chunker(ABC):
+    """
+    Splits page text into chunks of about ``size`` units (characters or
+    tokens, see ``length``) that repeat ``overlap`` units of their predecessor.
+
+    ``chunk_pages`` splits each page on its own. With ``cross_page``, a
+    page's last chunk, when shorter than settings.chunk_min_ratio of the
+    size, is not emitted by itself: it is prefixed to the next page's first
+    chunk, so short pages and sentences cut by a page break don't end up as
+    fragment chunks. Every chunk is a function of the text of the pages it
+    lists and of the settings in ``fingerprint``; chunk ids cover both.
+    """
+
+    name = ""
+
+    def __init__(self, size: int, overlap: int) -> None:
+        if overlap >= size:
+            raise ValueError(f"Chunk overlap ({overlap}) must be smaller than the chunk size ({size})")
+        self.size = size
+        self.overlap = overlap
+
+    @abstractmethod
+    def split(self, text: str) -> List[Piece]:
+        raise NotImplementedError
+
+    def length(self, text: str) -> int:
+        return len(text)
+
+    def fingerprint(self, cross_page: Optional[bool] = None) -> str:
+        """The settings that shape this chunker's output, as a string."""
+        if cross_page is None:
+            cross_page = settings.chunk_cross_page
+        parts = [self.name, str(self.size), str(self.overlap)]
+        if cross_page:
+            parts += ["cross_page", str(settings.chunk_min_ratio)]
+        return ":".join(parts)
+
+    def split_tail(self, piece: Piece) -> Tuple[Optional[Piece], Optional[Piece]]:
+        """Split a page's last piece into the part to emit now and the part to continue on the next page."""
+        if self.length(piece[1]) < settings.chunk_min_ratio * self.size:
+            return None, piece
+        return piece, None
+
+    def chunk_pages(self, pages: Iterable[Tuple[int, str]], cross_page: Optional[bool] = None) -> Iterator[Chunk]:
+        """Chunk ``(page_number, text)`` pairs in page order; holds at most one page of text."""
+        if cross_page is None:
+            cross_page = settings.chunk_cross_page
+        carry: Optional[Chunk] = None
+        for page, text in pages:
+            pieces = self.split(text)
+            if not pieces:
+                print(f"DEBUG: Page {page} produced 0 chunks with {self.name} chunking "
+                      f"(size={self.size}, overlap={self.overlap})")
+                continue
+            chunks = [Chunk(page, offset, piece, (page,)) for offset, piece in pieces]
+            if carry is not None:
+                first = chunks[0]
+                chunks[0] = Chunk(carry.page, carry.offset, f"{carry.text}\n{first.text}", carry.pages + (page,))
+                carry = None
+            if cross_page:
+                last = chunks.pop()
+                if len(last.pages) == 1:
+                    kept, tail = self.split_tail((last.offset, last.text))
+                else:
+                    # Offsets inside a joined chunk don't map onto one page; carry it whole or not at all
+                    kept, tail = Chunker.split_tail(self, (last.offset, last.text))
+                if kept is not None and tail is not None:
+                    chunks.append(Chunk(page, kept[0], kept[1], last.pages))
+                    carry = Chunk(page, tail[0], tail[1], last.pages, continued=True)
+                elif tail is not None:
+                    carry = Chunk(last.page, last.offset, last.text, last.pages, continued=True)
+                else:
+                    chunks.append(last)
+            yield from chunks
+        if carry is not None:
+            yield carry
+
+
+class CharacterChunker(Chunker):
+    """Fixed character windows (settings.chunk_size / chunk_overlap); the original strategy."""
+
+    name = "character"
+
+    def __init__(self, size: Optional[int] = None, overlap: Optional[int] = None) -> None:
+        super().__init__(size or settings.chunk_size, settings.chunk_overlap if overlap is None else overlap)
+
+    def split(self, text: str) -> List[Piece]:
+        return character_windows(text, self.size, self.overlap)
+
+
+class SentenceChunker(Chunker):
+    """
+    Packs whole sentences into chunks of up to settings.chunk_size
+    characters; each chunk repeats its predecessor's trailing sentences up to
+    settings.chunk_overlap characters. A sentence longer than a chunk is split
+    into character windows. With cross-page chunking, a page's trailing
+    unterminated sentence is carried to finish on the next page.
+    """
+
+    name = "sentence"
+
+    def __init__(self, size: Optional[int] = None, overlap: Optional[int] = None) -> None:
+        super().__init__(size or settings.chunk_size, settings.chunk_overlap if overlap is None else overlap)
+
+    @staticmethod
+    def sentences(text: str) -> List[Tuple[int, int]]:
+        """``(start, end)`` of each sentence, leading whitespace excluded."""
+        ends = [match.end() for match in _SENTENCE_END.finditer(text)] + [len(text)]
+        spans: List[Tuple[int, int]] = []
+        start = 0
+        for end in ends:
+            while start < end and text[start].isspace():
+                start += 1
+            if start < end:
+                spans.append((start, end))
+            start = end
+        return spans
+
+    def split(self, text: str) -> List[Piece]:
+        spans: List[Tuple[int, int]] = []
+        for start, end in self.sentences(text):
+            if end - start <= self.size:
+                spans.append((start, end))
+            else:
+                windows = character_windows(text[start:end], self.size, self.overlap)
+                spans.extend((start + offset, start + offset + len(window)) for offset, window in windows)
+
+        pieces: List[Piece] = []
+        first = 0
+        while first < len(spans):
+            last = first
+            while last + 1 < len(spans) and spans[last + 1][1] - spans[first][0] <= self.size:
+                last += 1
+            start, end = spans[first][0], spans[last][1]
+            pieces.append((start, text[start:end]))
+            if last + 1 == len(spans):
+                break
+            # Step back over trailing sentences that fit in the overlap, always moving forward
+            following = last + 1
+            while following - 1 > first and end - spans[following - 1][0] <= self.overlap:
+                following -= 1
+            first = following
+        return pieces
+
+    def split_tail(self, piece: Piece) -> Tuple[Optional[Piece], Optional[Piece]]:
+        offset, text = piece
+        if not _ENDS_WITH_SENTENCE.search(text):
+            start, _ = self.sentences(text)[-1]
+            if 0 < start and len(text) - start < settings.chunk_min_ratio * self.size:
+                return (offset, text[:start].rstrip()), (offset + start, text[start:])
+        return super().split_tail(piece)
+
+
+class TokenChunker(Chunker):
+    """
+    Windows of settings.chunk_size_tokens tokens of the embedding model's
+    tokenizer (settings.chunk_tokenizer overrides it), overlapping by
+    settings.chunk_overlap_tokens, so no chunk is truncated by the model.
+    """
+
+    name = "token"
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        overlap: Optional[int] = None,
+        counter: Optional[TokenCounter] = None,
+    ) -> None:
+        super().__init__(
+            size or settings.chunk_size_tokens,
+            settings.chunk_overlap_tokens if overlap is None else overlap,
+        )
+        self.counter = counter or _token_counter(settings.chunk_tokenizer or settings.embedding_model)
+
+    def fingerprint(self, cross_page: Optional[bool] = None) -> str:
+        # Without its tokenizer the counter estimates, which splits differently
+        tokenizer = self.counter.tokenizer_name if self.counter.tokenizer is not None else "estimate"
+        return f"{super().fingerprint(cross_page)}:{tokenizer}"
+
+    def length(self, text: str) -> int:
+        return len(self.counter.spans(text))
+
+    def split(self, text: str) -> List[Piece]:
+        tokens = self.counter.spans(text)
+        pieces: List[Piece] = []
+        step = self.size - self.overlap
+        for first in range(0, len(tokens), step):
+            window = tokens[first:first + self.size]
+            start, end = window[0][0], window[-1][1]
+            pieces.append((start, text[start:end]))
+            if first + self.size >= len(tokens):
+                break
+        return pieces
+
+
+@lru_cache(maxsize=4)
+def _token_counter(tokenizer_name: str) -> TokenCounter:
+    return TokenCounter(tokenizer_name)
+
+
+CHUNKERS: Dict[str, Type[Chunker]] = {
+    CharacterChunker.name: CharacterChunker,
+    SentenceChunker.name: SentenceChunker,
+    TokenChunker.name: TokenChunker,
+}
+
+
+def get_chunker(strategy: Optional[str] = None) -> Chunker:
+    """Build the chunker selected by ``strategy`` or settings.chunk_strategy."""
+    name = (strategy or settings.chunk_strategy).lower()
+    if name not in CHUNKERS:
+        raise ValueError(f"Unknown chunk strategy '{name}'; expected one of {', '.join(CHUNKERS)}")
+    return CHUNKERS[name]()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from ..config.settings import settings
+from .tokenizer import TokenCounter
+
+
+@dataclass
+class Passage:
+    """Contiguous text of one page, merged from one or more retrieved chunks."""
+
+    page: object
+    text: str
+    start: Optional[int]
+    end: Optional[int]
+    rank: int
+
+
+def merge_adjacent(sources: List[Dict[str, object]]) -> List[Passage]:
+    """
+    Merge chunks of the same document page whose character spans touch or
+    overlap, keeping the overlapping text once. Passages come back in the
+    order of their best-ranked chunk. Chunks without an ``offset`` (ingested
+    before offsets were stored) are kept as they are, and so are chunks
+    carried across pages (``page_end``), whose text does not end at
+    ``offset + len(text)`` on their first page.
+    """
+    groups: Dict[Tuple[object, ...], List[Tuple[int, int, str]]] = {}
+    passages: List[Passage] = []
+    for rank, source in enumerate(sources):
+        metadata = source.get("metadata") or {}
+        text = source.get("text", "")
+        offset = metadata.get("offset")
+        if "page_end" in metadata:
+            passages.append(Passage(f"{metadata.get('page', '?')}-{metadata['page_end']}", text, None, None, rank))
+            continue
+        if not isinstance(offset, int) or "document_id" not in metadata:
+            passages.append(Passage(metadata.get("page", "?"), text, None, None, rank))
+            continue
+        key = (metadata["document_id"], metadata.get("page"))
+        groups.setdefault(key, []).append((offset, rank, text))
+
+    for (_, page), spans in groups.items():
+        current: Optional[Passage] = None
+        for start, rank, text in sorted(spans):
+            end = start + len(text)
+            if current is not None and start <= current.end:
+                if end > current.end:
+                    current.text += text[current.end - start:]
+                    current.end = end
+                current.rank = min(current.rank, rank)
+                continue
+            current = Passage(page, text, start, end, rank)
+            passages.append(current)
+
+    return sorted(passages, key=lambda p: p.rank)
+
+
+class ContextAssembler:
+    """
+    Builds the prompt context from ranked search hits: adjacent chunks are
+    merged without their overlap, then passages are added in rank order while
+    they fit in ``budget`` tokens (settings.context_token_budget).
+    """
+
+    def __init__(self, counter: Optional[TokenCounter] = None, budget: Optional[int] = None):
+        self.counter = counter or TokenCounter()
+        self.budget = budget or settings.context_token_budget
+
+    def assemble(self, sources: List[Dict[str, object]]) -> str:
+        parts: List[str] = []
+        used = 0
+        for passage in merge_adjacent(sources):
+            part = f"[p{passage.page}] {passage.text}"
+            tokens = self.counter.count(part)
+            if used + tokens > self.budget:
+                if not parts:
+                    # Never send an empty context when the best passage alone is too long
+                    part = self.counter.truncate(part, self.budget)
+                    parts.append(part)
+                    used = self.counter.count(part)
+                continue
+            parts.append(part)
+            used += tokens
+        return "\n\n".join(parts)
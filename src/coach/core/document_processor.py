@@ -1,71 +1,257 @@
-from io import BytesIO
-from typing import Dict, List
-from uuid import uuid4
+from __future__ import annotations
 
-from pypdf import PdfReader
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from io import BytesIO
+from itertools import islice
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+from uuid import UUID, uuid5
 
 from ..config.settings import settings
 from ..exceptions.rag_exceptions import RAGDocumentError
+from ..utils.metrics import pdf_page_extract_failures, pdf_page_extract_seconds
+from .chunking import Chunk, Chunker, character_windows, get_chunker
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+# Raw PDF bytes, or a path to a PDF on disk
+PdfSource = Union[bytes, str, os.PathLike]
+
+T = TypeVar("T")
+
+
+# Namespaces for deterministic ids: documents by filename, chunks by
+# (chunker fingerprint and embedding model, document, page, page content hash, offset)
+DOCUMENT_ID_NAMESPACE = UUID("3c9a7d52-1f4e-5b8a-8d61-2e7f0a9b4c35")
+CHUNK_ID_NAMESPACE = UUID("6f0f3c1e-4b0a-5d8e-9a53-6b1c8e2f4d17")
+
+
+def _split_text_with_offsets(text: str, chunk_size: int, overlap: int) -> List[Tuple[int, str]]:
+    """Fixed-size character windows with overlap, as ``(start_offset, text)`` pairs."""
+    return character_windows(text, chunk_size, overlap)
 
 
 def _split_text_with_overlap(text: str, chunk_size: int, overlap: int) -> List[str]:
-    if not text:
-        return []
-    chunks: List[str] = []
-    start = 0
-    text_len = len(text)
-    while start < text_len:
-        end = min(start + chunk_size, text_len)
-        chunks.append(text[start:end])
-        if end == text_len:
-            break
-        start = max(end - overlap, 0)
-    return chunks
-
-
-def process_pdf_document(filename: str, content: bytes) -> Dict[str, object]:
-    """Extract text from PDF, split into chunks, and attach metadata."""
+    return [chunk for _, chunk in _split_text_with_offsets(text, chunk_size, overlap)]
+
+
+def content_hash(source: PdfSource) -> str:
+    """SHA-256 of the PDF bytes; files are hashed in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    else:
+        with open(source, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def index_hash(document_hash: str, chunking: str, embedding_model: str) -> str:
+    """
+    Hash stamped on a completed ingest: the PDF content plus the chunker
+    fingerprint and embedding model, so a settings change re-indexes it.
+    """
+    return hashlib.sha256(f"{document_hash}:{chunking}:{embedding_model}".encode("utf-8")).hexdigest()
+
+
+def page_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def chunk_page_hash(chunk: Chunk, page_digests: Dict[int, str]) -> str:
+    """
+    The page hash a chunk is stored under: its page's hash, or for a chunk
+    continued across pages a hash of every page it was built from, so it is
+    re-indexed when any of them changes.
+    """
+    if not chunk.continued and len(chunk.pages) == 1:
+        return page_digests[chunk.page]
+    return page_hash("+".join(page_digests[page] for page in chunk.pages))
+
+
+def document_id_for(filename: str) -> str:
+    """Stable id for a document across revisions of the same file."""
+    return str(uuid5(DOCUMENT_ID_NAMESPACE, filename))
+
+
+def chunk_id(document_id: str, page: int, page_digest: str, offset: int, indexing: str) -> str:
+    """
+    Point id of a chunk. ``indexing`` names the chunker fingerprint and
+    embedding model, so chunks built or embedded with other settings get other ids.
+    """
+    return str(uuid5(CHUNK_ID_NAMESPACE, f"{indexing}:{document_id}:{page}:{page_digest}:{offset}"))
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group an iterable into lists of at most ``size`` items."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, max(1, size)))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def _open_pdf(source: PdfSource) -> Iterator[BinaryIO]:
+    # pypdf reads a whole file into memory when given a path; an open file
+    # handle lets it seek and read lazily instead.
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield BytesIO(source)
+    else:
+        with open(source, "rb") as fh:
+            yield fh
+
+
+# Per-worker reader for parallel extraction, opened once by the pool initializer
+_worker_reader: Optional[PdfReader] = None
+
+PageResult = Tuple[int, str, float, Optional[str]]
+
+
+def _init_extract_worker(source: PdfSource) -> None:
+    from pypdf import PdfReader
+
+    global _worker_reader
+    stream = BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else open(source, "rb")
+    _worker_reader = PdfReader(stream)
+
+
+def _extract_pages(reader: PdfReader, start: int, stop: int) -> List[PageResult]:
+    """Extract pages ``[start, stop)`` (0-based); a failing page yields empty text and its error."""
+    results: List[PageResult] = []
+    for index in range(start, stop):
+        began = time.perf_counter()
+        try:
+            text, error = reader.pages[index].extract_text() or "", None
+        except Exception as e:
+            text, error = "", str(e)
+        results.append((index + 1, text, time.perf_counter() - began, error))
+    return results
+
+
+def _extract_worker_range(start: int, stop: int) -> List[PageResult]:
+    return _extract_pages(_worker_reader, start, stop)
+
+
+def _iter_pages_parallel(source: PdfSource, reader: PdfReader, workers: int) -> Iterator[PageResult]:
+    """
+    Extract page ranges in a process pool and yield results in page order.
+
+    Each worker opens the PDF once (pool initializer) and then only receives
+    ``(start, stop)`` ranges. If the pool breaks (e.g. a worker crashes on a
+    malformed page), the remaining pages are extracted serially.
+    """
+    page_count = len(reader.pages)
+    size = max(1, settings.pdf_extract_pages_per_task)
+    starts = list(range(0, page_count, size))
+    stops = [min(start + size, page_count) for start in starts]
+    next_index = 0
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_extract_worker,
+            initargs=(source,),
+        ) as pool:
+            for results in pool.map(_extract_worker_range, starts, stops):
+                yield from results
+                next_index = results[-1][0] if results else next_index
+    except BrokenProcessPool as exc:
+        print(f"DEBUG: Parallel extraction failed ({exc}); continuing serially from page {next_index + 1}")
+        yield from _extract_pages(reader, next_index, page_count)
+
+
+def iter_pdf_pages(source: PdfSource, filename: str = "") -> Iterator[Tuple[int, str]]:
+    """Yield ``(page_number, text)`` for each page with extractable text, in page order.
+
+    With ``settings.pdf_extract_workers > 1`` and enough pages, extraction is
+    spread across a process pool; otherwise pages are extracted one at a time.
+    """
+    from pypdf import PdfReader
+
     try:
-        reader = PdfReader(BytesIO(content))
-        document_id = str(uuid4())
-        all_chunks: List[Dict[str, object]] = []
-
-        print(f"DEBUG: PDF {filename} has {len(reader.pages)} pages")
-
-        for page_index, page in enumerate(reader.pages, start=1):
-            try:
-                page_text = page.extract_text() or ""
-            except Exception:
-                page_text = ""
-                print(f"DEBUG: Failed to extract text from page {page_index}: {e}")
-
-            if not page_text.strip():
-                print(f"DEBUG: Page {page_index} has no extractable text")
-                continue
-
-            chunks = _split_text_with_overlap(
-                page_text, settings.chunk_size, settings.chunk_overlap
-            )
-
-            if not chunks:
-                print(f"DEBUG: Page {page_index} produced 0 chunks with "
-                      f"chunk_size={settings.chunk_size}, overlap={settings.chunk_overlap}")
-
-            for chunk_text in chunks:
-                chunk_id = str(uuid4())
-                all_chunks.append(
-                    {
-                        "id": chunk_id,
-                        "text": chunk_text,
-                        "metadata": {
-                            "document_id": document_id,
-                            "filename": filename,
-                            "page": page_index,
-                        },
-                    }
-                )
-
-        print(f"DEBUG: Total chunks created from {filename}: {len(all_chunks)}")
-        return {"document_id": document_id, "chunks": all_chunks}
+        with _open_pdf(source) as stream:
+            reader = PdfReader(stream)
+            page_count = len(reader.pages)
+            print(f"DEBUG: PDF {filename} has {page_count} pages")
+
+            workers = settings.pdf_extract_workers
+            if workers > 1 and page_count >= settings.pdf_extract_parallel_min_pages:
+                pages = _iter_pages_parallel(source, reader, workers)
+            else:
+                pages = (result for index in range(page_count) for result in _extract_pages(reader, index, index + 1))
+
+            for page_index, page_text, seconds, error in pages:
+                pdf_page_extract_seconds.observe(seconds)
+                if error:
+                    pdf_page_extract_failures.inc()
+                    print(f"DEBUG: Failed to extract text from page {page_index}: {error}")
+
+                if not page_text.strip():
+                    print(f"DEBUG: Page {page_index} has no extractable text")
+                    continue
+
+                yield page_index, page_text
     except Exception as exc:
         raise RAGDocumentError("Failed to process PDF document", {"filename": filename}) from exc
+
+
+def iter_document_chunks(
+    filename: str,
+    source: PdfSource,
+    document_id: str,
+    document_hash: Optional[str] = None,
+    chunker: Optional[Chunker] = None,
+) -> Iterator[Dict[str, object]]:
+    """Lazily extract, split and attach metadata; never holds more than one page of text.
+
+    Pages are split by ``chunker`` (settings.chunk_strategy by default).
+    Every chunk carries the hash of its page's text (see ``chunk_page_hash``
+    for chunks continued across pages). Chunk ids are derived from the
+    chunker's fingerprint, the embedding model, ``document_id``, page, page
+    hash and offset, so a chunk built from the same text with the same
+    settings keeps the same point across re-ingests.
+    """
+    page_digests: Dict[int, str] = {}
+
+    def pages() -> Iterator[Tuple[int, str]]:
+        for page_index, page_text in iter_pdf_pages(source, filename):
+            page_digests[page_index] = page_hash(page_text)
+            yield page_index, page_text
+
+    chunker = chunker or get_chunker()
+    indexing = f"{chunker.fingerprint()}:{settings.embedding_model}"
+    for chunk in chunker.chunk_pages(pages()):
+        page_digest = chunk_page_hash(chunk, page_digests)
+        metadata = {
+            "document_id": document_id,
+            "filename": filename,
+            "page": chunk.page,
+            "page_hash": page_digest,
+            "offset": chunk.offset,
+        }
+        if len(chunk.pages) > 1:
+            metadata["page_end"] = chunk.pages[-1]
+        if document_hash:
+            metadata["content_hash"] = document_hash
+        yield {
+            "id": chunk_id(document_id, chunk.page, page_digest, chunk.offset, indexing),
+            "text": chunk.text,
+            "metadata": metadata,
+        }
+
+
+def process_pdf_document(filename: str, content: PdfSource) -> Dict[str, object]:
+    """Extract text from PDF, split into chunks, and attach metadata."""
+    document_id = document_id_for(filename)
+    all_chunks = list(iter_document_chunks(filename, content, document_id, content_hash(content)))
+    print(f"DEBUG: Total chunks created from {filename}: {len(all_chunks)}")
+    return {"document_id": document_id, "chunks": all_chunks}
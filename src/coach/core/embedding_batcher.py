@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple
+
+from ..config.settings import settings
+from ..utils.metrics import embedding_batch_size, embedding_batch_wait_seconds
+from .executors import ExecutorLayer
+
+if TYPE_CHECKING:
+    from .embeddings import EmbeddingClient
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into one encode call.
+
+    Callers await ``embed(text)``; texts are collected until either
+    ``max_batch_size`` is reached or ``window_ms`` has passed since the first
+    pending text, then the whole batch is embedded in a single
+    ``EmbeddingClient.embed`` call on the inference pool and every caller's
+    future is resolved with its own vector.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingClient,
+        executors: ExecutorLayer,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+    ) -> None:
+        self.embedder = embedder
+        self.executors = executors
+        self.window = (settings.embedding_batch_window_ms if window_ms is None else window_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size or settings.embedding_batch_max_size)
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        embedding_batch_size.observe(len(batch))
+        for _, _, enqueued in batch:
+            embedding_batch_wait_seconds.observe(started - enqueued)
+
+        try:
+            vectors = await self.executors.run_inference(
+                self.embedder.embed, [text for text, _, _ in batch], persist=False
+            )
+        except Exception as exc:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future, _), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..utils.metrics import embedding_cache_bytes, embedding_cache_evictions
+
+KEY_BYTES = 16
+
+
+def embedding_key(model_name: str, text: str) -> bytes:
+    """Compact cache key: 16-byte BLAKE2b digest of model name and text."""
+    return hashlib.blake2b(f"{model_name}\0{text}".encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of embeddings stored in a preallocated float32 slab.
+
+    Vectors live in one ``(max_entries, dim)`` float32 array; the index maps a
+    16-byte key to its slot and insertion time. When the slab is full the
+    least recently used slot is reused. Entries older than ``ttl_seconds``
+    (if set) are dropped on access. Safe to use from executor threads.
+    """
+
+    def __init__(self, dim: int, max_entries: int, ttl_seconds: Optional[float] = None) -> None:
+        self.dim = dim
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds or None
+        self._vectors = np.zeros((self.max_entries, dim), dtype=np.float32)
+        self._index: "OrderedDict[bytes, Tuple[int, float]]" = OrderedDict()
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+        self._row_bytes = dim * self._vectors.itemsize + KEY_BYTES
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def resident_bytes(self) -> int:
+        return len(self._index) * self._row_bytes
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            slot, stored_at = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                self._release(key, "ttl")
+                return None
+            self._index.move_to_end(key)
+            return self._vectors[slot].copy()
+
+    def put(self, key: bytes, vector: np.ndarray) -> None:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                slot = entry[0]
+            else:
+                if not self._free:
+                    self._release(next(iter(self._index)), "capacity")
+                slot = self._free.pop()
+            self._vectors[slot] = vector
+            self._index[key] = (slot, time.monotonic())
+            self._index.move_to_end(key)
+            embedding_cache_bytes.set(self.resident_bytes)
+
+    def _release(self, key: bytes, reason: str) -> None:
+        slot, _ = self._index.pop(key)
+        self._free.append(slot)
+        embedding_cache_evictions.labels(reason=reason).inc()
+        embedding_cache_bytes.set(self.resident_bytes)
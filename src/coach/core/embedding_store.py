@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import fcntl
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..utils.metrics import embedding_store_hits, embedding_store_misses, embedding_store_rows
+from .embedding_cache import KEY_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentEmbeddingStore:
+    """
+    Append-only on-disk embedding store shared by every process on the host.
+
+    Layout under ``<root>/<model>-<dim>/``:
+      vectors.f32  row-major float32 vectors, memory-mapped for reads
+      keys.bin     one 16-byte key per row; its size defines the committed rows
+      .lock        held exclusively by writers while appending
+
+    Writers append vectors before keys, so a reader never sees a key whose
+    vector is not fully on disk. A writer first truncates both files to the
+    committed rows, dropping whatever a crashed writer left half-written. Readers pick up rows appended by other
+    processes lazily, whenever a lookup misses the in-memory index.
+    """
+
+    def __init__(self, root: str, model_name: str, dim: int) -> None:
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.path = Path(root) / f"{slug}-{dim}"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self._vectors_path = self.path / "vectors.f32"
+        self._keys_path = self.path / "keys.bin"
+        self._lock_path = self.path / ".lock"
+        self._row_bytes = dim * np.dtype(np.float32).itemsize
+        self._index: Dict[bytes, int] = {}
+        self._rows = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _refresh(self) -> None:
+        """Index rows committed (by any process) since the last refresh."""
+        try:
+            rows = self._keys_path.stat().st_size // KEY_BYTES
+        except FileNotFoundError:
+            return
+        if rows <= self._rows:
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._rows * KEY_BYTES)
+            data = f.read((rows - self._rows) * KEY_BYTES)
+        for i in range(rows - self._rows):
+            self._index.setdefault(data[i * KEY_BYTES:(i + 1) * KEY_BYTES], self._rows + i)
+        self._rows = rows
+        self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        embedding_store_rows.set(rows)
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                self._refresh()
+            found: List[Optional[np.ndarray]] = []
+            for key in keys:
+                row = self._index.get(key)
+                found.append(np.array(self._mmap[row]) if row is not None else None)
+        hits = sum(1 for vec in found if vec is not None)
+        embedding_store_hits.inc(hits)
+        embedding_store_misses.inc(len(found) - hits)
+        return found
+
+    def put_many(self, vectors: Dict[bytes, np.ndarray]) -> None:
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                new = [(key, vec) for key, vec in vectors.items() if key not in self._index]
+                if not new:
+                    return
+                with open(self._vectors_path, "ab") as vf:
+                    # Drop a torn tail left by a writer that died between the two appends
+                    vf.truncate(self._rows * self._row_bytes)
+                    vf.write(np.stack([vec for _, vec in new]).astype(np.float32, copy=False).tobytes())
+                    vf.flush()
+                    os.fsync(vf.fileno())
+                with open(self._keys_path, "ab") as kf:
+                    # Drop a partial key record too, or every later key would be misaligned
+                    kf.truncate(self._rows * KEY_BYTES)
+                    kf.write(b"".join(key for key, _ in new))
+                self._refresh()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
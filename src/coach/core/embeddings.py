@@ -1,43 +1,90 @@
-from typing import List
+import logging
+from typing import List, Optional
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
 from ..config.settings import settings
 from ..exceptions.rag_exceptions import RAGEmbeddingError
-from ..utils.metrics import embedding_cache_hits
+from ..utils.metrics import embedding_cache_hits, embedding_cache_misses
+from .embedding_cache import EmbeddingCache, embedding_key
+from .embedding_store import PersistentEmbeddingStore
+
+logger = logging.getLogger(__name__)
 
 
 class EmbeddingClient:
     def __init__(self, model_name: str | None = None):
         self.model_name = model_name or settings.embedding_model
         try:
+            # Imported here: torch + transformers take seconds to import
+            from sentence_transformers import SentenceTransformer
+
             self.model = SentenceTransformer(self.model_name)
         except Exception as exc:
             raise RAGEmbeddingError("Failed to load embedding model", {"model": self.model_name}) from exc
-        self._cache: dict[str, List[float]] = {}
+        dim = self.model.get_sentence_embedding_dimension() or settings.embedding_dim
+        self._cache: Optional[EmbeddingCache] = None
+        if settings.embedding_cache_max_entries > 0:
+            self._cache = EmbeddingCache(
+                dim, settings.embedding_cache_max_entries, settings.embedding_cache_ttl_seconds
+            )
+        self._store: Optional[PersistentEmbeddingStore] = None
+        if settings.embedding_store_dir:
+            try:
+                self._store = PersistentEmbeddingStore(settings.embedding_store_dir, self.model_name, dim)
+            except Exception as exc:
+                logger.warning(f"Persistent embedding store disabled: {exc}")
+
+    def embed(self, texts: List[str], persist: bool = True) -> List[List[float]]:
+        """Embed texts, consulting the in-memory cache, then the on-disk store, then the model.
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
+        ``persist=False`` still reads the on-disk store but does not append to
+        it; used for ad-hoc query texts so the store only grows with documents.
+        """
         try:
-            outputs: List[List[float]] = []
-            to_compute: List[str] = []
-            for text in texts:
-                if text in self._cache:
-                    embedding_cache_hits.inc()
-                    outputs.append(self._cache[text])
-                else:
-                    to_compute.append(text)
-            if to_compute:
-                computed = self.model.encode(to_compute, convert_to_numpy=False, normalize_embeddings=True)
-                idx = 0
-                for text in texts:
-                    if text in self._cache:
-                        continue
-                    vec = computed[idx]
-                    idx += 1
-                    self._cache[text] = vec.tolist() if hasattr(vec, 'tolist') else list(vec)
-            for text in texts:
-                outputs.append(self._cache[text])
-            return outputs
+            keys = [embedding_key(self.model_name, text) for text in texts]
+            vectors: List[Optional[np.ndarray]] = [
+                self._cache.get(key) if self._cache is not None else None for key in keys
+            ]
+            hits = sum(1 for vec in vectors if vec is not None)
+            embedding_cache_hits.inc(hits)
+            embedding_cache_misses.inc(len(texts) - hits)
+
+            missing = {key: text for key, text, vec in zip(keys, texts, vectors) if vec is None}
+            if missing:
+                fresh = self._load_persisted(list(missing))
+                # One encode call per batch; duplicates inside the batch are encoded once
+                to_compute = {key: text for key, text in missing.items() if key not in fresh}
+                if to_compute:
+                    computed = self.model.encode(
+                        list(to_compute.values()), convert_to_numpy=True, normalize_embeddings=True
+                    ).astype(np.float32, copy=False)
+                    computed_by_key = dict(zip(to_compute.keys(), computed))
+                    if persist:
+                        self._persist(computed_by_key)
+                    fresh.update(computed_by_key)
+                if self._cache is not None:
+                    for key, vec in fresh.items():
+                        self._cache.put(key, vec)
+                vectors = [vec if vec is not None else fresh[key] for key, vec in zip(keys, vectors)]
+            return [vec.tolist() for vec in vectors]
         except Exception as exc:
             raise RAGEmbeddingError("Failed to compute embeddings") from exc
 
+    def _load_persisted(self, keys: List[bytes]) -> dict:
+        if self._store is None:
+            return {}
+        try:
+            found = self._store.get_many(keys)
+        except Exception as exc:
+            logger.warning(f"Persistent embedding store read failed: {exc}")
+            return {}
+        return {key: vec for key, vec in zip(keys, found) if vec is not None}
+
+    def _persist(self, vectors: dict) -> None:
+        if self._store is None:
+            return
+        try:
+            self._store.put_many(vectors)
+        except Exception as exc:
+            logger.warning(f"Persistent embedding store write failed: {exc}")
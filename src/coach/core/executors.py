@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from ..config.settings import settings
+from ..utils.metrics import executor_queue_depth, executor_wait_seconds
+
+T = TypeVar("T")
+
+
+class MeteredExecutor:
+    """
+    Thread pool that reports how long work waits before a worker picks it up.
+
+    ``executor_queue_depth`` counts calls that were submitted but have not
+    started yet; ``executor_wait_seconds`` observes the submit-to-start delay.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"coach-{name}")
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        executor_queue_depth.labels(pool=self.name).inc()
+
+        def _task() -> T:
+            executor_queue_depth.labels(pool=self.name).dec()
+            executor_wait_seconds.labels(pool=self.name).observe(time.perf_counter() - submitted)
+            return fn(*args, **kwargs)
+
+        return await loop.run_in_executor(self._pool, _task)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+class ExecutorLayer:
+    """
+    Keeps blocking work off the event loop.
+
+    ``io`` serves blocking client calls (Qdrant, file access) and can be
+    wide; ``inference`` serves model calls (SentenceTransformer encode) and
+    is kept small so CPU-bound inference cannot starve the rest of the
+    process. ``rerank`` runs cross-encoder scoring on its own thread: a pass
+    abandoned over its time budget keeps running, and must not hold up
+    embedding.
+    """
+
+    def __init__(self, io_workers: Optional[int] = None, inference_workers: Optional[int] = None) -> None:
+        self.io = MeteredExecutor("io", io_workers or settings.io_executor_workers)
+        self.inference = MeteredExecutor("inference", inference_workers or settings.inference_executor_workers)
+        self.rerank = MeteredExecutor("rerank", 1)
+
+    async def run_io(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.io.run(fn, *args, **kwargs)
+
+    async def run_inference(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.inference.run(fn, *args, **kwargs)
+
+    async def run_rerank(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.rerank.run(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self.io.shutdown(wait=wait)
+        self.inference.shutdown(wait=wait)
+        self.rerank.shutdown(wait=wait)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ..config.settings import settings
+from ..exceptions.rag_exceptions import RAGServiceUnavailable
+from ..utils.metrics import ingest_job_duration, ingest_job_queue_depth, ingest_job_wait, ingest_jobs_total
+from .document_processor import PdfSource
+
+logger = logging.getLogger(__name__)
+
+IngestFn = Callable[..., Awaitable[Dict[str, object]]]
+
+
+@dataclass
+class IngestJob:
+    """State of one queued document ingestion, updated as it runs."""
+
+    id: str
+    filename: str
+    collection_name: Optional[str]
+    source: Optional[PdfSource] = field(default=None, repr=False)
+    # Spooled upload owned by the job; removed once the job finishes
+    spool_path: Optional[str] = None
+    status: str = "queued"  # queued, running, succeeded or failed
+    phase: str = "queued"
+    pages_processed: int = 0
+    chunks_processed: int = 0
+    result: Optional[Dict[str, object]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def update(self, **progress) -> None:
+        """Progress hook passed to ``RAGService.ingest_document``."""
+        for name, value in progress.items():
+            setattr(self, name, value)
+
+    def release(self) -> None:
+        self.source = None
+        if self.spool_path:
+            try:
+                os.unlink(self.spool_path)
+            except FileNotFoundError:
+                pass
+            self.spool_path = None
+
+
+class IngestJobManager:
+    """
+    Runs document ingestion in the background on a bounded worker pool.
+
+    ``submit`` enqueues a job and returns immediately; ``workers`` jobs run
+    concurrently and at most ``queue_size`` wait behind them. When the queue
+    is full, submissions are rejected with ``RAGServiceUnavailable`` instead
+    of piling up. The last ``history`` finished jobs stay queryable.
+    """
+
+    def __init__(
+        self,
+        ingest: IngestFn,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        history: Optional[int] = None,
+    ) -> None:
+        self._ingest = ingest
+        self.workers = max(1, workers or settings.ingest_job_workers)
+        self.queue_size = max(1, queue_size or settings.ingest_job_queue_size)
+        self.history = max(1, history or settings.ingest_job_history)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel running jobs and drop queued ones, removing their spooled files."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            job.status, job.error = "failed", "Cancelled during shutdown"
+            job.release()
+        ingest_job_queue_depth.set(0)
+
+    def submit(
+        self,
+        filename: str,
+        source: PdfSource,
+        collection_name: Optional[str] = None,
+        spool_path: Optional[str] = None,
+    ) -> IngestJob:
+        job = IngestJob(
+            id=uuid.uuid4().hex,
+            filename=filename,
+            collection_name=collection_name,
+            source=source,
+            spool_path=spool_path,
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            ingest_jobs_total.labels(status="rejected").inc()
+            raise RAGServiceUnavailable("Ingestion queue is full, retry later")
+        self.start()
+        self._jobs[job.id] = job
+        self._prune()
+        ingest_jobs_total.labels(status="queued").inc()
+        ingest_job_queue_depth.set(self._queue.qsize())
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            ingest_job_queue_depth.set(self._queue.qsize())
+            try:
+                await self._run(job)
+            finally:
+                job.release()
+
+    async def _run(self, job: IngestJob) -> None:
+        job.status, job.phase, job.started_at = "running", "starting", time.time()
+        ingest_job_wait.observe(job.started_at - job.created_at)
+        try:
+            job.result = await self._ingest(
+                filename=job.filename,
+                content=job.source,
+                collection_name=job.collection_name,
+                progress=job.update,
+            )
+            job.status = "failed" if job.result["status"] == "failed" else "succeeded"
+            if job.status == "failed":
+                job.error = f"Failed to ingest '{job.filename}': {job.result.get('error', 'unknown error')}"
+        except asyncio.CancelledError:
+            job.status, job.error = "failed", "Cancelled during shutdown"
+            raise
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} failed in phase '{job.phase}': {e}")
+            job.status, job.error = "failed", str(e)
+        finally:
+            job.finished_at = time.time()
+            if job.status == "succeeded":
+                job.phase = "done"
+            ingest_jobs_total.labels(status=job.status).inc()
+            ingest_job_duration.labels(status=job.status).observe(job.finished_at - job.started_at)
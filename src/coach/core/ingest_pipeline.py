@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+from ..config.settings import settings
+from .executors import ExecutorLayer
+from .vector_backend import call_store
+
+if TYPE_CHECKING:
+    from .embeddings import EmbeddingClient
+    from .vector_backend import VectorBackend
+
+_DONE = object()
+
+
+class IngestPipeline:
+    """
+    Streams chunk batches through embedding into the vector store.
+
+    Three stages run concurrently, connected by bounded queues:
+
+      extract  pulls the next chunk batch from a lazy generator (I/O pool)
+      embed    encodes a batch (inference pool)
+      upsert   writes a batch with its vectors (I/O pool, or awaited
+               directly for an async vector store)
+
+    While one batch is being upserted the next is embedded and the one after
+    that extracted. At most ``queue_size`` batches wait between stages, so
+    peak memory is set by the batch size rather than the document size.
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingClient,
+        vstore: VectorBackend,
+        executors: ExecutorLayer,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        self.embedder = embedder
+        self.vstore = vstore
+        self.executors = executors
+        self.queue_size = max(1, queue_size or settings.ingest_queue_size)
+
+    async def run(
+        self,
+        batches: Iterator[List[Dict[str, object]]],
+        collection: str,
+        on_written: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Ingest every batch into ``collection``; returns the number of chunks written.
+
+        ``on_written`` is called with the running total after each upsert.
+        """
+        to_embed: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        to_upsert: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def extract() -> None:
+            while True:
+                batch = await self.executors.run_io(next, batches, None)
+                if batch is None:
+                    break
+                await to_embed.put(batch)
+            await to_embed.put(_DONE)
+
+        async def embed() -> None:
+            while (batch := await to_embed.get()) is not _DONE:
+                vectors = await self.executors.run_inference(self.embedder.embed, [c["text"] for c in batch])
+                await to_upsert.put((batch, vectors))
+            await to_upsert.put(_DONE)
+
+        async def upsert() -> int:
+            written = 0
+            while (item := await to_upsert.get()) is not _DONE:
+                batch, vectors = item
+                await call_store(self.executors, self.vstore.add_chunks, collection, batch, vectors)
+                written += len(batch)
+                if on_written:
+                    on_written(written)
+            return written
+
+        tasks = [asyncio.ensure_future(stage()) for stage in (extract, embed, upsert)]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # A failed stage would leave its neighbours blocked on a queue
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return results[-1]
@@ -1,34 +1,96 @@
-from typing import List
+import json
+from typing import AsyncIterator
 
-import requests
+import httpx
 
 from ..config.settings import settings
 from ..exceptions.rag_exceptions import RAGModelUnavailable
 
 
 class LLMClient:
-    def __init__(self, base_url: str | None = None, model: str | None = None, api_key: str | None = None):
+    """
+    Async client for an OpenAI-compatible chat endpoint (e.g. Ollama).
+
+    A single pooled ``httpx.AsyncClient`` is kept for the lifetime of the
+    client so concurrent requests reuse keep-alive connections instead of
+    opening a fresh one per call. The pool is created lazily so it is bound
+    to the event loop that actually serves the requests.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        model: str | None = None,
+        api_key: str | None = None,
+        client: httpx.AsyncClient | None = None,
+    ):
         self.base_url = (base_url or settings.llm_base_url).rstrip('/')
         self.model = model or settings.llm_model
         self.api_key = api_key or settings.llm_api_key
+        self._client = client
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                    keepalive_expiry=settings.llm_keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(settings.llm_timeout, connect=settings.llm_connect_timeout),
+            )
+        return self._client
+
+    def _build_payload(self, prompt: str, system: str | None, max_tokens: int | None, stream: bool) -> dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system or "You are a helpful assistant for RAG."},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": max_tokens or settings.max_tokens,
+            "temperature": 0.1,
+            "stream": stream,
+        }
 
-    def chat(self, prompt: str, system: str | None = None, max_tokens: int | None = None) -> str:
+    async def chat(self, prompt: str, system: str | None = None, max_tokens: int | None = None) -> str:
         try:
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": system or "You are a helpful assistant for RAG."},
-                    {"role": "user", "content": prompt},
-                ],
-                "max_tokens": max_tokens or settings.max_tokens,
-                "temperature": 0.1,
-                "stream": False,
-            }
-            headers = {"Authorization": f"Bearer {self.api_key}"}
-            resp = requests.post(f"{self.base_url}/chat/completions", json=payload, headers=headers, timeout=settings.llm_timeout)
+            payload = self._build_payload(prompt, system, max_tokens, stream=False)
+            resp = await self._get_client().post(f"{self.base_url}/chat/completions", json=payload)
             resp.raise_for_status()
             data = resp.json()
             return data["choices"][0]["message"]["content"].strip()
         except Exception as exc:
             raise RAGModelUnavailable("LLM request failed") from exc
 
+    async def chat_stream(
+        self, prompt: str, system: str | None = None, max_tokens: int | None = None
+    ) -> AsyncIterator[str]:
+        """Yield content deltas as the model generates them (OpenAI SSE format)."""
+        try:
+            payload = self._build_payload(prompt, system, max_tokens, stream=True)
+            async with self._get_client().stream(
+                "POST", f"{self.base_url}/chat/completions", json=payload
+            ) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    line = line.strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    if not choices:
+                        continue
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+        except Exception as exc:
+            raise RAGModelUnavailable("LLM streaming request failed") from exc
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..config.settings import settings
+from ..exceptions.rag_exceptions import RAGVectorStoreError
+from ..utils.metrics import document_chunks_total
+from .search_options import DEFAULT_SEARCH, SearchOptions
+from .vector_backend import CollectionInfo, DocumentState, VectorBackend
+
+logger = logging.getLogger(__name__)
+
+_VECTORS_FILE = "vectors.f32"
+_PAYLOADS_FILE = "payloads.json"
+_MIN_CAPACITY = 1024
+
+
+class _Collection:
+    """
+    One collection on disk: a float32 matrix memory-mapped from a vectors
+    file (unit-length rows, capacity doubled as it fills) and the point ids
+    and payloads of the live rows.
+
+    ``payloads.json`` is a snapshot naming its generation and vectors file.
+    Upserts append their ids and payloads to that generation's
+    ``payloads.<generation>.log``, replayed on load, so a batch costs its own
+    size rather than a rewrite of every payload. A delete writes the
+    compacted matrix to a new vectors file; replacing the snapshot commits
+    both at once, so a crash leaves either the old or the new collection.
+    Files of other generations are leftovers and removed on load.
+
+    Payload values used by filters are materialised as NumPy column arrays on
+    first use and dropped whenever the rows change.
+    """
+
+    def __init__(self, path: str, dim: int) -> None:
+        self.path = path
+        self.dim = dim
+        self.ids: List[Any] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.rows: Dict[Any, int] = {}
+        self.generation = 0
+        self.vectors_file = _VECTORS_FILE
+        self._columns: Dict[Tuple[str, bool], np.ndarray] = {}
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _log_file(self) -> str:
+        return self._file(f"payloads.{self.generation}.log")
+
+    def _load(self) -> None:
+        payloads_path = self._file(_PAYLOADS_FILE)
+        if os.path.exists(payloads_path):
+            with open(payloads_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored["dim"] != self.dim:
+                raise RAGVectorStoreError(
+                    "Collection vector size does not match embedding_dim",
+                    {"path": self.path, "vector_size": stored["dim"], "embedding_dim": self.dim},
+                )
+            self.ids, self.payloads = stored["ids"], stored["payloads"]
+            self.rows = {pid: row for row, pid in enumerate(self.ids)}
+            self.generation = stored.get("generation", 0)
+            self.vectors_file = stored.get("vectors", _VECTORS_FILE)
+            self._replay_log()
+        vectors_path = self._file(self.vectors_file)
+        on_disk = os.path.getsize(vectors_path) // (4 * self.dim) if os.path.exists(vectors_path) else 0
+        self._map(max(_MIN_CAPACITY, on_disk, self.count))
+        if not os.path.exists(payloads_path):
+            self.save()
+        self._remove_leftovers()
+
+    def _replay_log(self) -> None:
+        log_path = self._log_file()
+        if not os.path.exists(log_path):
+            return
+        committed = 0
+        with open(log_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn tail of a crashed append
+                self._record(entry["ids"], entry["payloads"])
+                committed += len(line)
+        with open(log_path, "ab") as f:
+            f.truncate(committed)
+
+    def _remove_leftovers(self) -> None:
+        current = {_PAYLOADS_FILE, self.vectors_file, os.path.basename(self._log_file())}
+        for entry in os.listdir(self.path):
+            leftover = entry.endswith(".tmp") or (
+                entry.startswith(("vectors.", "payloads.")) and entry.endswith((".f32", ".log"))
+            )
+            if leftover and entry not in current:
+                os.remove(self._file(entry))
+
+    def _map(self, capacity: int) -> None:
+        vectors_path = self._file(self.vectors_file)
+        with open(vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self.vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def save(self) -> None:
+        """Flush vectors, then atomically replace the snapshot with a new generation."""
+        self.vectors.flush()
+        old_log = self._log_file()
+        tmp = self._file(_PAYLOADS_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "dim": self.dim,
+                    "generation": self.generation + 1,
+                    "vectors": self.vectors_file,
+                    "ids": self.ids,
+                    "payloads": self.payloads,
+                },
+                f,
+            )
+        os.replace(tmp, self._file(_PAYLOADS_FILE))
+        self.generation += 1
+        if os.path.exists(old_log):
+            os.remove(old_log)
+
+    def _record(self, ids: List[Any], payloads: List[Dict[str, Any]]) -> List[int]:
+        """Assign rows to ``ids`` (new ids at the end) and store their payloads."""
+        rows = []
+        for pid, payload in zip(ids, payloads):
+            row = self.rows.get(pid)
+            if row is None:
+                row = self.rows[pid] = self.count
+                self.ids.append(pid)
+                self.payloads.append(payload)
+            else:
+                self.payloads[row] = payload
+            rows.append(row)
+        self._columns.clear()
+        return rows
+
+    def upsert(self, ids: List[Any], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        """Write vectors, then append the batch to the payload log."""
+        needed = self.count + sum(1 for pid in set(ids) if pid not in self.rows)
+        if needed > self.vectors.shape[0]:
+            self.vectors.flush()
+            self._map(max(needed, 2 * self.vectors.shape[0]))
+        for row, vector in zip(self._record(ids, payloads), vectors):
+            self.vectors[row] = vector
+        self.vectors.flush()
+        with open(self._log_file(), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ids": ids, "payloads": payloads}) + "\n")
+
+    def update_payloads(self, rows: np.ndarray, payload: Dict[str, Any]) -> None:
+        """Update payloads in memory; ``save`` persists them."""
+        for row in rows:
+            self.payloads[row].update(payload)
+        self._columns.clear()
+
+    def delete(self, mask: np.ndarray) -> int:
+        """Drop the rows selected by ``mask``, compacting the rest into a new vectors file."""
+        keep = np.flatnonzero(~mask)
+        removed = self.count - len(keep)
+        if not removed:
+            return 0
+        compacted = self.vectors[keep]
+        old_vectors = self._file(self.vectors_file)
+        self.vectors_file = f"vectors.{self.generation + 1}.f32"
+        self._map(max(_MIN_CAPACITY, len(keep)))
+        self.vectors[:len(keep)] = compacted
+        self.ids = [self.ids[row] for row in keep]
+        self.payloads = [self.payloads[row] for row in keep]
+        self.rows = {pid: row for row, pid in enumerate(self.ids)}
+        self._columns.clear()
+        self.save()
+        os.remove(old_vectors)
+        return removed
+
+    def column(self, key: str, numeric: bool = False) -> np.ndarray:
+        """Payload values of ``key`` for every row; NaN / None where missing."""
+        cached = self._columns.get((key, numeric))
+        if cached is None:
+            values = [payload.get(key) for payload in self.payloads]
+            if numeric:
+                cached = np.array(
+                    [v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values],
+                    dtype=np.float64,
+                )
+            else:
+                cached = np.empty(len(values), dtype=object)
+                cached[:] = values
+            self._columns[(key, numeric)] = cached
+        return cached
+
+
+class NumpyVectorStore(VectorBackend):
+    """
+    In-process exact-search vector store for small corpora.
+
+    Every collection is a memory-mapped float32 matrix under
+    ``settings.numpy_store_dir``. A search is one matrix-vector product over
+    the rows that pass the metadata filter (boolean masks over payload
+    columns), followed by ``argpartition`` for the top k, so results are
+    exact and no network hop is involved. Upserts append to a payload log;
+    deletes and document payload updates rewrite the payload snapshot, which
+    is fine for the few thousand chunks of an embedded deployment but not for
+    large corpora; use the Qdrant backend there.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        super().__init__()
+        self.root = root or settings.numpy_store_dir
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.RLock()
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            for name in self.list_collections():
+                self.get_or_create_collection(name)
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError("Failed to initialize vector store", {"root": self.root}) from exc
+        logger.info(f"Using in-process NumPy vector store at {self.root}")
+
+    # -------------------------
+    # Collections
+    # -------------------------
+    def _collection(self, name: str) -> _Collection:
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self._collections[name] = _Collection(os.path.join(self.root, name), self._dim)
+                document_chunks_total.labels(collection=name).set(collection.count)
+            return collection
+
+    def get_or_create_collection(self, name: str) -> CollectionInfo:
+        self._collection(name)
+        return CollectionInfo(name=name, vector_size=self._dim, distance="Cosine", fetched_at=time.monotonic())
+
+    def list_collections(self) -> List[str]:
+        with self._lock:
+            on_disk = {
+                entry for entry in os.listdir(self.root)
+                if os.path.exists(os.path.join(self.root, entry, _PAYLOADS_FILE))
+            }
+            return sorted(on_disk | set(self._collections))
+
+    # -------------------------
+    # Ingestion and documents
+    # -------------------------
+    def add_chunks(
+        self,
+        collection_name: str,
+        chunks: List[Dict[str, object]],
+        embeddings: List[List[float]],
+    ) -> None:
+        if len(chunks) != len(embeddings):
+            raise RAGVectorStoreError(
+                "Failed to add chunks to vector store",
+                {"collection": collection_name, "chunks": len(chunks), "embeddings": len(embeddings)},
+            )
+        vectors = _unit_rows(embeddings)
+        ids, payloads = [], []
+        for chunk in chunks:
+            payload = {"text": chunk.get("text", "")}
+            md = chunk.get("metadata") or {}
+            if isinstance(md, dict):
+                payload.update(md)
+            ids.append(chunk.get("id"))
+            payloads.append(payload)
+        with self._lock:
+            collection = self._collection(collection_name)
+            collection.upsert(ids, vectors, payloads)
+            self._bump_version(collection_name)
+            document_chunks_total.labels(collection=collection_name).set(collection.count)
+        logger.info(f"Upserted {len(ids)} points into '{collection_name}'")
+
+    def document_state(self, collection_name: str, document_id: str) -> DocumentState:
+        with self._lock:
+            collection = self._collection(collection_name)
+            rows = np.flatnonzero(self._mask(collection, {"document_id": document_id}))
+            return self._summarize_document((collection.ids[row], collection.payloads[row]) for row in rows)
+
+    def document_ids_for(self, collection_name: str, filename: str) -> Set[str]:
+        with self._lock:
+            collection = self._collection(collection_name)
+            mask = self._mask(collection, {"filename": filename})
+            return {doc for doc in collection.column("document_id")[mask] if doc is not None}
+
+    def set_document_payload(self, collection_name: str, document_id: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            collection = self._collection(collection_name)
+            collection.update_payloads(np.flatnonzero(self._mask(collection, {"document_id": document_id})), payload)
+            collection.save()
+
+    def _delete_where(self, collection_name: str, mask_for) -> int:
+        with self._lock:
+            collection = self._collection(collection_name)
+            removed = collection.delete(mask_for(collection))
+            if removed:
+                self._bump_version(collection_name)
+                document_chunks_total.labels(collection=collection_name).set(collection.count)
+            return removed
+
+    def delete_documents(self, collection_name: str, document_ids: Iterable[str]) -> int:
+        ids = list(document_ids)
+        if not ids:
+            return 0
+        removed = self._delete_where(collection_name, lambda c: self._mask(c, {"document_id": ids}))
+        logger.info(f"Deleted {removed} points of {len(ids)} documents from '{collection_name}'")
+        return removed
+
+    def delete_chunks(self, collection_name: str, document_id: str, chunk_ids: Iterable[str]) -> int:
+        stale = {str(chunk_id) for chunk_id in chunk_ids}
+        if not stale:
+            return 0
+
+        def mask_for(collection: _Collection) -> np.ndarray:
+            in_stale = np.fromiter((str(pid) in stale for pid in collection.ids), dtype=bool, count=collection.count)
+            return self._mask(collection, {"document_id": document_id}) & in_stale
+
+        removed = self._delete_where(collection_name, mask_for)
+        logger.info(f"Deleted {removed} stale points of document {document_id} from '{collection_name}'")
+        return removed
+
+    # -------------------------
+    # Query
+    # -------------------------
+    @staticmethod
+    def _mask(collection: _Collection, metadata_filter: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Boolean mask of the rows matching every condition of ``metadata_filter``."""
+        mask = np.ones(collection.count, dtype=bool)
+        for key, value in (metadata_filter or {}).items():
+            if isinstance(value, dict):
+                column = collection.column(key, numeric=True)
+                for op, bound in value.items():
+                    if bound is None:
+                        continue
+                    if op == "gt":
+                        mask &= column > bound
+                    elif op == "gte":
+                        mask &= column >= bound
+                    elif op == "lt":
+                        mask &= column < bound
+                    elif op == "lte":
+                        mask &= column <= bound
+                    else:
+                        raise ValueError(f"Unsupported range operator '{op}'")
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                wanted = set(value)
+                column = collection.column(key)
+                mask &= np.fromiter((v in wanted for v in column), dtype=bool, count=collection.count)
+            else:
+                mask &= collection.column(key) == value
+        return mask
+
+    def _search(
+        self,
+        collection_name: str,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]],
+        options: SearchOptions,
+    ) -> List[List[Dict[str, object]]]:
+        queries = _unit_rows(query_embeddings)
+        with self._lock:
+            collection = self._collection(collection_name)
+            if not collection.count:
+                return [[] for _ in queries]
+            conditions = self._merge_filter(metadata_filter, options)
+            candidates = np.flatnonzero(self._mask(collection, conditions)) if conditions else None
+            matrix = collection.vectors[:collection.count] if candidates is None else collection.vectors[candidates]
+            if not len(matrix):
+                return [[] for _ in queries]
+            scores = queries @ matrix.T
+            k = min(top_k, matrix.shape[0])
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+            results: List[List[Dict[str, object]]] = []
+            for row_scores, row_top in zip(scores, top):
+                hits = []
+                for index in row_top[np.argsort(-row_scores[row_top])]:
+                    score = float(row_scores[index])
+                    if options.score_threshold is not None and score < options.score_threshold:
+                        break
+                    payload = collection.payloads[index if candidates is None else candidates[index]]
+                    hits.append({
+                        "documents": payload.get("text", ""),
+                        "metadatas": {k: v for k, v in payload.items() if k != "text"},
+                        "distances": 1.0 - score,
+                    })
+                results.append(hits)
+            return results
+
+    def query(
+        self,
+        collection_name: str,
+        query_embedding: List[float],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> List[Dict[str, object]]:
+        try:
+            return self._search(collection_name, [query_embedding], top_k, metadata_filter, options)[0]
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError("Failed to query vector store", {"collection": collection_name}) from exc
+
+    def query_batch(
+        self,
+        collection_name: str,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> List[List[Dict[str, object]]]:
+        """All queries are scored with a single matrix-matrix product."""
+        if not query_embeddings:
+            return []
+        try:
+            return self._search(collection_name, query_embeddings, top_k, metadata_filter, options)
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError("Failed to query vector store", {"collection": collection_name}) from exc
+
+
+def _unit_rows(vectors: List[List[float]]) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
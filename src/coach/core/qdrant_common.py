@@ -0,0 +1,308 @@
+"""
+Request building and response formatting shared by the Qdrant stores.
+
+``VectorStore`` (blocking ``QdrantClient``) and ``AsyncVectorStore``
+(``AsyncQdrantClient``) differ only in how they call the client; every
+argument they send and every result they interpret comes from here, so the
+two cannot drift apart.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from qdrant_client.http.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    HasIdCondition,
+    HnswConfigDiff,
+    MatchAny,
+    MatchValue,
+    PayloadSchemaType,
+    PointStruct,
+    Range,
+    SearchParams,
+    SearchRequest,
+)
+
+from ..config.settings import settings
+from ..utils.metrics import document_chunks_total
+from .search_options import SearchOptions
+from .storage_profiles import profile_for
+from .vector_backend import CollectionInfo
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys written by document_processor that filters and document
+# management select on; indexed so filtered searches skip unrelated points.
+PAYLOAD_INDEXES: Dict[str, PayloadSchemaType] = {
+    "document_id": PayloadSchemaType.KEYWORD,
+    "filename": PayloadSchemaType.KEYWORD,
+    "page": PayloadSchemaType.INTEGER,
+    "page_hash": PayloadSchemaType.KEYWORD,
+    "content_hash": PayloadSchemaType.KEYWORD,
+}
+
+# Points fetched per scroll request
+SCROLL_PAGE_SIZE = 256
+# Payload keys document_state reads
+DOCUMENT_STATE_FIELDS = ["page", "page_hash", "content_hash"]
+
+
+# -------------------------
+# Connection and collections
+# -------------------------
+def connection_kwargs() -> Dict[str, Any]:
+    """Client arguments for the connection strategy described on ``VectorStore``."""
+    url = os.getenv("QDRANT_URL", "").strip()
+    api_key = os.getenv("QDRANT_API_KEY", "").strip()
+    embedded_flag = os.getenv("QDRANT_EMBEDDED", "").strip()
+
+    if url:
+        kwargs: Dict[str, Any] = {"url": url}
+        if api_key:
+            kwargs["api_key"] = api_key
+        logger.info(f"Connecting to Qdrant at {url}")
+        return kwargs
+    if embedded_flag and embedded_flag.lower() not in ("0", "false", "no"):
+        path = os.getenv("QDRANT_PATH", "./data/qdrant")
+        os.makedirs(path, exist_ok=True)
+        logger.info(f"Starting embedded Qdrant at {path}")
+        return {"path": path}
+    logger.info("Connecting to Qdrant at http://localhost:6333")
+    return {"url": "http://localhost:6333"}
+
+
+def is_fresh(info: Optional[CollectionInfo]) -> bool:
+    """Whether a registry entry can be used without re-fetching (settings.collection_cache_ttl_seconds)."""
+    ttl = settings.collection_cache_ttl_seconds
+    return info is not None and (ttl <= 0 or time.monotonic() - info.fetched_at < ttl)
+
+
+def collection_info(name: str, collection) -> CollectionInfo:
+    """Registry entry for a ``get_collection`` response."""
+    if collection.points_count is not None:
+        # Approximate count that comes for free with the metadata fetch
+        document_chunks_total.labels(collection=name).set(collection.points_count)
+    vectors = collection.config.params.vectors
+    if isinstance(vectors, dict):
+        # Named vectors: the store only ever writes the default (unnamed) vector
+        vectors = vectors.get("") or next(iter(vectors.values()))
+    distance = getattr(vectors.distance, "value", vectors.distance)
+    return CollectionInfo(name=name, vector_size=int(vectors.size), distance=str(distance), fetched_at=time.monotonic())
+
+
+def log_dimension_mismatches(collections: Dict[str, CollectionInfo], dim: int) -> None:
+    for info in collections.values():
+        if info.vector_size != dim:
+            logger.error(
+                f"Collection '{info.name}' has vector size {info.vector_size}, "
+                f"but embedding_dim is {dim}; it cannot be used until recreated."
+            )
+
+
+def hnsw_config(name: str) -> Optional[HnswConfigDiff]:
+    """Index-time HNSW parameters: COLLECTION_HNSW_CONFIG overrides HNSW_M / HNSW_EF_CONSTRUCT."""
+    config = {"m": settings.hnsw_m, "ef_construct": settings.hnsw_ef_construct}
+    config.update(settings.collection_hnsw_config.get(name, {}))
+    config = {k: v for k, v in config.items() if v is not None}
+    return HnswConfigDiff(**config) if config else None
+
+
+def create_collection_kwargs(name: str, dim: int) -> Dict[str, Any]:
+    """``create_collection`` arguments: the collection's storage profile and HNSW config."""
+    return {"collection_name": name, "hnsw_config": hnsw_config(name), **profile_for(name).collection_kwargs(dim)}
+
+
+def created_collection_info(name: str, dim: int) -> CollectionInfo:
+    """Registry entry for a collection just created with ``create_collection_kwargs``."""
+    logger.info(f"Created Qdrant collection '{name}' (dim={dim}, distance=COSINE, profile={profile_for(name).name})")
+    return CollectionInfo(name=name, vector_size=dim, distance=Distance.COSINE.value, fetched_at=time.monotonic())
+
+
+def missing_payload_indexes(name: str, existing: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """``create_payload_index`` arguments for each indexed key ``existing`` lacks."""
+    return [
+        {"collection_name": name, "field_name": field_name, "field_schema": schema, "wait": False}
+        for field_name, schema in PAYLOAD_INDEXES.items()
+        if field_name not in existing
+    ]
+
+
+def log_payload_index_failure(kwargs: Dict[str, Any], exc: Exception) -> None:
+    # Searches still work unindexed, only slower
+    logger.warning(f"Could not create payload index '{kwargs['field_name']}' on '{kwargs['collection_name']}': {exc}")
+
+
+# -------------------------
+# Ingestion
+# -------------------------
+def check_lengths(chunks: List[Dict[str, object]], embeddings: List[List[float]]) -> None:
+    if len(chunks) != len(embeddings):
+        raise ValueError(f"chunks ({len(chunks)}) and embeddings ({len(embeddings)}) length mismatch")
+
+
+def to_points(chunks: List[Dict[str, object]], embeddings: List[List[float]]) -> List[PointStruct]:
+    points: List[PointStruct] = []
+    for i, chunk in enumerate(chunks):
+        cid = chunk.get("id")
+        pid = cid if isinstance(cid, (int, str)) else str(cid) if cid is not None else None
+
+        payload = {"text": chunk.get("text", "")}
+        md = chunk.get("metadata") or {}
+        if isinstance(md, dict):
+            payload.update(md)
+
+        points.append(PointStruct(id=pid, vector=embeddings[i], payload=payload))
+    return points
+
+
+def upsert_batches(points: List[PointStruct]) -> List[List[PointStruct]]:
+    """Points split into batches of settings.upsert_batch_size."""
+    size = max(1, settings.upsert_batch_size)
+    return [points[i:i + size] for i in range(0, len(points), size)]
+
+
+def upserted(collection_name: str, points: int, batches: int) -> None:
+    # Kept incrementally; re-synced from Qdrant's approximate count on registry refresh
+    document_chunks_total.labels(collection=collection_name).inc(points)
+    logger.info(f"Upserted {points} points into '{collection_name}' in {batches} batches")
+
+
+# -------------------------
+# Documents
+# -------------------------
+def scroll_kwargs(collection_name: str, scroll_filter: Filter, fields: List[str], offset) -> Dict[str, Any]:
+    return {
+        "collection_name": collection_name,
+        "scroll_filter": scroll_filter,
+        "limit": SCROLL_PAGE_SIZE,
+        "offset": offset,
+        "with_payload": fields,
+        "with_vectors": False,
+    }
+
+
+def scrolled(points) -> List[Tuple[Any, Dict[str, Any]]]:
+    """``(point_id, payload)`` of one scroll page."""
+    return [(point.id, point.payload or {}) for point in points]
+
+
+def document_ids(points: Iterable[Tuple[Any, Dict[str, Any]]]) -> Set[str]:
+    return {payload["document_id"] for _, payload in points if "document_id" in payload}
+
+
+def set_payload_kwargs(collection_name: str, document_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "collection_name": collection_name,
+        "payload": payload,
+        "points": build_filter({"document_id": document_id}),
+        "wait": True,
+    }
+
+
+def delete_kwargs(collection_name: str, points_filter: Filter) -> Dict[str, Any]:
+    return {"collection_name": collection_name, "points_selector": FilterSelector(filter=points_filter), "wait": True}
+
+
+def deleted(collection_name: str, removed: int) -> None:
+    document_chunks_total.labels(collection=collection_name).dec(removed)
+
+
+def documents_filter(document_ids: List[str]) -> Filter:
+    return Filter(must=[FieldCondition(key="document_id", match=MatchAny(any=document_ids))])
+
+
+def chunks_filter(document_id: str, chunk_ids: Iterable[str]) -> Optional[Filter]:
+    ids = list(chunk_ids)
+    if not ids:
+        return None
+    return Filter(
+        must=[
+            FieldCondition(key="document_id", match=MatchValue(value=document_id)),
+            HasIdCondition(has_id=ids),
+        ]
+    )
+
+
+# -------------------------
+# Query
+# -------------------------
+def build_filter(metadata_filter: Optional[Dict[str, Any]]) -> Optional[Filter]:
+    """
+    All conditions must hold. A value matches exactly; a list or set matches
+    any of its items; a dict of ``gt``/``gte``/``lt``/``lte`` is a range.
+    """
+    if not metadata_filter:
+        return None
+    conditions = []
+    for k, v in metadata_filter.items():
+        if isinstance(v, dict):
+            conditions.append(FieldCondition(key=k, range=Range(**v)))
+        elif isinstance(v, (list, tuple, set, frozenset)):
+            conditions.append(FieldCondition(key=k, match=MatchAny(any=list(v))))
+        else:
+            conditions.append(FieldCondition(key=k, match=MatchValue(value=v)))
+    return Filter(must=conditions)
+
+
+def search_params(collection_name: str, options: SearchOptions) -> Optional[SearchParams]:
+    params = profile_for(collection_name).search_params()
+    if options.hnsw_ef is None and not options.exact:
+        return params
+    return (params or SearchParams()).model_copy(update={"hnsw_ef": options.hnsw_ef, "exact": options.exact})
+
+
+def search_kwargs(
+    collection_name: str,
+    query_embedding: List[float],
+    top_k: int,
+    query_filter: Optional[Dict[str, Any]],
+    options: SearchOptions,
+) -> Dict[str, Any]:
+    return {
+        "collection_name": collection_name,
+        "query_vector": query_embedding,
+        "limit": top_k,
+        "with_payload": True,
+        "query_filter": build_filter(query_filter),
+        "search_params": search_params(collection_name, options),
+        "score_threshold": options.score_threshold,
+    }
+
+
+def search_requests(
+    collection_name: str,
+    query_embeddings: List[List[float]],
+    top_k: int,
+    query_filter: Optional[Dict[str, Any]],
+    options: SearchOptions,
+) -> List[SearchRequest]:
+    q_filter = build_filter(query_filter)
+    params = search_params(collection_name, options)
+    return [
+        SearchRequest(
+            vector=list(embedding),
+            limit=top_k,
+            with_payload=True,
+            filter=q_filter,
+            params=params,
+            score_threshold=options.score_threshold,
+        )
+        for embedding in query_embeddings
+    ]
+
+
+def format_hits(results) -> List[Dict[str, object]]:
+    formatted: List[Dict[str, object]] = []
+    for p in results:
+        payload = p.payload or {}
+        text = payload.get("text", "")
+        meta = {k: v for k, v in payload.items() if k != "text"}
+        distance = 1.0 - float(p.score) if p.score is not None else None
+        formatted.append({"documents": text, "metadatas": meta, "distances": distance})
+    return formatted
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.metrics import query_cache_hits, query_cache_misses
+
+# A scope is (collection, collection_version, *search options). The
+# collection name always comes first so a whole collection can be dropped.
+Scope = Tuple[Any, ...]
+
+
+def _query_hash(query: str) -> bytes:
+    return hashlib.blake2b(query.encode("utf-8"), digest_size=16).digest()
+
+
+class SearchResultCache:
+    """
+    Tier 1: exact-match LRU cache of retrieval results.
+
+    Keyed by scope plus a hash of the query text, so a repeated question in
+    the same collection version skips the vector search entirely.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds or None
+        self._entries: "OrderedDict[Tuple[Scope, bytes], Tuple[float, List[Dict[str, object]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scope: Scope, query: str) -> Optional[List[Dict[str, object]]]:
+        key = (scope, _query_hash(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                query_cache_misses.labels(tier="search").inc()
+                return None
+            self._entries.move_to_end(key)
+        query_cache_hits.labels(tier="search").inc()
+        return entry[1]
+
+    def put(self, scope: Scope, query: str, sources: List[Dict[str, object]]) -> None:
+        key = (scope, _query_hash(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), sources)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0][0] == collection]:
+                del self._entries[key]
+
+
+class SemanticAnswerCache:
+    """
+    Tier 2: returns a stored answer for a query whose embedding is within a
+    cosine-similarity threshold of an earlier query in the same scope.
+
+    Embeddings are kept in a fixed-size float32 ring buffer (allocated on the
+    first insert, once the dimension is known); lookup is one matrix-vector
+    product restricted to entries of the same scope. Embeddings are expected
+    to be L2-normalised, so the dot product is the cosine similarity.
+    """
+
+    def __init__(self, max_entries: int, threshold: float, ttl_seconds: Optional[float] = None) -> None:
+        self.max_entries = max(1, max_entries)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds or None
+        self._vectors: Optional[np.ndarray] = None
+        self._scope_ids = np.full(self.max_entries, -1, dtype=np.int64)
+        self._stored_at = np.zeros(self.max_entries, dtype=np.float64)
+        self._answers: List[Optional[Dict[str, object]]] = [None] * self.max_entries
+        self._scopes: Dict[Scope, int] = {}
+        self._next_scope_id = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, scope: Scope, embedding: List[float]) -> Optional[Dict[str, object]]:
+        with self._lock:
+            scope_id = self._scopes.get(scope)
+            if scope_id is None or self._vectors is None:
+                query_cache_misses.labels(tier="answer").inc()
+                return None
+            mask = self._scope_ids == scope_id
+            if self.ttl_seconds:
+                mask &= (time.monotonic() - self._stored_at) <= self.ttl_seconds
+            candidates = np.flatnonzero(mask)
+            if candidates.size:
+                sims = self._vectors[candidates] @ np.asarray(embedding, dtype=np.float32)
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    query_cache_hits.labels(tier="answer").inc()
+                    return self._answers[candidates[best]]
+        query_cache_misses.labels(tier="answer").inc()
+        return None
+
+    def store(self, scope: Scope, embedding: List[float], result: Dict[str, object]) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            scope_id = self._scopes.get(scope)
+            if scope_id is None:
+                scope_id = self._scopes[scope] = self._next_scope_id
+                self._next_scope_id += 1
+            slot = self._next
+            self._next = (self._next + 1) % self.max_entries
+            self._vectors[slot] = vector
+            self._scope_ids[slot] = scope_id
+            self._stored_at[slot] = time.monotonic()
+            self._answers[slot] = result
+
+    def invalidate(self, collection: str) -> None:
+        with self._lock:
+            stale = [scope for scope in self._scopes if scope[0] == collection]
+            for scope in stale:
+                scope_id = self._scopes.pop(scope)
+                slots = np.flatnonzero(self._scope_ids == scope_id)
+                self._scope_ids[slots] = -1
+                for slot in slots:
+                    self._answers[slot] = None
@@ -1,18 +1,39 @@
 # core/rag_service.py
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-from uuid import uuid4
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 
 from ..config.settings import settings
-from ..exceptions.rag_exceptions import RAGBadRequest
-from .document_processor import _split_text_with_overlap, process_pdf_document
-from .embeddings import EmbeddingClient
-from .vector_store import VectorStore
+from ..exceptions.rag_exceptions import RAGBadRequest, RAGDocumentError
+from ..utils.metrics import rag_prompt_tokens, rag_service_ready, rerank_duration_seconds, startup_phase_seconds
+from .context_assembler import ContextAssembler
+from .tokenizer import TokenCounter
+from .chunking import get_chunker
+from .document_processor import PdfSource, batched, content_hash, document_id_for, index_hash, iter_document_chunks
+from .embedding_batcher import EmbeddingBatcher
+from .executors import ExecutorLayer
+from .ingest_jobs import IngestJobManager
+from .ingest_pipeline import IngestPipeline
+from .query_cache import SearchResultCache, SemanticAnswerCache
+from .search_options import DEFAULT_SEARCH, SearchOptions
+from .vector_backend import call_store
 from .llm_client import LLMClient
+from .reranker import Reranker
+
+if TYPE_CHECKING:
+    # sentence_transformers and qdrant_client are slow to import; they are
+    # loaded by warmup() so the API can accept connections immediately.
+    from .embeddings import EmbeddingClient
+    from .vector_backend import VectorBackend
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -25,180 +46,500 @@ class QueryResult:
 class RAGService:
     def __init__(self):
         self.embedder: Optional[EmbeddingClient] = None
-        self.vstore: Optional[VectorStore] = None
+        self.batcher: Optional[EmbeddingBatcher] = None
+        self.vstore: Optional[VectorBackend] = None
         self.llm: Optional[LLMClient] = None
+        self.reranker: Optional[Reranker] = None
+        self.context = ContextAssembler()
+        self.pipeline: Optional[IngestPipeline] = None
+        self.executors = ExecutorLayer()
+        self.search_cache: Optional[SearchResultCache] = None
+        if settings.search_cache_max_entries > 0:
+            self.search_cache = SearchResultCache(
+                settings.search_cache_max_entries, settings.query_cache_ttl_seconds
+            )
+        self.answer_cache: Optional[SemanticAnswerCache] = None
+        if settings.answer_cache_max_entries > 0:
+            self.answer_cache = SemanticAnswerCache(
+                settings.answer_cache_max_entries,
+                settings.answer_cache_threshold,
+                settings.query_cache_ttl_seconds,
+            )
+        self._seen_versions: Dict[str, int] = {}
+        self.ready = False
+        self.phase = "not_started"
+        self.error: Optional[str] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.jobs = IngestJobManager(self.ingest_document)
 
     async def initialize(self) -> None:
-        """Initialize embedding client, vector store, and LLM."""
-        self.embedder = EmbeddingClient()
-
-        # Qdrant vector store (no persist_directory)
-        self.vstore = VectorStore()
+        """Initialize embedding client, vector store, and LLM; waits for warmup to finish."""
+        await self.warmup()
 
-        self.llm = LLMClient()
+    def start(self) -> None:
+        """Run warmup in the background; poll ``ready`` / ``phase`` for progress."""
+        self._warmup_task = asyncio.ensure_future(self._background_warmup())
 
-        # Auto-load default PDF if available
-        await self._load_default_document()
+    async def _background_warmup(self) -> None:
+        try:
+            await self.warmup()
+        except Exception as e:
+            logger.error(f"RAG service warmup failed in phase '{self.phase}': {e}")
 
-    async def _load_default_document(self) -> None:
-        pdf_path = settings.pdf
-        if not os.path.exists(pdf_path):
-            print(f"ℹ️ No PDF document found at {pdf_path}")
-            return
+    @contextmanager
+    def _phase(self, name: str):
+        self.phase = name
+        began = time.perf_counter()
+        yield
+        startup_phase_seconds.labels(phase=name).set(time.perf_counter() - began)
 
+    async def warmup(self) -> None:
+        """Load the embedding model, connect the vector store and ingest the default PDF."""
         try:
-            from pypdf import PdfReader
-            reader = PdfReader(pdf_path)
-            total_pages = len(reader.pages)
-            text_pages = 0
-            total_chunks = 0
-
-            document_id = str(uuid4())
-            all_chunks: list[dict] = []
+            with self._phase("load_embedding_model"):
+                from .embeddings import EmbeddingClient
+                self.embedder = await self.executors.run_inference(EmbeddingClient)
+                self.batcher = EmbeddingBatcher(self.embedder, self.executors)
+
+            # Qdrant vector store (no persist_directory)
+            with self._phase("connect_vector_store"):
+                from .vector_backend import create_vector_store
+                self.vstore = await self.executors.run_io(create_vector_store)
+                if hasattr(self.vstore, "connect"):
+                    await self.vstore.connect()
+                self.pipeline = IngestPipeline(self.embedder, self.vstore, self.executors)
+
+            if settings.context_tokenizer:
+                with self._phase("load_tokenizer"):
+                    self.context.counter = await self.executors.run_inference(
+                        TokenCounter, settings.context_tokenizer
+                    )
 
-            print(f"DEBUG: PDF {pdf_path} has {total_pages} pages")
+            if settings.rerank_model:
+                with self._phase("load_reranker"):
+                    try:
+                        self.reranker = await self.executors.run_inference(Reranker)
+                    except Exception as e:
+                        logger.warning(f"Reranking disabled: {e}")
 
-            for page_index, page in enumerate(reader.pages, start=1):
-                try:
-                    page_text = page.extract_text() or ""
-                except Exception:
-                    page_text = ""
+            self.llm = LLMClient()
 
-                if not page_text.strip():
-                    print(f"DEBUG: Page {page_index} has no extractable text")
-                    continue
+            # Auto-load default PDF if available
+            with self._phase("ingest_default_document"):
+                await self._load_default_document()
+        except Exception as e:
+            self.phase, self.error = "failed", str(e)
+            raise
 
-                text_pages += 1
+        self.phase, self.ready = "ready", True
+        rag_service_ready.set(1)
 
-                chunks = _split_text_with_overlap(
-                    page_text, settings.chunk_size, settings.chunk_overlap
-                )
+    async def _load_default_document(self) -> None:
+        pdf_path = settings.pdf
+        if not os.path.exists(pdf_path):
+            print(f"ℹ️ No PDF document found at {pdf_path}")
+            return
 
-                if not chunks:
-                    print(
-                        f"DEBUG: Page {page_index} text too short for chunking "
-                        f"(chunk_size={settings.chunk_size}, overlap={settings.chunk_overlap}). Using full page as one chunk."
-                    )
-                    chunks = [page_text]
-
-                for chunk_text in chunks:
-                    chunk_id = str(uuid4())
-                    all_chunks.append({
-                        "id": chunk_id,
-                        "text": chunk_text,
-                        "metadata": {
-                            "document_id": document_id,
-                            "filename": os.path.basename(pdf_path),
-                            "page": page_index,
-                        },
-                    })
-
-                total_chunks += len(chunks)
-
-            if not all_chunks:
+        try:
+            result = await self.ingest_document(os.path.basename(pdf_path), pdf_path, settings.collection_name)
+            if result["status"] == "unchanged":
+                print(f"✅ PDF {pdf_path} already indexed, skipping ingest")
+            elif not result["chunks_created"]:
                 print(f"⚠️ Loaded PDF but no text chunks could be created")
             else:
-                # Add all chunks to your vector store
-                self.vstore.add_chunks(settings.collection_name, all_chunks, self.embedder.embed([c["text"] for c in all_chunks]))
-                print(f"✅ Loaded PDF {pdf_path} ({text_pages}/{total_pages} pages with text), total chunks: {total_chunks}")
+                print(f"✅ Loaded PDF {pdf_path} ({result['status']}), total chunks: {result['chunks_created']}")
 
         except Exception as e:
             print(f"⚠️ Failed to load PDF {pdf_path}: {e}")
 
     async def cleanup(self) -> None:
-        """Optional cleanup logic for service shutdown."""
-        pass
+        """Stop warmup and release pooled connections held by the service."""
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+        self.ready = False
+        rag_service_ready.set(0)
+        await self.jobs.stop()
+        if self.llm:
+            await self.llm.aclose()
+        if self.vstore is not None:
+            await call_store(self.executors, self.vstore.close)
+        self.executors.shutdown()
 
     async def ingest_document(
         self,
         filename: str,
-        content: bytes,
-        collection_name: Optional[str]
+        content: PdfSource,
+        collection_name: Optional[str],
+        progress: Optional[Callable[..., None]] = None,
     ) -> Dict[str, object]:
-        """Ingest a PDF into the vector store with safety checks."""
+        """
+        Ingest a PDF (bytes or path) into the vector store, streaming it in batches.
+
+        A document is identified by its filename. Identical content ingested
+        with the same chunking and embedding settings is skipped
+        (``unchanged``). For a revised document (``replaced``), only chunks
+        that are not stored yet are embedded and upserted, and stored chunks
+        the new version no longer produces are deleted afterwards. Chunk ids
+        derive from the text they were built from, so a chunk whose page or
+        carried-over text changed gets a new id. A first upload is ``new``.
+
+        ``progress`` receives keyword updates (``phase``, ``pages_processed``,
+        ``chunks_processed``) as ingestion advances. When embedding or writing
+        fails the status is ``failed`` and ``error`` holds the cause.
+        """
         if not filename.lower().endswith(".pdf"):
             raise RAGBadRequest("Only PDF files are supported")
 
-        collection = collection_name or settings.collection_name
-        processed = process_pdf_document(filename, content)
-        chunks = processed.get("chunks", [])
-
-        if not chunks:
-            print(f"⚠️ No chunks extracted from '{filename}'")
-            return {"document_id": processed["document_id"], "chunks_created": 0}
+        def report(**update) -> None:
+            if progress:
+                progress(**update)
 
-        texts = [c.get("text", "") for c in chunks]
+        report(phase="hashing")
 
-        # Generate embeddings
+        collection = collection_name or settings.collection_name
+        document_id = document_id_for(filename)
+        chunker = await self.executors.run_io(get_chunker)
+        try:
+            document_hash = await self.executors.run_io(content_hash, content)
+        except Exception as exc:
+            raise RAGDocumentError("Failed to read PDF document", {"filename": filename}) from exc
+        document_hash = index_hash(document_hash, chunker.fingerprint(), settings.embedding_model)
+
+        stored = await call_store(self.executors, self.vstore.document_state, collection, document_id)
+        result: Dict[str, object] = {
+            "document_id": document_id,
+            "chunks_created": 0,
+            "pages_reindexed": 0,
+            "pages_deleted": 0,
+        }
+        if stored.pages and stored.content_hash == document_hash:
+            return {**result, "status": "unchanged"}
+
+        seen_pages: set = set()
+        seen_chunks: set = set()
+        changed_pages: set = set()
+
+        def changed_chunks():
+            for chunk in iter_document_chunks(filename, content, document_id, chunker=chunker):
+                key = (chunk["metadata"]["page"], chunk["metadata"]["page_hash"])
+                if key not in seen_pages:
+                    seen_pages.add(key)
+                    report(pages_processed=len(seen_pages))
+                seen_chunks.add(chunk["id"])
+                # Chunks left by an unfinished run are written again
+                if chunk["id"] not in stored.complete_chunks:
+                    changed_pages.add(key)
+                    yield chunk
+
+        report(phase="indexing")
         try:
-            embeddings = self.embedder.embed(texts)
+            chunks_created = await self.pipeline.run(
+                batched(changed_chunks(), settings.ingest_batch_size),
+                collection,
+                on_written=lambda written: report(chunks_processed=written),
+            )
+        except RAGDocumentError:
+            raise
         except Exception as e:
-            print(f"⚠️ Failed to generate embeddings for '{filename}': {e}")
-            return {"document_id": processed["document_id"], "chunks_created": 0}
+            print(f"⚠️ Failed to ingest '{filename}' into vector store '{collection}': {e}")
+            return {**result, "status": "failed", "error": str(e)}
 
-        # Validate length
-        if len(chunks) != len(embeddings):
-            print(
-                f"⚠️ Chunk/embedding length mismatch: {len(chunks)} chunks vs {len(embeddings)} embeddings"
-            )
-            return {"document_id": processed["document_id"], "chunks_created": 0}
+        if not seen_pages:
+            print(f"⚠️ No chunks extracted from '{filename}'")
 
-        # Attempt to add to vector store
-        try:
-            self.vstore.add_chunks(collection, chunks, embeddings)
-        except Exception as e:
-            print(f"⚠️ Failed to add chunks to vector store '{collection}': {e}")
-            return {"document_id": processed["document_id"], "chunks_created": 0}
+        report(phase="removing_stale_chunks")
+        # New chunks are searchable before the old ones are removed
+        stale_chunks = stored.chunks - seen_chunks
+        if stale_chunks:
+            await call_store(self.executors, self.vstore.delete_chunks, collection, document_id, stale_chunks)
+        # Stamped only once every chunk is written, so an interrupted run never reads as unchanged
+        await call_store(
+            self.executors, self.vstore.set_document_payload, collection, document_id, {"content_hash": document_hash}
+        )
+        # Versions ingested before documents were keyed by filename
+        legacy = await call_store(self.executors, self.vstore.document_ids_for, collection, filename)
+        await call_store(self.executors, self.vstore.delete_documents, collection, legacy - {document_id})
 
-        return {"document_id": processed["document_id"], "chunks_created": len(chunks)}
+        return {
+            **result,
+            "chunks_created": chunks_created,
+            "pages_reindexed": len(changed_pages),
+            "pages_deleted": len(stored.pages - seen_pages),
+            "status": "replaced" if stored.pages else "new",
+        }
 
-    async def query(
+    async def delete_document(self, document_id: str, collection_name: Optional[str]) -> int:
+        """Remove every chunk of a document; returns the number of chunks deleted."""
+        collection = collection_name or settings.collection_name
+        return await call_store(self.executors, self.vstore.delete_documents, collection, [document_id])
+
+    def _cache_scope(self, collection: str, top_k: int, options: SearchOptions = DEFAULT_SEARCH) -> tuple:
+        """Cache scope for a query; drops cached entries once the collection has changed."""
+        version = self.vstore.collection_version(collection)
+        if self._seen_versions.get(collection, version) != version:
+            if self.search_cache:
+                self.search_cache.invalidate(collection)
+            if self.answer_cache:
+                self.answer_cache.invalidate(collection)
+        self._seen_versions[collection] = version
+        return (collection, version, top_k, options)
+
+    async def _prepare_query(
         self,
         query: str,
         top_k: int,
-        collection_name: Optional[str]
-    ) -> Dict[str, object]:
-        """Run a semantic search query and return LLM response + sources."""
+        collection_name: Optional[str],
+        options: SearchOptions,
+    ) -> Tuple[str, List[float], tuple]:
         if not query.strip():
             raise RAGBadRequest("Query cannot be empty")
 
         collection = collection_name or settings.collection_name
-        q_embed = self.embedder.embed([query])[0]
-        results = self.vstore.query(collection, q_embed, top_k)
+        q_embed = await self.batcher.embed(query)
+        return collection, q_embed, self._cache_scope(collection, top_k, options)
+
+    async def _retrieve(
+        self,
+        query: str,
+        q_embed: List[float],
+        collection: str,
+        scope: tuple
+    ) -> List[Dict[str, object]]:
+        """Return the formatted vector-store hits, served from the search cache when possible."""
+        if self.search_cache:
+            cached = self.search_cache.get(scope, query)
+            if cached is not None:
+                return cached
+
+        _, _, top_k, options = scope
+        results = await call_store(
+            self.executors, self.vstore.query, collection, q_embed, self._candidates(top_k), options=options
+        )
 
-        sources: List[Dict[str, object]] = []
-        for result in results:
-            sources.append({
+        sources = await self._rerank(query, self._format_sources(results), top_k)
+        if sources is None:
+            # Over budget: answer from the vector order, but don't cache it
+            return self._format_sources(results[:top_k])
+        if self.search_cache:
+            self.search_cache.put(scope, query, sources)
+        return sources
+
+    def _candidates(self, top_k: int) -> int:
+        """How many hits to fetch: a wider candidate set when a reranker will cut it down."""
+        return max(top_k, settings.rerank_candidates) if self.reranker else top_k
+
+    async def _rerank(
+        self, query: str, sources: List[Dict[str, object]], top_k: int
+    ) -> Optional[List[Dict[str, object]]]:
+        """
+        The ``top_k`` best sources by cross-encoder score, or None when scoring
+        fails or exceeds settings.rerank_budget_ms.
+        """
+        if not self.reranker or len(sources) <= 1:
+            return sources[:top_k]
+        budget = settings.rerank_budget_ms / 1000 if settings.rerank_budget_ms > 0 else None
+        began = time.perf_counter()
+        try:
+            scores = await asyncio.wait_for(
+                self.executors.run_rerank(self.reranker.score, query, [s["text"] for s in sources]),
+                timeout=budget,
+            )
+        except asyncio.TimeoutError:
+            # The forward pass can't be interrupted; it finishes on the rerank pool, clear of embedding
+            rerank_duration_seconds.labels(outcome="over_budget").observe(time.perf_counter() - began)
+            logger.warning(f"Reranking skipped: over the {settings.rerank_budget_ms:.0f} ms budget")
+            return None
+        except Exception as e:
+            rerank_duration_seconds.labels(outcome="error").observe(time.perf_counter() - began)
+            logger.error(f"Reranking failed: {e}")
+            return None
+        rerank_duration_seconds.labels(outcome="ok").observe(time.perf_counter() - began)
+        order = sorted(range(len(sources)), key=lambda i: scores[i], reverse=True)
+        return [sources[i] for i in order[:top_k]]
+
+    @staticmethod
+    def _format_sources(results: List[Dict[str, object]]) -> List[Dict[str, object]]:
+        return [
+            {
                 "text": result.get("documents", ""),
                 "metadata": result.get("metadatas", {}),
                 "confidence_score": float(max(0.0, 1.0 - result.get("distances", 0.0))),
-            })
-
-        # Context to feed into LLM
-        context_parts = [
-            f"[p{s['metadata'].get('page','?')}] {s['text']}"
-            for s in sources[:5]
+            }
+            for result in results
         ]
-        context = "\n\n".join(context_parts)
+
+    def _build_prompt(self, query: str, sources: List[Dict[str, object]]) -> str:
+        # Context to feed into LLM: overlap-free passages within the token budget
+        context = self.context.assemble(sources)
 
         prompt = (
             "You are an expert coach. Answer based only on the context.\n"
             "If the answer cannot be found in the context, say you don't know.\n\n"
             f"Context:\n{context}\n\nQuestion: {query}\nAnswer:"
         )
+        rag_prompt_tokens.observe(self.context.counter.count(prompt))
+        return prompt
 
-        answer = self.llm.chat(prompt)
-
-        confidence = float(
+    @staticmethod
+    def _confidence(sources: List[Dict[str, object]]) -> float:
+        return float(
             sum(s["confidence_score"] for s in sources) / max(1, len(sources))
         )
 
-        return {
+    async def query(
+        self,
+        query: str,
+        top_k: int,
+        collection_name: Optional[str],
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> Dict[str, object]:
+        """Run a semantic search query and return LLM response + sources."""
+        collection, q_embed, scope = await self._prepare_query(query, top_k, collection_name, options)
+        if self.answer_cache:
+            cached = self.answer_cache.lookup(scope, q_embed)
+            if cached is not None:
+                return cached
+
+        sources = await self._retrieve(query, q_embed, collection, scope)
+        answer = await self.llm.chat(self._build_prompt(query, sources))
+
+        result = {
             "answer": answer,
             "sources": sources,
-            "confidence_score": confidence,
+            "confidence_score": self._confidence(sources),
         }
+        if self.answer_cache:
+            self.answer_cache.store(scope, q_embed, result)
+        return result
+
+    async def query_stream(
+        self,
+        query: str,
+        top_k: int,
+        collection_name: Optional[str],
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> AsyncIterator[Dict[str, object]]:
+        """
+        Run a query and yield events as they become available.
+
+        Emits one ``sources`` event once retrieval is done, a ``token`` event
+        per LLM content delta, and a final ``done`` event with the full answer
+        and its ``completion_tokens`` (counted with the context tokenizer). A
+        semantic cache hit is sent as a single ``token`` event and reports no
+        token count.
+        """
+        collection, q_embed, scope = await self._prepare_query(query, top_k, collection_name, options)
+        cached = self.answer_cache.lookup(scope, q_embed) if self.answer_cache else None
+        if cached is not None:
+            confidence = cached["confidence_score"]
+            yield {"event": "sources", "data": {"sources": cached["sources"], "confidence_score": confidence}}
+            yield {"event": "token", "data": {"content": cached["answer"]}}
+            yield {"event": "done", "data": {"answer": cached["answer"], "confidence_score": confidence}}
+            return
+
+        sources = await self._retrieve(query, q_embed, collection, scope)
+        confidence = self._confidence(sources)
+        yield {"event": "sources", "data": {"sources": sources, "confidence_score": confidence}}
+
+        parts: List[str] = []
+        async for token in self.llm.chat_stream(self._build_prompt(query, sources)):
+            parts.append(token)
+            yield {"event": "token", "data": {"content": token}}
+
+        answer = "".join(parts).strip()
+        if self.answer_cache:
+            self.answer_cache.store(
+                scope, q_embed, {"answer": answer, "sources": sources, "confidence_score": confidence}
+            )
+        yield {
+            "event": "done",
+            "data": {
+                "answer": answer,
+                "confidence_score": confidence,
+                "completion_tokens": self.context.counter.count(answer),
+            },
+        }
+
+    async def query_batch(
+        self,
+        queries: List[str],
+        top_k: int,
+        collection_name: Optional[str],
+        options: SearchOptions = DEFAULT_SEARCH,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, object]]:
+        """
+        Answer many queries, yielding each result as soon as it is ready.
+
+        All queries are embedded in one ``encode`` call, and search-cache
+        misses are retrieved with one batched vector-store request. At most
+        ``concurrency`` LLM generations run at once. Results arrive in
+        completion order and carry the ``index`` of their query; a failed
+        query yields an ``error`` instead of aborting the batch.
+        """
+        if any(not q.strip() for q in queries):
+            raise RAGBadRequest("Query cannot be empty")
+        if not queries:
+            return
+
+        collection = collection_name or settings.collection_name
+        embeddings = await self.executors.run_inference(self.embedder.embed, queries, persist=False)
+        scope = self._cache_scope(collection, top_k, options)
+
+        answered: Dict[int, Dict[str, object]] = {}
+        sources: Dict[int, List[Dict[str, object]]] = {}
+        for i, (query, q_embed) in enumerate(zip(queries, embeddings)):
+            cached = self.answer_cache.lookup(scope, q_embed) if self.answer_cache else None
+            if cached is not None:
+                answered[i] = cached
+                continue
+            hit = self.search_cache.get(scope, query) if self.search_cache else None
+            if hit is not None:
+                sources[i] = hit
+
+        to_search = [i for i in range(len(queries)) if i not in answered and i not in sources]
+        if to_search:
+            batches = await call_store(
+                self.executors,
+                self.vstore.query_batch,
+                collection,
+                [embeddings[i] for i in to_search],
+                self._candidates(top_k),
+                options=options,
+            )
+            for i, results in zip(to_search, batches):
+                reranked = await self._rerank(queries[i], self._format_sources(results), top_k)
+                sources[i] = reranked if reranked is not None else self._format_sources(results[:top_k])
+                if self.search_cache and reranked is not None:
+                    self.search_cache.put(scope, queries[i], sources[i])
+
+        for i, result in answered.items():
+            yield {"index": i, "query": queries[i], **result}
+
+        limit = asyncio.Semaphore(max(1, concurrency or settings.batch_llm_concurrency))
+
+        async def answer(i: int) -> Dict[str, object]:
+            query, hits = queries[i], sources[i]
+            try:
+                async with limit:
+                    text = await self.llm.chat(self._build_prompt(query, hits))
+            except Exception as e:
+                logger.error(f"Batch query {i} failed: {e}")
+                return {"index": i, "query": query, "error": str(e)}
+            result = {"answer": text, "sources": hits, "confidence_score": self._confidence(hits)}
+            if self.answer_cache:
+                self.answer_cache.store(scope, embeddings[i], result)
+            return {"index": i, "query": query, **result}
+
+        tasks = [asyncio.ensure_future(answer(i)) for i in sorted(sources)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def list_collections(self) -> List[str]:
         """Return all collections from vector store."""
-        return self.vstore.list_collections()
+        return await call_store(self.executors, self.vstore.list_collections)
@@ -0,0 +1,36 @@
+import logging
+from typing import List, Optional
+
+from ..config.settings import settings
+from ..exceptions.rag_exceptions import RAGEmbeddingError
+
+logger = logging.getLogger(__name__)
+
+
+class Reranker:
+    """
+    Cross-encoder that scores (query, passage) pairs.
+
+    Unlike the bi-encoder used for retrieval, it reads the query and each
+    passage together, so it orders a small candidate set more accurately;
+    all candidates of a query are scored in one batched forward pass.
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or settings.rerank_model
+        try:
+            # Imported here: torch + transformers take seconds to import
+            from sentence_transformers import CrossEncoder
+
+            self.model = CrossEncoder(self.model_name)
+        except Exception as exc:
+            raise RAGEmbeddingError("Failed to load reranker model", {"model": self.model_name}) from exc
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        """Relevance of each text to ``query``; higher is better."""
+        if not texts:
+            return []
+        scores = self.model.predict(
+            [(query, text) for text in texts], batch_size=len(texts), show_progress_bar=False
+        )
+        return [float(s) for s in scores]
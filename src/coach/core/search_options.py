@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class QueryFilter:
+    """Restricts a search to one document, one filename and/or a page range (inclusive)."""
+
+    document_id: Optional[str] = None
+    filename: Optional[str] = None
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
+
+    def as_metadata_filter(self) -> Dict[str, Any]:
+        """Conditions in the form ``qdrant_common.build_filter`` takes."""
+        conditions: Dict[str, Any] = {}
+        if self.document_id is not None:
+            conditions["document_id"] = self.document_id
+        if self.filename is not None:
+            conditions["filename"] = self.filename
+        pages = {k: v for k, v in (("gte", self.page_from), ("lte", self.page_to)) if v is not None}
+        if pages:
+            conditions["page"] = pages
+        return conditions
+
+
+@dataclass(frozen=True)
+class SearchOptions:
+    """
+    Per-request knobs for a vector search.
+
+    ``hnsw_ef`` widens (recall) or narrows (latency) the HNSW beam, ``exact``
+    bypasses the index for a brute-force scan, and ``score_threshold`` drops
+    hits below a cosine similarity. ``filter`` limits the search to matching
+    chunks, using the payload indexes. Instances are hashable and part of the
+    query cache scope, so results for different options never mix.
+    """
+
+    hnsw_ef: Optional[int] = None
+    exact: bool = False
+    score_threshold: Optional[float] = None
+    filter: Optional[QueryFilter] = None
+
+
+DEFAULT_SEARCH = SearchOptions()
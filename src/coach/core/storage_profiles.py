@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from qdrant_client.http.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from ..config.settings import settings
+
+# Rough per-point cost of the HNSW graph (m=16 links on layer 0, 4-byte ids)
+_HNSW_BYTES_PER_POINT = 16 * 2 * 4
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    How a collection stores its vectors and payloads.
+
+    ``quantization`` keeps a compressed copy of every vector ("scalar" is
+    int8, 4x smaller; "binary" is 1 bit per dimension, 32x smaller) that is
+    searched first. With ``rescore`` the top ``oversampling * limit``
+    candidates are re-ranked against the original float32 vectors, which
+    ``vectors_on_disk`` moves out of RAM. Profiles only apply when a
+    collection is created.
+    """
+
+    name: str
+    quantization: Optional[str] = None  # None, "scalar" or "binary"
+    vectors_on_disk: bool = False
+    payload_on_disk: bool = False
+    oversampling: Optional[float] = None
+    rescore: bool = True
+
+    def collection_kwargs(self, dim: int) -> Dict[str, Any]:
+        """Keyword arguments for ``QdrantClient.create_collection``."""
+        kwargs: Dict[str, Any] = {
+            "vectors_config": VectorParams(size=dim, distance=Distance.COSINE, on_disk=self.vectors_on_disk),
+            "on_disk_payload": self.payload_on_disk,
+        }
+        if self.quantization == "scalar":
+            kwargs["quantization_config"] = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        elif self.quantization == "binary":
+            kwargs["quantization_config"] = BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=True)
+            )
+        return kwargs
+
+    def search_params(self) -> Optional[SearchParams]:
+        if not self.quantization:
+            return None
+        return SearchParams(
+            quantization=QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        )
+
+    def estimated_bytes(self, points: int, dim: int) -> Dict[str, int]:
+        """Approximate RAM and disk used by the vectors of ``points`` points (payload excluded)."""
+        original = points * dim * 4
+        quantized = {"scalar": points * dim, "binary": points * ((dim + 7) // 8)}.get(self.quantization, 0)
+        graph = points * _HNSW_BYTES_PER_POINT
+        ram = quantized + graph + (0 if self.vectors_on_disk else original)
+        disk = original if self.vectors_on_disk else 0
+        return {"ram": ram, "disk": disk}
+
+
+PROFILES: Dict[str, StorageProfile] = {
+    profile.name: profile
+    for profile in (
+        # float32 vectors and payloads in RAM: fastest, largest
+        StorageProfile("default"),
+        # float32 vectors and payloads memory-mapped from disk
+        StorageProfile("on_disk", vectors_on_disk=True, payload_on_disk=True),
+        # int8 vectors in RAM, originals on disk for rescoring
+        StorageProfile("scalar", quantization="scalar", vectors_on_disk=True, payload_on_disk=True,
+                       oversampling=2.0),
+        # 1-bit vectors in RAM; needs more oversampling to recover recall
+        StorageProfile("binary", quantization="binary", vectors_on_disk=True, payload_on_disk=True,
+                       oversampling=3.0),
+    )
+}
+
+
+def get_profile(name: str) -> StorageProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile '{name}'; expected one of {sorted(PROFILES)}") from None
+
+
+def profile_for(collection: str) -> StorageProfile:
+    """The profile configured for ``collection`` (COLLECTION_STORAGE_PROFILES, else STORAGE_PROFILE)."""
+    return get_profile(settings.collection_storage_profiles.get(collection, settings.storage_profile))
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+import math
+import re
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token of English text for BPE tokenizers
+_CHARS_PER_TOKEN = 4
+# Word and punctuation spans, the stand-in for tokens without a tokenizer
+_WORD_OR_MARK = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """
+    Counts tokens with a Hugging Face tokenizer: the LLM's own for prompt
+    budgets (settings.context_tokenizer), the embedding model's for token
+    chunking. Without one, or if it fails to load, counts fall back to a
+    ~4 characters per token estimate and spans to words and punctuation.
+    """
+
+    def __init__(self, tokenizer_name: Optional[str] = None):
+        self.tokenizer = None
+        self.tokenizer_name = tokenizer_name
+        if tokenizer_name:
+            try:
+                from transformers import AutoTokenizer
+
+                self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+            except Exception as e:
+                logger.warning(f"Tokenizer '{tokenizer_name}' unavailable, estimating token counts: {e}")
+
+    def count(self, text: str) -> int:
+        if self.tokenizer is None:
+            return math.ceil(len(text) / _CHARS_PER_TOKEN)
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """``(start, end)`` character offsets of each token of ``text``."""
+        if self.tokenizer is None:
+            return [m.span() for m in _WORD_OR_MARK.finditer(text)]
+        encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        return [(start, end) for start, end in encoding["offset_mapping"] if end > start]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of ``text`` that fits in ``max_tokens``."""
+        if self.tokenizer is None:
+            return text[: max_tokens * _CHARS_PER_TOKEN]
+        ids = self.tokenizer.encode(text, add_special_tokens=False)[:max_tokens]
+        return self.tokenizer.decode(ids)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..config.settings import settings
+from ..exceptions.rag_exceptions import RAGVectorStoreError
+from .search_options import DEFAULT_SEARCH, SearchOptions
+
+if TYPE_CHECKING:
+    from .executors import ExecutorLayer
+
+logger = logging.getLogger(__name__)
+
+
+def _infer_dim_from_model(model_name: Optional[str]) -> int:
+    """
+    Fallback when settings.embedding_dim isn't present.
+    Covers a few common embedders; defaults to 384.
+    """
+    if not model_name:
+        return 384
+    name = model_name.lower()
+    if "all-minilm-l6-v2" in name:
+        return 384
+    if "e5-small" in name:
+        return 384
+    if "e5-base" in name:
+        return 768
+    if "e5-large" in name:
+        return 1024
+    if "text-embedding-3-small" in name:
+        return 1536
+    if "text-embedding-3-large" in name:
+        return 3072
+    return 384
+
+
+@dataclass
+class CollectionInfo:
+    name: str
+    vector_size: int
+    distance: str
+    fetched_at: float
+
+
+PageKey = Tuple[int, Optional[str]]
+
+
+@dataclass
+class DocumentState:
+    """
+    What is stored for a document. ``content_hash`` is the hash of the last
+    completed ingest, None when points disagree or lack it. ``pages`` holds
+    every stored ``(page, page_hash)`` pair and ``chunks`` every point id;
+    ``complete_chunks`` only the ids stamped by a completed ingest, the ones a
+    reindex may skip.
+    """
+
+    content_hash: Optional[str] = None
+    pages: Set[PageKey] = field(default_factory=set)
+    chunks: Set[str] = field(default_factory=set)
+    complete_chunks: Set[str] = field(default_factory=set)
+
+
+class VectorBackend(ABC):
+    """
+    Interface of the vector stores used by RAGService and IngestPipeline.
+
+    Methods are either all blocking (run on the I/O pool) or all coroutines
+    (awaited on the event loop, see AsyncVectorStore); callers go through
+    ``call_store`` so either kind works.
+
+    Search results are dicts with ``documents`` (chunk text), ``metadatas``
+    (the rest of the payload) and ``distances`` (1 - cosine similarity).
+    Metadata filters map payload keys to a value (exact match), a list/set
+    (match any) or a dict of ``gt``/``gte``/``lt``/``lte`` (range).
+
+    The base class tracks the per-collection version that query caches key
+    on; implementations bump it whenever points are written or deleted. A
+    subclass must implement every abstract method to be instantiated.
+    """
+
+    def __init__(self) -> None:
+        # Bumped on every write; caches key their entries on it
+        self._versions: Dict[str, int] = {}
+
+        # Determine embedding dimension
+        self._dim = getattr(settings, "embedding_dim", None)
+        if not isinstance(self._dim, int):
+            self._dim = _infer_dim_from_model(getattr(settings, "embedding_model", None))
+            logger.warning(f"settings.embedding_dim not found; inferring dimension {self._dim}.")
+
+    def collection_version(self, name: str) -> int:
+        """Monotonic per-collection counter, incremented whenever points are written."""
+        return self._versions.get(name, 0)
+
+    def _bump_version(self, name: str) -> None:
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _check_dimension(self, info: CollectionInfo) -> CollectionInfo:
+        if info.vector_size != self._dim:
+            raise RAGVectorStoreError(
+                "Collection vector size does not match embedding_dim",
+                {"name": info.name, "vector_size": info.vector_size, "embedding_dim": self._dim},
+            )
+        return info
+
+    @staticmethod
+    def _summarize_document(points: Iterable[Tuple[Any, Dict[str, Any]]]) -> DocumentState:
+        """
+        ``document_state`` from the ``(point_id, payload)`` pairs of a
+        document's points. Ingestion stamps ``content_hash`` on every point only
+        after all chunks are written and stale ones removed, so a point without
+        it was left by a run that did not finish.
+        """
+        hashes: Set[Optional[str]] = set()
+        state = DocumentState()
+        for point_id, payload in points:
+            hashes.add(payload.get("content_hash"))
+            state.pages.add((payload.get("page"), payload.get("page_hash")))
+            state.chunks.add(str(point_id))
+            if payload.get("content_hash") is not None:
+                state.complete_chunks.add(str(point_id))
+        if len(hashes) == 1:
+            state.content_hash = next(iter(hashes))
+        return state
+
+    @staticmethod
+    def _merge_filter(metadata_filter: Optional[Dict[str, Any]], options: SearchOptions) -> Optional[Dict[str, Any]]:
+        if options.filter is None:
+            return metadata_filter
+        return {**(metadata_filter or {}), **options.filter.as_metadata_filter()}
+
+    def close(self) -> None:
+        """Release connections and threads held by the store."""
+
+    # -------------------------
+    # Collections
+    # -------------------------
+    @abstractmethod
+    def get_or_create_collection(self, name: str) -> CollectionInfo:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_collections(self) -> List[str]:
+        raise NotImplementedError
+
+    # -------------------------
+    # Ingestion and documents
+    # -------------------------
+    @abstractmethod
+    def add_chunks(self, collection_name: str, chunks: List[Dict[str, object]], embeddings: List[List[float]]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def document_state(self, collection_name: str, document_id: str) -> DocumentState:
+        """Return what is stored for a document, see ``DocumentState``."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def document_ids_for(self, collection_name: str, filename: str) -> Set[str]:
+        """Distinct document_ids stored under ``filename``."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_document_payload(self, collection_name: str, document_id: str, payload: Dict[str, Any]) -> None:
+        """Set payload keys on every point of a document."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_documents(self, collection_name: str, document_ids: Iterable[str]) -> int:
+        """Delete every point of the given documents; returns the number of points removed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_chunks(self, collection_name: str, document_id: str, chunk_ids: Iterable[str]) -> int:
+        """Delete specific chunks (point ids) of a document; returns the number of points removed."""
+        raise NotImplementedError
+
+    # -------------------------
+    # Query
+    # -------------------------
+    @abstractmethod
+    def query(
+        self,
+        collection_name: str,
+        query_embedding: List[float],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> List[Dict[str, object]]:
+        raise NotImplementedError
+
+    def query_batch(
+        self,
+        collection_name: str,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> List[List[Dict[str, object]]]:
+        """Search for several query vectors; results keep the input order."""
+        return [
+            self.query(collection_name, embedding, top_k, metadata_filter, options)
+            for embedding in query_embeddings
+        ]
+
+
+async def call_store(executors: ExecutorLayer, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await a coroutine backend method directly; run a blocking one on the I/O pool."""
+    if asyncio.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    return await executors.run_io(fn, *args, **kwargs)
+
+
+def create_vector_store() -> VectorBackend:
+    """Build the backend selected by ``settings.vector_backend`` ("qdrant", "qdrant_async" or "numpy")."""
+    backend = settings.vector_backend.lower()
+    if backend == "qdrant":
+        from .vector_store import VectorStore
+        return VectorStore()
+    if backend == "qdrant_async":
+        from .async_vector_store import AsyncVectorStore
+        return AsyncVectorStore()
+    if backend == "numpy":
+        from .numpy_store import NumpyVectorStore
+        return NumpyVectorStore()
+    raise ValueError(f"Unknown vector backend '{settings.vector_backend}'; expected 'qdrant', 'qdrant_async' or 'numpy'")
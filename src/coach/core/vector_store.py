@@ -2,51 +2,24 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Any
-import os
+from typing import Dict, Iterable, List, Optional, Any, Set
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import (
-    Distance,
-    PointStruct,
-    VectorParams,
-    Filter,
-    FieldCondition,
-    MatchValue,
-)
+from qdrant_client.http.models import Filter, PointStruct
 
 from ..config.settings import settings
 from ..exceptions.rag_exceptions import RAGVectorStoreError
-from ..utils.metrics import document_chunks_total
+from . import qdrant_common as qc
+from .search_options import DEFAULT_SEARCH, SearchOptions
+from .vector_backend import CollectionInfo, DocumentState, VectorBackend
 
 logger = logging.getLogger(__name__)
 
 
-def _infer_dim_from_model(model_name: Optional[str]) -> int:
-    """
-    Fallback when settings.embedding_dim isn't present.
-    Covers a few common embedders; defaults to 384.
-    """
-    if not model_name:
-        return 384
-    name = model_name.lower()
-    if "all-minilm-l6-v2" in name:
-        return 384
-    if "e5-small" in name:
-        return 384
-    if "e5-base" in name:
-        return 768
-    if "e5-large" in name:
-        return 1024
-    if "text-embedding-3-small" in name:
-        return 1536
-    if "text-embedding-3-large" in name:
-        return 3072
-    return 384
-
-
-class VectorStore:
+class VectorStore(VectorBackend):
     """
     Qdrant-backed vector store.
 
@@ -59,58 +32,86 @@ class VectorStore:
       settings.embedding_dim (if present)
       else inferred from settings.embedding_model
       else default 384
+
+    Collection metadata (vector size, distance) is kept in an in-process
+    registry, loaded at startup and updated on create, so searches and
+    upserts don't pay extra round trips; entries are re-fetched after
+    settings.collection_cache_ttl_seconds or on refresh_collections().
+
+    New collections are created with the storage profile configured for them
+    (see core/storage_profiles.py), whose search params are applied to queries.
     """
 
     def __init__(self, client: Optional[QdrantClient] = None) -> None:
+        super().__init__()
+        # name -> CollectionInfo, so searches don't round-trip for metadata
+        self._collections: Dict[str, CollectionInfo] = {}
+        self._registry_lock = threading.Lock()
+        self._upsert_pool: Optional[ThreadPoolExecutor] = None
         try:
             if client:
                 self.client = client
                 logger.info("Using injected QdrantClient.")
-                return
-
-            url = os.getenv("QDRANT_URL", "").strip()
-            api_key = os.getenv("QDRANT_API_KEY", "").strip()
-            embedded_flag = os.getenv("QDRANT_EMBEDDED", "").strip()
-
-            if url:
-                kwargs: Dict[str, Any] = {"url": url}
-                if api_key:
-                    kwargs["api_key"] = api_key
-                self.client = QdrantClient(**kwargs)
-                logger.info(f"Connecting to Qdrant at {url}")
-            elif embedded_flag and embedded_flag.lower() not in ("0", "false", "no"):
-                path = os.getenv("QDRANT_PATH", "./data/qdrant")
-                os.makedirs(path, exist_ok=True)
-                self.client = QdrantClient(path=path)
-                logger.info(f"Starting embedded Qdrant at {path}")
             else:
-                self.client = QdrantClient(url="http://localhost:6333")
-                logger.info("Connecting to Qdrant at http://localhost:6333")
+                self.client = self._connect()
         except Exception as exc:
             raise RAGVectorStoreError("Failed to initialize vector store") from exc
 
-        # Determine embedding dimension
-        self._dim = getattr(settings, "embedding_dim", None)
-        if not isinstance(self._dim, int):
-            self._dim = _infer_dim_from_model(getattr(settings, "embedding_model", None))
-            logger.warning(f"settings.embedding_dim not found; inferring dimension {self._dim}.")
+        try:
+            self.refresh_collections()
+        except RAGVectorStoreError as exc:
+            logger.warning(f"Could not load collection registry at startup: {exc.message}")
+
+    @classmethod
+    def _connect(cls) -> QdrantClient:
+        return QdrantClient(**qc.connection_kwargs())
 
     # -------------------------
     # Collections
     # -------------------------
-    def get_or_create_collection(self, name: str):
+    def refresh_collections(self) -> Dict[str, CollectionInfo]:
+        """Reload metadata for every collection from Qdrant into the registry."""
         try:
-            existing = [c.name for c in self.client.get_collections().collections]
-            if name not in existing:
-                self.client.create_collection(
-                    collection_name=name,
-                    vectors_config=VectorParams(size=self._dim, distance=Distance.COSINE),
-                )
-                logger.info(f"Created Qdrant collection '{name}' (dim={self._dim}, distance=COSINE)")
-            return self.client.get_collection(collection_name=name)
+            names = [c.name for c in self.client.get_collections().collections]
+            fresh = {name: self._describe(name) for name in names}
+        except Exception as exc:
+            raise RAGVectorStoreError("Failed to refresh collection registry") from exc
+        with self._registry_lock:
+            self._collections = fresh
+        qc.log_dimension_mismatches(fresh, self._dim)
+        return fresh
+
+    def _describe(self, name: str) -> CollectionInfo:
+        collection = self.client.get_collection(collection_name=name)
+        self._ensure_payload_indexes(name, collection.payload_schema or {})
+        return qc.collection_info(name, collection)
+
+    def get_or_create_collection(self, name: str) -> CollectionInfo:
+        info = self._collections.get(name)
+        if qc.is_fresh(info):
+            return self._check_dimension(info)
+
+        try:
+            if self.client.collection_exists(collection_name=name):
+                info = self._describe(name)
+            else:
+                self.client.create_collection(**qc.create_collection_kwargs(name, self._dim))
+                info = qc.created_collection_info(name, self._dim)
+                self._ensure_payload_indexes(name, {})
         except Exception as exc:
             raise RAGVectorStoreError("Failed to get or create collection", {"name": name}) from exc
 
+        with self._registry_lock:
+            self._collections[name] = info
+        return self._check_dimension(info)
+
+    def _ensure_payload_indexes(self, name: str, existing: Dict[str, Any]) -> None:
+        for kwargs in qc.missing_payload_indexes(name, existing):
+            try:
+                self.client.create_payload_index(**kwargs)
+            except Exception as exc:
+                qc.log_payload_index_failure(kwargs, exc)
+
     def list_collections(self) -> List[str]:
         try:
             return [c.name for c in self.client.get_collections().collections]
@@ -127,29 +128,13 @@ class VectorStore:
         embeddings: List[List[float]],
     ) -> None:
         try:
-            if len(chunks) != len(embeddings):
-                raise ValueError(
-                    f"chunks ({len(chunks)}) and embeddings ({len(embeddings)}) length mismatch"
-                )
-
+            qc.check_lengths(chunks, embeddings)
             self.get_or_create_collection(collection_name)
 
-            points: List[PointStruct] = []
-            for i, chunk in enumerate(chunks):
-                cid = chunk.get("id")
-                pid = cid if isinstance(cid, (int, str)) else str(cid) if cid is not None else None
-
-                payload = {"text": chunk.get("text", "")}
-                md = chunk.get("metadata") or {}
-                if isinstance(md, dict):
-                    payload.update(md)
-
-                points.append(PointStruct(id=pid, vector=embeddings[i], payload=payload))
-
-            self.client.upsert(collection_name=collection_name, points=points, wait=True)
-            count = self.client.count(collection_name=collection_name, exact=True).count
-            document_chunks_total.labels(collection=collection_name).set(count)
-            logger.info(f"Upserted {len(points)} points into '{collection_name}'. Total={count}")
+            points = qc.to_points(chunks, embeddings)
+            batches = self._upsert_batches(collection_name, points)
+            self._bump_version(collection_name)
+            qc.upserted(collection_name, len(points), batches)
 
         except Exception as exc:
             logger.error(
@@ -164,44 +149,183 @@ class VectorStore:
                 {"collection": collection_name, "details": str(exc)}
             ) from exc
 
+    def _upsert_batches(self, collection_name: str, points: List[PointStruct]) -> int:
+        """
+        Upsert points in batches of settings.upsert_batch_size.
+
+        All but the last batch are sent with up to settings.upsert_parallelism
+        requests in flight (with wait=settings.upsert_wait). The last batch is
+        always sent with wait=True once the others are acknowledged; Qdrant
+        applies operations in order, so when it returns every batch is
+        searchable.
+        """
+        batches = qc.upsert_batches(points)
+        if not batches:
+            return 0
+
+        head, last = batches[:-1], batches[-1]
+        def upsert(batch: List[PointStruct]) -> None:
+            self.client.upsert(collection_name=collection_name, points=batch, wait=settings.upsert_wait)
+
+        if len(head) > 1 and settings.upsert_parallelism > 1:
+            list(self._get_upsert_pool().map(upsert, head))
+        else:
+            for batch in head:
+                upsert(batch)
+        self.client.upsert(collection_name=collection_name, points=last, wait=True)
+        return len(batches)
+
+    def _get_upsert_pool(self) -> ThreadPoolExecutor:
+        if self._upsert_pool is None:
+            self._upsert_pool = ThreadPoolExecutor(
+                max_workers=settings.upsert_parallelism, thread_name_prefix="coach-upsert"
+            )
+        return self._upsert_pool
+
+    def close(self) -> None:
+        """Stop the upsert threads and close the Qdrant connection."""
+        if self._upsert_pool is not None:
+            self._upsert_pool.shutdown(wait=True)
+            self._upsert_pool = None
+        try:
+            self.client.close()
+        except Exception as exc:
+            logger.warning(f"Error while closing Qdrant client: {exc}")
+
     # -------------------------
-    # Query
+    # Documents
     # -------------------------
-    def _build_filter(self, metadata_filter: Optional[Dict[str, Any]]) -> Optional[Filter]:
-        if not metadata_filter:
-            return None
-        conditions = [FieldCondition(key=k, match=MatchValue(value=v)) for k, v in metadata_filter.items()]
-        return Filter(must=conditions)
+    def _scroll_points(self, collection_name: str, scroll_filter: Filter, fields: List[str]):
+        """Yield ``(point_id, payload)`` of every point matching ``scroll_filter``."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(**qc.scroll_kwargs(collection_name, scroll_filter, fields, offset))
+            yield from qc.scrolled(points)
+            if offset is None:
+                return
+
+    def document_state(self, collection_name: str, document_id: str) -> DocumentState:
+        try:
+            self.get_or_create_collection(collection_name)
+            return self._summarize_document(
+                self._scroll_points(
+                    collection_name, qc.build_filter({"document_id": document_id}), qc.DOCUMENT_STATE_FIELDS
+                )
+            )
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to look up document", {"collection": collection_name, "document_id": document_id}
+            ) from exc
 
+    def document_ids_for(self, collection_name: str, filename: str) -> Set[str]:
+        """Distinct document_ids stored under ``filename``."""
+        try:
+            self.get_or_create_collection(collection_name)
+            return qc.document_ids(
+                self._scroll_points(collection_name, qc.build_filter({"filename": filename}), ["document_id"])
+            )
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to look up documents", {"collection": collection_name, "filename": filename}
+            ) from exc
+
+    def set_document_payload(self, collection_name: str, document_id: str, payload: Dict[str, Any]) -> None:
+        """Set payload keys on every point of a document."""
+        try:
+            self.client.set_payload(**qc.set_payload_kwargs(collection_name, document_id, payload))
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to update document payload", {"collection": collection_name, "document_id": document_id}
+            ) from exc
+
+    def _delete_where(self, collection_name: str, points_filter: Filter) -> int:
+        self.get_or_create_collection(collection_name)
+        removed = self.client.count(collection_name=collection_name, count_filter=points_filter, exact=True).count
+        if not removed:
+            return 0
+        self.client.delete(**qc.delete_kwargs(collection_name, points_filter))
+        self._bump_version(collection_name)
+        qc.deleted(collection_name, removed)
+        return removed
+
+    def delete_documents(self, collection_name: str, document_ids: Iterable[str]) -> int:
+        """Delete every point of the given documents; returns the number of points removed."""
+        ids = list(document_ids)
+        if not ids:
+            return 0
+        try:
+            removed = self._delete_where(collection_name, qc.documents_filter(ids))
+            logger.info(f"Deleted {removed} points of {len(ids)} documents from '{collection_name}'")
+            return removed
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to delete documents", {"collection": collection_name, "document_ids": ids}
+            ) from exc
+
+    def delete_chunks(self, collection_name: str, document_id: str, chunk_ids: Iterable[str]) -> int:
+        """Delete specific chunks (point ids) of a document."""
+        chunks_filter = qc.chunks_filter(document_id, chunk_ids)
+        if chunks_filter is None:
+            return 0
+        try:
+            removed = self._delete_where(collection_name, chunks_filter)
+            logger.info(f"Deleted {removed} stale points of document {document_id} from '{collection_name}'")
+            return removed
+        except RAGVectorStoreError:
+            raise
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to delete chunks", {"collection": collection_name, "document_id": document_id}
+            ) from exc
+
+    # -------------------------
+    # Query
+    # -------------------------
     def query(
         self,
         collection_name: str,
         query_embedding: List[float],
         top_k: int,
         metadata_filter: Optional[Dict[str, Any]] = None,
+        options: SearchOptions = DEFAULT_SEARCH,
     ) -> List[Dict[str, object]]:
         try:
             self.get_or_create_collection(collection_name)
-
-            q_filter = self._build_filter(metadata_filter)
-
             results = self.client.search(
-                collection_name=collection_name,
-                query_vector=query_embedding,
-                limit=top_k,
-                with_payload=True,
-                query_filter=q_filter,
+                **qc.search_kwargs(
+                    collection_name, query_embedding, top_k, self._merge_filter(metadata_filter, options), options
+                )
             )
+            return qc.format_hits(results)
+        except Exception as exc:
+            raise RAGVectorStoreError(
+                "Failed to query vector store", {"collection": collection_name}
+            ) from exc
 
-            formatted: List[Dict[str, object]] = []
-            for p in results:
-                payload = p.payload or {}
-                text = payload.get("text", "")
-                meta = {k: v for k, v in payload.items() if k != "text"}
-                distance = 1.0 - float(p.score) if p.score is not None else None
-                formatted.append({"documents": text, "metadatas": meta, "distances": distance})
-
-            return formatted
+    def query_batch(
+        self,
+        collection_name: str,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        options: SearchOptions = DEFAULT_SEARCH,
+    ) -> List[List[Dict[str, object]]]:
+        """Search for several query vectors in one round trip; results keep the input order."""
+        if not query_embeddings:
+            return []
+        try:
+            self.get_or_create_collection(collection_name)
+            requests = qc.search_requests(
+                collection_name, query_embeddings, top_k, self._merge_filter(metadata_filter, options), options
+            )
+            batches = self.client.search_batch(collection_name=collection_name, requests=requests)
+            return [qc.format_hits(results) for results in batches]
         except Exception as exc:
             raise RAGVectorStoreError(
                 "Failed to query vector store", {"collection": collection_name}
@@ -7,6 +7,8 @@ __all__ = [
     'RAGEmbeddingError',
     'RAGVectorStoreError',
     'RAGBadRequest',
+    'RAGServiceUnavailable',
+    'RAGNotFound',
     'RAGInternalError',
 ]
 
@@ -40,6 +40,18 @@ class RAGBadRequest(RAGException):
     pass
 
 
+class RAGServiceUnavailable(RAGException):
+    """Raised when the service cannot take work yet (warming up or saturated)"""
+
+    pass
+
+
+class RAGNotFound(RAGException):
+    """Raised when a requested resource does not exist"""
+
+    pass
+
+
 class RAGInternalError(RAGException):
     """Raised for internal system errors"""
 
@@ -13,3 +13,113 @@ async def test_health():
     assert resp.status_code == 200
     assert resp.json()["status"] == "healthy"
 
+
+
+class _StreamingService:
+    async def query_stream(self, query, top_k, collection_name, options=None):
+        yield {"event": "sources", "data": {"sources": [], "confidence_score": 0.0}}
+        for token in ("Set ", "goals."):
+            yield {"event": "token", "data": {"content": token}}
+        yield {"event": "done", "data": {"answer": "Set goals.", "confidence_score": 0.0, "completion_tokens": 3}}
+
+
+@pytest.mark.asyncio
+async def test_query_stream_sends_sources_before_tokens():
+    from coach.api.dependencies import set_rag_service
+    from coach.utils.metrics import rag_tokens_per_second
+
+    app.state.skip_init = True
+    rates = rag_tokens_per_second._sum.get()
+    set_rag_service(_StreamingService())
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            resp = await ac.post("/query/stream", json={"query": "How do I set goals?"})
+    finally:
+        set_rag_service(None)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = [line.split(": ", 1)[1] for line in resp.text.splitlines() if line.startswith("event: ")]
+    assert events == ["sources", "token", "token", "done"]
+    assert rag_tokens_per_second._sum.get() > rates
+
+
+@pytest.mark.asyncio
+async def test_ready_reports_warmup_phase_until_service_is_ready():
+    from types import SimpleNamespace
+
+    from coach.api.dependencies import set_rag_service
+
+    app.state.skip_init = True
+    service = SimpleNamespace(ready=False, phase="load_embedding_model", error=None)
+    set_rag_service(service)
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            warming = await ac.get("/ready")
+            rejected = await ac.post("/query", json={"query": "How do I set goals?"})
+            service.ready = True
+            ready = await ac.get("/ready")
+    finally:
+        set_rag_service(None)
+    assert warming.status_code == 503
+    assert warming.json()["phase"] == "load_embedding_model"
+    assert rejected.status_code == 503
+    assert ready.status_code == 200
+
+
+class _UploadService:
+    def __init__(self):
+        from coach.core.ingest_jobs import IngestJobManager
+
+        self.ready = True
+        self.received = None
+        self.spool_path = None
+        self.jobs = IngestJobManager(self.ingest_document, workers=1, queue_size=4)
+
+    async def ingest_document(self, filename, content, collection_name=None, progress=None):
+        self.spool_path = content
+        with open(content, "rb") as f:
+            self.received = f.read()
+        progress(phase="indexing", pages_processed=1, chunks_processed=3)
+        return {
+            "document_id": "doc-1",
+            "chunks_created": 3,
+            "pages_reindexed": 1,
+            "pages_deleted": 0,
+            "status": "new",
+        }
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_queues_a_job_for_the_spooled_body():
+    import asyncio
+    import os
+
+    from coach.api.dependencies import set_rag_service
+
+    app.state.skip_init = True
+    service = _UploadService()
+    set_rag_service(service)
+    body = b"%PDF-1.4\n" + b"x" * 200_000
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            queued = await ac.post("/upload/stream", params={"filename": "guide.pdf"}, content=body,
+                                   headers={"content-type": "application/pdf"})
+            bad = await ac.post("/upload/stream", params={"filename": "guide.pdf"}, content=b"not a pdf")
+            for _ in range(100):
+                job = (await ac.get(queued.json()["status_url"])).json()
+                if job["status"] not in ("queued", "running"):
+                    break
+                await asyncio.sleep(0.01)
+            missing = await ac.get("/jobs/unknown")
+    finally:
+        await service.jobs.stop()
+        set_rag_service(None)
+    assert queued.status_code == 202
+    assert bad.status_code == 400
+    assert job["status"] == "succeeded"
+    assert job["phase"] == "done"
+    assert (job["pages_processed"], job["chunks_processed"]) == (1, 3)
+    assert job["result"]["chunks_created"] == 3
+    assert service.received == body
+    assert not os.path.exists(service.spool_path)
+    assert missing.status_code == 404
@@ -9,3 +9,985 @@ def test_split_text_with_overlap_basic():
     assert chunks[1].startswith("ijklmnopqr"[:10-2])
     assert len(chunks) >= 3
 
+
+async def test_llm_client_chat_uses_pooled_client():
+    import httpx
+
+    from coach.core.llm_client import LLMClient
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"choices": [{"message": {"content": " hi "}}]})
+
+    client = LLMClient(base_url="http://llm/v1", client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    assert await client.chat("q") == "hi"
+    assert await client.chat("q") == "hi"
+    assert calls == ["/v1/chat/completions", "/v1/chat/completions"]
+    await client.aclose()
+
+
+async def test_metered_executor_runs_off_loop_and_drains_queue():
+    import threading
+
+    from coach.core.executors import MeteredExecutor
+    from coach.utils.metrics import executor_queue_depth
+
+    pool = MeteredExecutor("test", max_workers=1)
+    try:
+        name = await pool.run(lambda: threading.current_thread().name)
+    finally:
+        pool.shutdown(wait=True)
+    assert name.startswith("coach-test")
+    assert executor_queue_depth.labels(pool="test")._value.get() == 0
+
+
+async def test_embedding_batcher_coalesces_concurrent_queries():
+    import asyncio
+
+    from coach.core.embedding_batcher import EmbeddingBatcher
+    from coach.core.executors import ExecutorLayer
+
+    class FakeEmbedder:
+        def __init__(self):
+            self.calls = []
+
+        def embed(self, texts, persist=True):
+            self.calls.append(list(texts))
+            return [[float(len(t))] for t in texts]
+
+    embedder = FakeEmbedder()
+    executors = ExecutorLayer(io_workers=1, inference_workers=1)
+    batcher = EmbeddingBatcher(embedder, executors, window_ms=20, max_batch_size=8)
+    try:
+        vectors = await asyncio.gather(*(batcher.embed("x" * n) for n in range(1, 6)))
+    finally:
+        executors.shutdown(wait=True)
+    assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert len(embedder.calls) == 1
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    import numpy as np
+
+    from coach.core.embedding_cache import EmbeddingCache, embedding_key
+
+    cache = EmbeddingCache(dim=2, max_entries=2)
+    a, b, c = (embedding_key("m", t) for t in "abc")
+    cache.put(a, np.array([1, 0], dtype=np.float32))
+    cache.put(b, np.array([0, 1], dtype=np.float32))
+    assert cache.get(a) is not None  # a is now most recently used
+    cache.put(c, np.array([1, 1], dtype=np.float32))
+    assert cache.get(b) is None
+    assert cache.get(a).tolist() == [1.0, 0.0]
+    assert cache.get(c).tolist() == [1.0, 1.0]
+    assert cache.resident_bytes == 2 * (2 * 4 + 16)
+
+
+def _counting_embedding_model(monkeypatch):
+    """Patch SentenceTransformer with a model that records every text it encodes."""
+    import numpy as np
+    import sentence_transformers
+
+    class CountingModel:
+        encoded = []
+
+        def __init__(self, name):
+            pass
+
+        def get_sentence_embedding_dimension(self):
+            return 3
+
+        def encode(self, texts, **kwargs):
+            self.encoded.extend(texts)
+            return np.ones((len(texts), 3), dtype=np.float32)
+
+    monkeypatch.setattr(sentence_transformers, "SentenceTransformer", CountingModel)
+    return CountingModel
+
+
+def test_embedding_client_serves_repeated_texts_from_its_cache(monkeypatch):
+    from coach.config.settings import settings
+    from coach.core.embeddings import EmbeddingClient
+
+    model = _counting_embedding_model(monkeypatch)
+    monkeypatch.setattr(settings, "embedding_store_dir", None)
+    client = EmbeddingClient("org/model")
+    first = client.embed(["a"])
+    second = client.embed(["a"])
+
+    assert model.encoded == ["a"]
+    assert first == second
+    assert len(client._cache) == 1
+
+
+def test_persistent_embedding_store_is_shared_between_instances(tmp_path):
+    import numpy as np
+
+    from coach.core.embedding_cache import embedding_key
+    from coach.core.embedding_store import PersistentEmbeddingStore
+
+    writer = PersistentEmbeddingStore(str(tmp_path), "org/model", dim=3)
+    reader = PersistentEmbeddingStore(str(tmp_path), "org/model", dim=3)
+    key = embedding_key("org/model", "goal setting")
+    assert reader.get_many([key]) == [None]
+
+    writer.put_many({key: np.array([0.1, 0.2, 0.3], dtype=np.float32)})
+    writer.put_many({key: np.array([9.0, 9.0, 9.0], dtype=np.float32)})  # already stored, ignored
+
+    (found,) = reader.get_many([key])
+    assert np.allclose(found, [0.1, 0.2, 0.3])
+    assert len(reader) == 1
+
+
+def test_persistent_embedding_store_drops_a_partial_key_record(tmp_path):
+    import numpy as np
+
+    from coach.core.embedding_cache import KEY_BYTES, embedding_key
+    from coach.core.embedding_store import PersistentEmbeddingStore
+
+    first, second = (embedding_key("org/model", text) for text in ("goal setting", "habits"))
+    PersistentEmbeddingStore(str(tmp_path), "org/model", dim=3).put_many({first: np.array([1.0, 0.0, 0.0])})
+    store = PersistentEmbeddingStore(str(tmp_path), "org/model", dim=3)
+    with open(store._keys_path, "ab") as f:
+        f.write(second[:5])  # a writer died halfway through its key record
+
+    store.put_many({second: np.array([0.0, 1.0, 0.0], dtype=np.float32)})
+    reader = PersistentEmbeddingStore(str(tmp_path), "org/model", dim=3)
+
+    assert store._keys_path.stat().st_size == 2 * KEY_BYTES
+    assert [vec.tolist() for vec in reader.get_many([first, second])] == [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+
+
+def test_embedding_client_persists_vectors_for_later_processes(monkeypatch, tmp_path):
+    from coach.config.settings import settings
+    from coach.core.embeddings import EmbeddingClient
+
+    model = _counting_embedding_model(monkeypatch)
+    monkeypatch.setattr(settings, "embedding_store_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "embedding_cache_max_entries", 0)
+    EmbeddingClient("org/model").embed(["goal setting", "habits"])
+    restarted = EmbeddingClient("org/model")
+    restarted.embed(["goal setting"])
+
+    assert model.encoded == ["goal setting", "habits"]
+    assert len(restarted._store) == 2
+
+
+def test_semantic_answer_cache_threshold_and_invalidation():
+    from coach.core.query_cache import SemanticAnswerCache
+
+    cache = SemanticAnswerCache(max_entries=4, threshold=0.9)
+    scope = ("documents", 1, 5)
+    cache.store(scope, [1.0, 0.0], {"answer": "Write SMART goals."})
+    assert cache.lookup(scope, [0.99, 0.141])["answer"] == "Write SMART goals."
+    assert cache.lookup(scope, [0.0, 1.0]) is None
+    assert cache.lookup(("documents", 2, 5), [1.0, 0.0]) is None  # newer collection version
+    cache.invalidate("documents")
+    assert cache.lookup(scope, [1.0, 0.0]) is None
+
+
+def test_vector_store_registry_skips_metadata_round_trips():
+    import pytest
+    from qdrant_client import QdrantClient
+    from qdrant_client.http.models import Distance, VectorParams
+
+    from coach.core.vector_store import VectorStore
+    from coach.exceptions.rag_exceptions import RAGVectorStoreError
+
+    client = QdrantClient(":memory:")
+    client.create_collection("wrong_dim", vectors_config=VectorParams(size=3, distance=Distance.COSINE))
+    store = VectorStore(client=client)
+    assert store.get_or_create_collection("fresh").vector_size == store._dim
+
+    calls = []
+    client.get_collection = lambda *a, **kw: calls.append("get_collection")
+    client.collection_exists = lambda *a, **kw: calls.append("collection_exists")
+    store.get_or_create_collection("fresh")
+    with pytest.raises(RAGVectorStoreError):
+        store.get_or_create_collection("wrong_dim")
+    assert calls == []
+
+
+def test_collections_are_created_with_their_storage_profile(monkeypatch):
+    from qdrant_client import QdrantClient
+
+    from coach.config.settings import settings
+    from coach.core.storage_profiles import get_profile
+    from coach.core.vector_store import VectorStore
+
+    monkeypatch.setattr(settings, "collection_storage_profiles", {"archive": "scalar"})
+    created = {}
+    client = QdrantClient(":memory:")
+    create = client.create_collection
+
+    def recording_create(collection_name, **kwargs):
+        created[collection_name] = kwargs
+        return create(collection_name, **kwargs)
+
+    client.create_collection = recording_create
+    store = VectorStore(client=client)
+    store.get_or_create_collection("archive")
+    store.get_or_create_collection("documents")
+    hits = store.query("archive", [1.0] + [0.0] * (store._dim - 1), top_k=3)
+
+    assert created["archive"]["quantization_config"].scalar.type == "int8"
+    assert created["archive"]["vectors_config"].on_disk is True
+    assert "quantization_config" not in created["documents"]
+    assert hits == []
+    scalar, binary = get_profile("scalar"), get_profile("binary")
+    assert binary.estimated_bytes(1000, 384)["ram"] < scalar.estimated_bytes(1000, 384)["ram"]
+
+
+def test_search_options_reach_qdrant_and_split_the_cache_scope(monkeypatch):
+    from qdrant_client import QdrantClient
+
+    from coach.config.settings import settings
+    from coach.core.qdrant_common import hnsw_config
+    from coach.core.rag_service import RAGService
+    from coach.core.search_options import SearchOptions
+    from coach.core.vector_store import VectorStore
+
+    monkeypatch.setattr(settings, "collection_hnsw_config", {"docs": {"m": 32, "ef_construct": 256}})
+    client = QdrantClient(":memory:")
+    searches = []
+    search = client.search
+
+    def recording_search(**kwargs):
+        searches.append(kwargs)
+        return search(**kwargs)
+
+    client.search = recording_search
+    store = VectorStore(client=client)
+    dim = store._dim
+    store.add_chunks(
+        "docs",
+        [{"id": 1, "text": "near", "metadata": {}}, {"id": 2, "text": "far", "metadata": {}}],
+        [[1.0] + [0.0] * (dim - 1), [0.0, 1.0] + [0.0] * (dim - 2)],
+    )
+    hits = store.query("docs", [1.0] + [0.0] * (dim - 1), top_k=2,
+                       options=SearchOptions(hnsw_ef=128, exact=True, score_threshold=0.5))
+
+    assert [h["documents"] for h in hits] == ["near"]
+    assert (searches[0]["search_params"].hnsw_ef, searches[0]["search_params"].exact) == (128, True)
+    assert hnsw_config("docs").m == 32 and hnsw_config("other") is None
+    service = RAGService()
+    service.vstore = store
+    assert service._cache_scope("docs", 5, SearchOptions(exact=True)) != service._cache_scope("docs", 5)
+
+
+def test_filtered_search_is_scoped_and_indexed():
+    from qdrant_client import QdrantClient
+
+    from coach.core.qdrant_common import PAYLOAD_INDEXES
+    from coach.core.search_options import QueryFilter, SearchOptions
+    from coach.core.vector_store import VectorStore
+
+    client = QdrantClient(":memory:")
+    indexed = []
+    client.create_payload_index = lambda collection_name, field_name, **kw: indexed.append(field_name)
+    store = VectorStore(client=client)
+    vector = [1.0] + [0.0] * (store._dim - 1)
+    chunks = [
+        {"id": n, "text": f"{doc} p{page}", "metadata": {"document_id": doc, "filename": f"{doc}.pdf", "page": page}}
+        for n, (doc, page) in enumerate([("a", 1), ("a", 2), ("a", 3), ("b", 2)], start=1)
+    ]
+    store.add_chunks("docs", chunks, [vector] * len(chunks))
+
+    def texts(query_filter):
+        hits = store.query("docs", vector, top_k=10, options=SearchOptions(filter=query_filter))
+        return sorted(h["documents"] for h in hits)
+
+    assert indexed == list(PAYLOAD_INDEXES)
+    assert texts(QueryFilter(document_id="a", page_from=2)) == ["a p2", "a p3"]
+    assert texts(QueryFilter(filename="b.pdf")) == ["b p2"]
+    assert texts(QueryFilter(page_from=2, page_to=2)) == ["a p2", "b p2"]
+
+
+def test_add_chunks_upserts_in_batches_with_final_barrier(monkeypatch):
+    from qdrant_client import QdrantClient
+
+    from coach.config.settings import settings
+    from coach.core.vector_store import VectorStore
+
+    monkeypatch.setattr(settings, "upsert_batch_size", 2)
+    monkeypatch.setattr(settings, "upsert_parallelism", 1)
+    client = QdrantClient(":memory:")
+    store = VectorStore(client=client)
+    waits = []
+    upsert = client.upsert
+    client.upsert = lambda **kw: waits.append(kw["wait"]) or upsert(**kw)
+
+    chunks = [{"id": i, "text": f"chunk {i}", "metadata": {"page": 1}} for i in range(5)]
+    store.add_chunks("batched", chunks, [[0.1] * store._dim] * 5)
+
+    assert waits == [settings.upsert_wait, settings.upsert_wait, True]
+    assert client.count("batched").count == 5
+
+
+def test_close_stops_the_upsert_pool(monkeypatch):
+    from qdrant_client import QdrantClient
+
+    from coach.config.settings import settings
+    from coach.core.vector_store import VectorStore
+
+    monkeypatch.setattr(settings, "upsert_batch_size", 1)
+    monkeypatch.setattr(settings, "upsert_parallelism", 2)
+    store = VectorStore(client=QdrantClient(":memory:"))
+    chunks = [{"id": i, "text": f"chunk {i}", "metadata": {}} for i in range(3)]
+    store.add_chunks("pooled", chunks, [[0.1] * store._dim] * 3)
+    pool = store._upsert_pool
+
+    store.close()
+
+    assert pool is not None and pool._shutdown
+    assert store._upsert_pool is None
+
+
+def _make_pdf(pages):
+    """Build a minimal text PDF with one content stream per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+async def test_ingest_pipeline_streams_batches_into_store(monkeypatch):
+    from qdrant_client import QdrantClient
+
+    from coach.config.settings import settings
+    from coach.core.document_processor import batched, iter_document_chunks
+    from coach.core.executors import ExecutorLayer
+    from coach.core.ingest_pipeline import IngestPipeline
+    from coach.core.vector_store import VectorStore
+
+    monkeypatch.setattr(settings, "chunk_size", 20)
+    monkeypatch.setattr(settings, "chunk_overlap", 5)
+
+    class FakeEmbedder:
+        batch_sizes = []
+
+        def embed(self, texts, persist=True):
+            self.batch_sizes.append(len(texts))
+            return [[1.0] + [0.0] * (settings.embedding_dim - 1) for _ in texts]
+
+    pdf = _make_pdf([f"Page {n} is about setting coaching goals" for n in range(1, 6)])
+    store = VectorStore(client=QdrantClient(":memory:"))
+    executors = ExecutorLayer(io_workers=2, inference_workers=1)
+    pipeline = IngestPipeline(FakeEmbedder(), store, executors, queue_size=1)
+    try:
+        written = await pipeline.run(batched(iter_document_chunks("coach.pdf", pdf, "doc-1"), 4), "pipeline")
+    finally:
+        executors.shutdown(wait=True)
+
+    assert written == store.client.count("pipeline").count > 5
+    assert max(FakeEmbedder.batch_sizes) == 4
+
+
+def test_parallel_page_extraction_preserves_page_order(monkeypatch):
+    from coach.config.settings import settings
+    from coach.core.document_processor import iter_pdf_pages
+
+    pdf = _make_pdf([f"Page number {n}" for n in range(1, 8)])
+    serial = list(iter_pdf_pages(pdf))
+
+    monkeypatch.setattr(settings, "pdf_extract_workers", 2)
+    monkeypatch.setattr(settings, "pdf_extract_pages_per_task", 2)
+    monkeypatch.setattr(settings, "pdf_extract_parallel_min_pages", 1)
+    parallel = list(iter_pdf_pages(pdf))
+
+    assert [page for page, _ in parallel] == list(range(1, 8))
+    assert parallel == serial
+
+
+def _service_with_memory_store():
+    from qdrant_client import QdrantClient
+
+    from coach.config.settings import settings
+    from coach.core.ingest_pipeline import IngestPipeline
+    from coach.core.rag_service import RAGService
+    from coach.core.vector_store import VectorStore
+
+    class FakeEmbedder:
+        def embed(self, texts, persist=True):
+            return [[1.0] + [0.0] * (settings.embedding_dim - 1) for _ in texts]
+
+    service = RAGService()
+    service.embedder = FakeEmbedder()
+    service.vstore = VectorStore(client=QdrantClient(":memory:"))
+    service.pipeline = IngestPipeline(service.embedder, service.vstore, service.executors)
+    return service
+
+
+async def test_ingest_reindexes_only_changed_pages():
+    service = _service_with_memory_store()
+    v1 = _make_pdf(["Goals give direction", "Habits compound", "Reflect weekly"])
+    v2 = _make_pdf(["Goals give direction", "Habits compound daily"])
+    try:
+        first = await service.ingest_document("coach.pdf", v1, "docs")
+        again = await service.ingest_document("coach.pdf", v1, "docs")
+        revised = await service.ingest_document("coach.pdf", v2, "docs")
+        pages = service.vstore.document_state("docs", revised["document_id"]).pages
+        deleted = await service.delete_document(revised["document_id"], "docs")
+        remaining = service.vstore.client.count("docs").count
+    finally:
+        await service.cleanup()
+
+    assert (first["status"], again["status"], revised["status"]) == ("new", "unchanged", "replaced")
+    assert first["document_id"] == again["document_id"] == revised["document_id"]
+    assert (revised["pages_reindexed"], revised["pages_deleted"]) == (1, 2)
+    assert sorted(page for page, _ in pages) == [1, 2]
+    assert deleted == 2
+    assert remaining == 0
+
+
+async def test_interrupted_ingest_is_not_reported_unchanged(monkeypatch):
+    from coach.config.settings import settings
+
+    monkeypatch.setattr(settings, "ingest_batch_size", 1)
+    monkeypatch.setattr(settings, "chunk_cross_page", False)
+    service = _service_with_memory_store()
+    embedder = service.pipeline.embedder
+
+    class FailingEmbedder:
+        calls = 0
+
+        def embed(self, texts, persist=True):
+            self.calls += 1
+            if self.calls > 1:
+                raise RuntimeError("embedding backend went away")
+            return embedder.embed(texts, persist)
+
+    pdf = _make_pdf(["Goals give direction", "Habits compound", "Reflect weekly"])
+    try:
+        service.pipeline.embedder = FailingEmbedder()
+        failed = await service.ingest_document("coach.pdf", pdf, "docs")
+        stored_hash = service.vstore.document_state("docs", failed["document_id"]).content_hash
+        service.pipeline.embedder = embedder
+        retried = await service.ingest_document("coach.pdf", pdf, "docs")
+        again = await service.ingest_document("coach.pdf", pdf, "docs")
+        pages = service.vstore.document_state("docs", failed["document_id"]).pages
+    finally:
+        await service.cleanup()
+
+    assert failed["status"] == "failed"
+    assert stored_hash is None
+    assert retried["status"] != "unchanged"
+    assert again["status"] == "unchanged"
+    assert sorted(page for page, _ in pages) == [1, 2, 3]
+
+
+async def test_interrupted_reindex_rewrites_partially_written_pages(monkeypatch):
+    from coach.config.settings import settings
+
+    monkeypatch.setattr(settings, "ingest_batch_size", 1)
+    monkeypatch.setattr(settings, "chunk_size", 20)
+    monkeypatch.setattr(settings, "chunk_overlap", 5)
+    monkeypatch.setattr(settings, "chunk_cross_page", False)
+    service = _service_with_memory_store()
+    fresh = _service_with_memory_store()
+    embedder = service.pipeline.embedder
+
+    class FailingEmbedder:
+        def embed(self, texts, persist=True):
+            raise RuntimeError("embedding backend went away")
+
+    class FailAfterFirstBatch:
+        calls = 0
+
+        def embed(self, texts, persist=True):
+            self.calls += 1
+            if self.calls > 1:
+                raise RuntimeError("embedding backend went away")
+            return embedder.embed(texts, persist)
+
+    v1 = _make_pdf(["Goals give direction", "Habits compound"])
+    v2 = _make_pdf(["Goals give direction", "Habits compound daily when reviewed every week"])
+    try:
+        await service.ingest_document("coach.pdf", v1, "docs")
+        service.pipeline.embedder = FailAfterFirstBatch()
+        failed = await service.ingest_document("coach.pdf", v2, "docs")
+        service.pipeline.embedder = FailingEmbedder()
+        still_failing = await service.ingest_document("coach.pdf", v2, "docs")
+        service.pipeline.embedder = embedder
+        repaired = await service.ingest_document("coach.pdf", v2, "docs")
+        await fresh.ingest_document("coach.pdf", v2, "docs")
+        stored = sorted(p.payload["text"] for p in service.vstore.client.scroll("docs", limit=100)[0])
+        expected = sorted(p.payload["text"] for p in fresh.vstore.client.scroll("docs", limit=100)[0])
+    finally:
+        await service.cleanup()
+        await fresh.cleanup()
+
+    assert (failed["status"], still_failing["status"], repaired["status"]) == ("failed", "failed", "replaced")
+    assert repaired["pages_reindexed"] == 1
+    assert stored == expected
+
+
+async def test_ingest_job_manager_bounds_the_queue_and_records_failures():
+    import asyncio
+
+    import pytest
+
+    from coach.core.ingest_jobs import IngestJobManager
+    from coach.exceptions import RAGServiceUnavailable
+
+    release = asyncio.Event()
+
+    async def ingest(filename, content, collection_name, progress):
+        progress(phase="indexing")
+        await release.wait()
+        if filename == "broken.pdf":
+            raise ValueError("no pages")
+        return {"status": "new"}
+
+    manager = IngestJobManager(ingest, workers=1, queue_size=1)
+    first = manager.submit("a.pdf", b"%PDF")
+    await asyncio.sleep(0)  # the worker takes the first job off the queue
+    second = manager.submit("broken.pdf", b"%PDF")
+    with pytest.raises(RAGServiceUnavailable):
+        manager.submit("c.pdf", b"%PDF")
+    assert (first.status, first.phase, second.status) == ("running", "indexing", "queued")
+
+    release.set()
+    for _ in range(100):
+        if second.done:
+            break
+        await asyncio.sleep(0.01)
+    await manager.stop()
+    assert first.status == "succeeded"
+    assert (second.status, second.phase, second.error) == ("failed", "indexing", "no pages")
+
+
+async def test_ingest_job_records_why_a_document_failed():
+    import asyncio
+
+    from coach.core.ingest_jobs import IngestJobManager
+
+    service = _service_with_memory_store()
+
+    def unavailable(texts, persist=True):
+        raise ConnectionError("embedding server unreachable")
+
+    service.embedder.embed = unavailable
+    manager = IngestJobManager(service.ingest_document, workers=1)
+    try:
+        job = manager.submit("coach.pdf", _make_pdf(["Goals give direction"]), "docs")
+        for _ in range(200):
+            if job.done:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await manager.stop()
+        await service.cleanup()
+
+    assert job.result["error"] == "embedding server unreachable"
+    assert (job.status, job.error) == ("failed", "Failed to ingest 'coach.pdf': embedding server unreachable")
+
+
+async def test_query_batch_embeds_and_searches_once_and_bounds_llm_calls():
+    import asyncio
+
+    service = _service_with_memory_store()
+    embed_calls, search_calls = [], []
+    embed, query_batch = service.embedder.embed, service.vstore.query_batch
+
+    def counting_embed(texts, persist=True):
+        embed_calls.append(list(texts))
+        return embed(texts, persist)
+
+    def counting_query_batch(*args, **kwargs):
+        search_calls.append(args)
+        return query_batch(*args, **kwargs)
+
+    class FakeLLM:
+        active = peak = 0
+
+        async def chat(self, prompt):
+            FakeLLM.active += 1
+            FakeLLM.peak = max(FakeLLM.peak, FakeLLM.active)
+            await asyncio.sleep(0.01)
+            FakeLLM.active -= 1
+            if "q3" in prompt:
+                raise RuntimeError("model overloaded")
+            return "answer"
+
+        async def aclose(self):
+            pass
+
+    service.embedder.embed = counting_embed
+    service.vstore.query_batch = counting_query_batch
+    service.llm = FakeLLM()
+    service.answer_cache = None
+    queries = [f"q{i}" for i in range(6)]
+    try:
+        await service.ingest_document("coach.pdf", _make_pdf(["Goals give direction"]), "docs")
+        embed_calls.clear()
+        results = [r async for r in service.query_batch(queries, 3, "docs", concurrency=2)]
+    finally:
+        await service.cleanup()
+
+    assert len(embed_calls) == 1 and embed_calls[0] == queries
+    assert len(search_calls) == 1
+    assert FakeLLM.peak == 2
+    assert sorted(r["index"] for r in results) == list(range(6))
+    assert [r["error"] for r in results if "error" in r] == ["model overloaded"]
+    assert all(r["sources"] for r in results if "error" not in r)
+
+
+async def test_numpy_backend_reindexes_filters_and_persists(tmp_path):
+    import numpy as np
+
+    from coach.core.numpy_store import NumpyVectorStore
+    from coach.core.search_options import QueryFilter, SearchOptions
+
+    service = _service_with_memory_store()
+    service.vstore = NumpyVectorStore(str(tmp_path))
+    service.pipeline.vstore = service.vstore
+    v1 = _make_pdf(["Goals give direction", "Habits compound", "Reflect weekly"])
+    v2 = _make_pdf(["Goals give direction", "Habits compound daily"])
+    probe = [1.0] + [0.0] * (service.vstore._dim - 1)
+    try:
+        await service.ingest_document("coach.pdf", v1, "docs")
+        revised = await service.ingest_document("coach.pdf", v2, "docs")
+        page_two = service.vstore.query("docs", probe, 10, options=SearchOptions(filter=QueryFilter(page_from=2)))
+    finally:
+        await service.cleanup()
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    pages = reopened.document_state("docs", revised["document_id"]).pages
+    assert (revised["status"], revised["pages_reindexed"], revised["pages_deleted"]) == ("replaced", 1, 2)
+    assert [hit["documents"] for hit in page_two] == ["Habits compound daily"]
+    assert sorted(page for page, _ in pages) == [1, 2]
+    assert reopened.list_collections() == ["docs"]
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((50, reopened._dim)).tolist()
+    reopened.add_chunks("exact", [{"id": i, "text": str(i), "metadata": {}} for i in range(50)], vectors)
+    hits = reopened.query_batch("exact", vectors[:3], top_k=1)
+    assert [h[0]["documents"] for h in hits] == ["0", "1", "2"]
+
+
+def test_numpy_backend_appends_batches_and_survives_an_interrupted_delete(tmp_path, monkeypatch):
+    import os
+
+    import numpy as np
+    import pytest
+
+    from coach.core.numpy_store import NumpyVectorStore
+
+    store = NumpyVectorStore(str(tmp_path))
+    dim = store._dim
+    vectors = np.eye(4, dim).tolist()
+    chunks = [{"id": i, "text": str(i), "metadata": {"document_id": "a" if i < 2 else "b"}} for i in range(4)]
+    snapshot = tmp_path / "docs" / "payloads.json"
+    store.add_chunks("docs", chunks[:2], vectors[:2])
+    written = snapshot.stat().st_mtime_ns
+    store.add_chunks("docs", chunks[2:], vectors[2:])
+    assert snapshot.stat().st_mtime_ns == written  # batches go to the log, not the snapshot
+
+    def crash(*args):
+        raise OSError("power cut")
+
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        store.delete_documents("docs", ["a"])
+    monkeypatch.undo()
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    hits = reopened.query_batch("docs", vectors, top_k=1)
+    assert [h[0]["documents"] for h in hits] == ["0", "1", "2", "3"]
+    assert reopened.delete_documents("docs", ["a"]) == 2
+    hits = NumpyVectorStore(str(tmp_path)).query_batch("docs", vectors[2:], top_k=1)
+    assert [h[0]["documents"] for h in hits] == ["2", "3"]
+    files = sorted(os.listdir(tmp_path / "docs"))
+    assert len(files) == 2 and files[0] == "payloads.json" and files[1].endswith(".f32")
+
+
+def test_incomplete_backends_and_chunkers_fail_at_construction():
+    import pytest
+
+    from coach.core.async_vector_store import AsyncVectorStore
+    from coach.core.chunking import CharacterChunker, Chunker, SentenceChunker, TokenChunker
+    from coach.core.numpy_store import NumpyVectorStore
+    from coach.core.vector_backend import VectorBackend
+    from coach.core.vector_store import VectorStore
+
+    class QueryOnly(VectorBackend):
+        def query(self, collection_name, query_embedding, top_k, metadata_filter=None, options=None):
+            return []
+
+    class Unsplit(Chunker):
+        name = "unsplit"
+
+    with pytest.raises(TypeError, match="document_state"):
+        QueryOnly()
+    with pytest.raises(TypeError, match="split"):
+        Unsplit(10, 2)
+    for complete in (VectorStore, AsyncVectorStore, NumpyVectorStore, CharacterChunker, SentenceChunker, TokenChunker):
+        assert not complete.__abstractmethods__
+
+
+async def test_async_qdrant_backend_is_awaited_without_the_io_pool():
+    from qdrant_client import AsyncQdrantClient
+
+    from coach.core.async_vector_store import AsyncVectorStore
+    from coach.utils.metrics import vector_store_operation_duration
+
+    service = _service_with_memory_store()
+    service.vstore = AsyncVectorStore(client=AsyncQdrantClient(":memory:"))
+    service.pipeline.vstore = service.vstore
+    await service.vstore.connect()
+
+    def blocked(*args, **kwargs):
+        raise AssertionError("async store calls must not use the I/O pool")
+
+    v1 = _make_pdf(["Goals give direction", "Habits compound", "Reflect weekly"])
+    v2 = _make_pdf(["Goals give direction", "Habits compound daily"])
+    probe = [1.0] + [0.0] * (service.vstore._dim - 1)
+    searches = vector_store_operation_duration.labels(operation="search")._sum.get()
+    try:
+        await service.ingest_document("coach.pdf", v1, "docs")
+        revised = await service.ingest_document("coach.pdf", v2, "docs")
+        service.executors.io.run = blocked
+        hits = await service.vstore.query("docs", probe, 10)
+        deleted = await service.delete_document(revised["document_id"], "docs")
+        remaining = (await service.vstore.client.count("docs")).count
+    finally:
+        await service.cleanup()
+
+    assert (revised["status"], revised["pages_reindexed"], revised["pages_deleted"]) == ("replaced", 1, 2)
+    assert sorted(hit["documents"] for hit in hits) == ["Goals give direction", "Habits compound daily"]
+    assert (deleted, remaining) == (2, 0)
+    assert vector_store_operation_duration.labels(operation="search")._sum.get() > searches
+
+
+async def test_reranker_reorders_over_fetched_candidates_within_budget(monkeypatch):
+    import asyncio
+    import time
+
+    from coach.config.settings import settings
+
+    service = _service_with_memory_store()
+    dim = service.vstore._dim
+    texts = ["alpha", "beta", "gamma", "delta"]
+    service.vstore.add_chunks(
+        "docs",
+        [{"id": i, "text": text, "metadata": {}} for i, text in enumerate(texts)],
+        [[1.0, 0.1 * i] + [0.0] * (dim - 2) for i in range(len(texts))],
+    )
+
+    class FakeReranker:
+        delay = 0.0
+        calls = []
+
+        def score(self, query, candidates):
+            self.calls.append(candidates)
+            time.sleep(self.delay)
+            return [float(len(c)) for c in candidates]
+
+    service.reranker = FakeReranker()
+    monkeypatch.setattr(settings, "rerank_candidates", 4)
+    monkeypatch.setattr(settings, "rerank_budget_ms", 100.0)
+    probe = [1.0] + [0.0] * (dim - 1)
+    try:
+        reranked = await service._retrieve("q", probe, "docs", service._cache_scope("docs", 2))
+        FakeReranker.delay = 0.3
+        skipped = await service._retrieve("other q", probe, "docs", service._cache_scope("docs", 2))
+        # The abandoned pass is still scoring; inference must not queue behind it
+        embedded = await asyncio.wait_for(service.executors.run_inference(lambda: "embedded"), timeout=0.1)
+    finally:
+        await service.cleanup()
+
+    assert sorted(FakeReranker.calls[0]) == sorted(texts)
+    assert [s["text"] for s in reranked] == ["alpha", "gamma"]
+    assert [s["text"] for s in skipped] == ["alpha", "beta"]
+    assert embedded == "embedded"
+    assert service.search_cache.get(service._cache_scope("docs", 2), "other q") is None
+
+
+def test_context_assembler_merges_overlapping_chunks_within_budget():
+    from coach.core.context_assembler import ContextAssembler
+    from coach.core.document_processor import _split_text_with_offsets
+
+    page = "".join(f"sentence {i:02d}. " for i in range(20))
+    chunks = _split_text_with_offsets(page, 100, 30)
+
+    def source(offset, text, page_no=1, document_id="doc"):
+        return {"text": text, "metadata": {"document_id": document_id, "page": page_no, "offset": offset}}
+
+    # Retrieved out of order, with an unrelated page in between
+    hits = [source(*chunks[1]), source(0, "elsewhere", page_no=7), source(*chunks[0]), source(*chunks[3])]
+
+    context = ContextAssembler(budget=1000).assemble(hits)
+    assert context.split("\n\n") == [
+        f"[p1] {page[:chunks[1][0] + 100]}",
+        "[p7] elsewhere",
+        f"[p1] {chunks[3][1]}",
+    ]
+
+    tight = ContextAssembler(budget=60).assemble(hits)
+    assert tight.split("\n\n") == [f"[p1] {page[:chunks[1][0] + 100]}", "[p7] elsewhere"]
+
+
+def test_context_assembler_keeps_chunks_carried_across_pages_apart():
+    from coach.core.context_assembler import ContextAssembler
+
+    def source(offset, text, **extra):
+        return {"text": text, "metadata": {"document_id": "doc", "page": 1, "offset": offset, **extra}}
+
+    # The carried chunk starts at offset 40 of page 1 but ends on page 2
+    hits = [source(40, "tail of one. Head of two.", page_end=2), source(0, "x" * 40 + "tail of one. And more on one.")]
+
+    context = ContextAssembler(budget=1000).assemble(hits)
+    assert context.split("\n\n") == [
+        "[p1-2] tail of one. Head of two.",
+        f"[p1] {'x' * 40}tail of one. And more on one.",
+    ]
+
+
+def test_chunkers_keep_sentences_and_continue_short_tails_across_pages():
+    from coach.core.chunking import CharacterChunker, SentenceChunker, TokenChunker, get_chunker
+    from coach.core.tokenizer import TokenCounter
+
+    pages = [
+        (1, "Goals give direction. Habits compound over time."),
+        (2, "Weekly reviews"),
+        (3, "keep plans honest. Rest matters too."),
+    ]
+
+    sentence = SentenceChunker(size=40, overlap=0)
+    assert [c.text for c in sentence.chunk_pages(pages, cross_page=False)] == [
+        "Goals give direction.", "Habits compound over time.", "Weekly reviews",
+        "keep plans honest. Rest matters too.",
+    ]
+    chunks = list(sentence.chunk_pages(pages, cross_page=True))
+    assert [(c.page, c.text, c.pages) for c in chunks] == [
+        (1, "Goals give direction.", (1,)),
+        (1, "Habits compound over time.", (1,)),
+        (2, "Weekly reviews\nkeep plans honest. Rest matters too.", (2, 3)),
+    ]
+
+    character = CharacterChunker(size=40, overlap=10)
+    assert len(list(character.chunk_pages(pages, cross_page=True))) < len(list(character.chunk_pages(pages, cross_page=False)))
+
+    tokens = TokenChunker(size=4, overlap=1, counter=TokenCounter())
+    assert [text for _, text in tokens.split("one two three four five six")] == ["one two three four", "four five six"]
+    assert get_chunker("character").size > 0
+
+
+async def test_cross_page_chunks_are_reindexed_when_any_of_their_pages_changes(monkeypatch):
+    from coach.config.settings import settings
+
+    monkeypatch.setattr(settings, "chunk_strategy", "sentence")
+    monkeypatch.setattr(settings, "chunk_size", 40)
+    monkeypatch.setattr(settings, "chunk_overlap", 0)
+    monkeypatch.setattr(settings, "chunk_cross_page", True)
+    service = _service_with_memory_store()
+    v1 = _make_pdf(["Goals give direction.", "Habits compound", "daily. Reflect weekly."])
+    v2 = _make_pdf(["Goals give direction.", "Habits compound", "daily. Reflect monthly."])
+    try:
+        first = await service.ingest_document("coach.pdf", v1, "docs")
+        revised = await service.ingest_document("coach.pdf", v2, "docs")
+        points, _ = service.vstore.client.scroll("docs", with_payload=True)
+    finally:
+        await service.cleanup()
+
+    assert first["chunks_created"] == 2
+    assert (revised["pages_reindexed"], revised["pages_deleted"]) == (1, 1)
+    stored = sorted((p.payload["page"], p.payload.get("page_end"), p.payload["text"]) for p in points)
+    assert stored == [(1, None, "Goals give direction."), (2, 3, "Habits compound\ndaily. Reflect monthly.")]
+
+
+async def test_reindex_follows_changes_in_text_carried_across_pages(monkeypatch):
+    from coach.config.settings import settings
+
+    monkeypatch.setattr(settings, "chunk_strategy", "sentence")
+    monkeypatch.setattr(settings, "chunk_size", 40)
+    monkeypatch.setattr(settings, "chunk_overlap", 0)
+    monkeypatch.setattr(settings, "chunk_min_ratio", 0.5)
+    monkeypatch.setattr(settings, "chunk_cross_page", True)
+    # Page 2 of v1 is carried into page 3's first chunk; in v2 it is a chunk of its own
+    page_three = "daily. Reflect weekly on what worked. Plan the next week with care."
+    v1 = _make_pdf(["Goals give direction.", "Habits compound", page_three])
+    v2 = _make_pdf(["Goals give direction.", "Habits compound over the years.", page_three])
+
+    async def stored_texts(*versions):
+        service = _service_with_memory_store()
+        try:
+            for pdf in versions:
+                await service.ingest_document("coach.pdf", pdf, "docs")
+            points, _ = service.vstore.client.scroll("docs", limit=100, with_payload=True)
+        finally:
+            await service.cleanup()
+        return sorted(p.payload["text"] for p in points)
+
+    assert "Habits compound\ndaily. Reflect weekly on what worked." in await stored_texts(v1)
+    assert await stored_texts(v1, v2) == await stored_texts(v2)
+    assert await stored_texts(v2, v1) == await stored_texts(v1)
+
+
+async def test_reindex_after_a_chunk_size_change_rebuilds_every_chunk(monkeypatch):
+    from coach.config.settings import settings
+
+    v1 = _make_pdf(["Goals give direction to every coaching session", "Habits compound"])
+    v2 = _make_pdf(["Goals give direction to every coaching session", "Habits compound daily"])
+    monkeypatch.setattr(settings, "chunk_overlap", 5)
+    service = _service_with_memory_store()
+    fresh = _service_with_memory_store()
+    try:
+        monkeypatch.setattr(settings, "chunk_size", 20)
+        await service.ingest_document("coach.pdf", v1, "docs")
+        monkeypatch.setattr(settings, "chunk_size", 1000)
+        await service.ingest_document("coach.pdf", v2, "docs")
+        await fresh.ingest_document("coach.pdf", v2, "docs")
+        stored = sorted(p.payload["text"] for p in service.vstore.client.scroll("docs", limit=100)[0])
+        expected = sorted(p.payload["text"] for p in fresh.vstore.client.scroll("docs", limit=100)[0])
+    finally:
+        await service.cleanup()
+        await fresh.cleanup()
+
+    assert stored == expected == ["Goals give direction to every coaching session", "Habits compound daily"]
+
+
+async def test_identical_file_is_reindexed_after_a_settings_change(monkeypatch):
+    from coach.config.settings import settings
+
+    pdf = _make_pdf(["Goals give direction to every coaching session", "Habits compound"])
+    monkeypatch.setattr(settings, "chunk_overlap", 5)
+    monkeypatch.setattr(settings, "chunk_size", 20)
+    service = _service_with_memory_store()
+    try:
+        first = await service.ingest_document("coach.pdf", pdf, "docs")
+        monkeypatch.setattr(settings, "chunk_size", 1000)
+        rechunked = await service.ingest_document("coach.pdf", pdf, "docs")
+        monkeypatch.setattr(settings, "embedding_model", "org/other-model")
+        reembedded = await service.ingest_document("coach.pdf", pdf, "docs")
+        again = await service.ingest_document("coach.pdf", pdf, "docs")
+        stored = sorted(p.payload["text"] for p in service.vstore.client.scroll("docs", limit=100)[0])
+    finally:
+        await service.cleanup()
+
+    assert first["status"] == "new"
+    assert (rechunked["status"], rechunked["chunks_created"]) == ("replaced", 2)
+    assert (reembedded["status"], reembedded["chunks_created"]) == ("replaced", 2)
+    assert again["status"] == "unchanged"
+    assert stored == ["Goals give direction to every coaching session", "Habits compound"]
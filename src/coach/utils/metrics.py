@@ -13,26 +13,172 @@ rag_query_duration = Histogram(
     buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0]
 )
 
+rag_time_to_first_token = Histogram(
+    'rag_time_to_first_token_seconds',
+    'Time from receiving a streaming query to sending the first LLM token',
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0]
+)
+
+rag_tokens_per_second = Histogram(
+    'rag_tokens_per_second',
+    'LLM generation rate of streamed answers, in tokens per second (estimated without CONTEXT_TOKENIZER)',
+    buckets=[1, 5, 10, 20, 40, 80, 160]
+)
+
 rag_errors_total = Counter(
     'rag_errors_total',
     'Total number of RAG errors',
     ['error_type']
 )
 
+rag_service_ready = Gauge(
+    'rag_service_ready',
+    'Whether the RAG service finished warmup and can serve requests (1) or not (0)'
+)
+
+startup_phase_seconds = Gauge(
+    'rag_startup_phase_seconds',
+    'Duration of each RAG service warmup phase at the last start',
+    ['phase']
+)
+
 vector_operations_total = Counter(
     'vector_operations_total',
     'Total vector database operations',
     ['operation', 'status']
 )
 
+query_cache_hits = Counter(
+    'query_cache_hits_total',
+    'Query cache hits by tier (search = exact retrieval, answer = semantic answer)',
+    ['tier']
+)
+
+query_cache_misses = Counter(
+    'query_cache_misses_total',
+    'Query cache misses by tier (search = exact retrieval, answer = semantic answer)',
+    ['tier']
+)
+
 embedding_cache_hits = Counter(
     'embedding_cache_hits_total',
     'Number of embedding cache hits'
 )
 
+embedding_cache_misses = Counter(
+    'embedding_cache_misses_total',
+    'Number of embedding cache misses'
+)
+
+embedding_cache_evictions = Counter(
+    'embedding_cache_evictions_total',
+    'Number of embeddings evicted from the in-memory cache',
+    ['reason']
+)
+
+embedding_cache_bytes = Gauge(
+    'embedding_cache_resident_bytes',
+    'Bytes of vectors and keys held by the in-memory embedding cache'
+)
+
+embedding_store_hits = Counter(
+    'embedding_store_hits_total',
+    'Number of embeddings served from the persistent on-disk store'
+)
+
+embedding_store_misses = Counter(
+    'embedding_store_misses_total',
+    'Number of persistent embedding store lookups that had to be computed'
+)
+
+embedding_store_rows = Gauge(
+    'embedding_store_rows',
+    'Number of vectors committed to the persistent embedding store'
+)
+
+embedding_batch_size = Histogram(
+    'embedding_batch_size',
+    'Number of query texts embedded together by the embedding batcher',
+    buckets=[1, 2, 4, 8, 16, 32, 64]
+)
+
+embedding_batch_wait_seconds = Histogram(
+    'embedding_batch_wait_seconds',
+    'Queueing delay added by the embedding batcher before a batch is encoded',
+    buckets=[0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1]
+)
+
+rag_prompt_tokens = Histogram(
+    'rag_prompt_tokens',
+    'Tokens in the prompts sent to the LLM (estimated without a tokenizer)',
+    buckets=[128, 256, 512, 1024, 1536, 2048, 3072, 4096, 8192]
+)
+
+rerank_duration_seconds = Histogram(
+    'rerank_duration_seconds',
+    'Time spent scoring search candidates with the cross-encoder',
+    ['outcome'],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0]
+)
+
+pdf_page_extract_seconds = Histogram(
+    'pdf_page_extract_seconds',
+    'Time spent extracting text from a single PDF page',
+    buckets=[0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0]
+)
+
+pdf_page_extract_failures = Counter(
+    'pdf_page_extract_failures_total',
+    'PDF pages whose text extraction raised an error'
+)
+
+ingest_jobs_total = Counter(
+    'ingest_jobs_total',
+    'Background ingestion jobs by outcome (queued, rejected, succeeded, failed)',
+    ['status']
+)
+
+ingest_job_duration = Histogram(
+    'ingest_job_duration_seconds',
+    'Time a background ingestion job spent running',
+    ['status'],
+    buckets=[0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0]
+)
+
+ingest_job_wait = Histogram(
+    'ingest_job_wait_seconds',
+    'Time a background ingestion job waited in the queue before starting',
+    buckets=[0.01, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0]
+)
+
+ingest_job_queue_depth = Gauge(
+    'ingest_job_queue_depth',
+    'Ingestion jobs waiting for a free worker'
+)
+
+vector_store_operation_duration = Histogram(
+    'vector_store_operation_duration_seconds',
+    'Latency of vector store calls made by the async Qdrant backend',
+    ['operation'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0]
+)
+
 document_chunks_total = Gauge(
     'document_chunks_total',
     'Total number of document chunks in vector store',
     ['collection']
 )
 
+
+executor_queue_depth = Gauge(
+    'executor_queue_depth',
+    'Blocking calls submitted to an executor pool but not yet started',
+    ['pool']
+)
+
+executor_wait_seconds = Histogram(
+    'executor_wait_seconds',
+    'Time blocking calls wait for a free executor worker',
+    ['pool'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+)